@@ -0,0 +1,33 @@
+"""Shared building blocks for the apple_fall simulation, and its command line.
+
+``python -m applefall`` runs the scenes, sweeps and exports (see ``cli``).
+The names below are imported from their modules on first access, so
+``import applefall`` loads none of NumPy, pygame, matplotlib or torch.
+"""
+import importlib
+
+_EXPORTS = {
+    'FallEngine': 'engine',
+    'EventTimeline': 'events',
+    'CollisionWorld': 'collision',
+    'FixedStepper': 'timestep',
+    'TrajectoryRecorder': 'recorder',
+    'TrajectoryReader': 'trajectory_io',
+    'TrajectoryWriter': 'trajectory_io',
+    'run_sweep': 'sweep',
+    'main': 'cli',
+}
+
+__all__ = sorted(_EXPORTS)
+
+
+def __getattr__(name):
+    if name not in _EXPORTS:
+        raise AttributeError(f'module {__name__!r} has no attribute {name!r}')
+    value = getattr(importlib.import_module(f'.{_EXPORTS[name]}', __name__), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(_EXPORTS))
@@ -0,0 +1,5 @@
+from .cli import main
+
+# Guarded, so spawned worker processes that import this module run nothing
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,146 @@
+"""Headless CPU benchmarks of the simulation and plotting hot paths.
+
+Measures how the per-frame work scales, with no window:
+
+``engine.step``
+    one physics step of a ``FallEngine`` versus the number of bodies.
+``sprites.update``
+    the ``Apple.update`` path: a fixed-step ``advance`` plus syncing every
+    ``BodySprite`` to the interpolated heights, versus the sprite count.
+``plot.full`` / ``plot.refresh``
+    a ``LivePlot`` rebuild (axes and downsampled history) and an ordinary
+    incremental refresh, versus the history length.
+``sweep.chunk``
+    ``simulate_chunk`` of a parameter grid, stepped and event-driven.
+
+Each case is timed by ``benchutil.measure`` and the results are saved as
+JSON with the commit and platform they were measured on.  A run given
+``--baseline`` also lists every case that got slower by more than
+``--tolerance``, and exits with status 1 if there are any::
+
+    python -m applefall.bench --out bench.json
+    python -m applefall.bench --out new.json --baseline bench.json
+
+``--quick`` runs the smallest sizes only, as a smoke test.
+"""
+import numpy as np
+
+from .benchutil import REPEATS, BenchResult, main as run_suite, measure
+
+BODY_COUNTS = (1, 100, 10_000, 1_000_000)
+SPRITE_COUNTS = (1, 10, 100, 1000)
+HISTORY_LENGTHS = (1_000, 10_000, 100_000, 1_000_000)
+SWEEP_SIZES = (64, 4096)
+PLOT_SIZE = (600, 600)
+
+
+def bench_step(counts=BODY_COUNTS, steps=100, repeats=REPEATS):
+    from .engine import FallEngine
+    from .timestep import PHYSICS_HZ
+
+    for n in counts:
+        engine = FallEngine(capacity=n)
+        # High enough that nothing lands, so every body stays active
+        engine.add(x=np.arange(n, dtype=np.float64), y=1e9)
+
+        def run():
+            for _ in range(steps):
+                engine.step(1.0 / PHYSICS_HZ, 9.81)
+
+        seconds, runs = measure(run, repeats)
+        per_step = seconds / steps
+        yield BenchResult('engine.step', {'bodies': n}, per_step, [r / steps for r in runs],
+                          {'body_steps_per_second': n / per_step})
+
+
+def bench_sprites(counts=SPRITE_COUNTS, frames=60, repeats=REPEATS):
+    import pygame
+
+    from .engine import FallEngine
+    from .sprites import BodySprite
+    from .timestep import FixedStepper
+
+    for n in counts:
+        engine = FallEngine(capacity=n)
+        group = pygame.sprite.Group(BodySprite(engine, 10, (255, 0, 0), 460) for _ in range(n))
+        stepper = FixedStepper(engine)
+
+        def reset():
+            engine.y[:n] = 1e9
+            engine.vy[:n] = 0.0
+            engine.stopped[:n] = False
+            stepper.reset()
+
+        def run():
+            for _ in range(frames):
+                stepper.advance(1.0 / 60, 9.81)
+                group.update(stepper.interpolated_heights())
+
+        seconds, runs = measure(run, repeats, reset)
+        yield BenchResult('sprites.update', {'sprites': n}, seconds / frames, [r / frames for r in runs], {})
+
+
+def _history(n):
+    from .recorder import TrajectoryRecorder
+
+    recorder = TrajectoryRecorder()
+    t = np.linspace(0.0, 10.0, n)
+    recorder.extend(t, 100.0 - 0.5 * 9.81 * (t % 4.5) ** 2, -9.81 * (t % 4.5))
+    return recorder
+
+
+def bench_plot(lengths=HISTORY_LENGTHS, size=PLOT_SIZE, refreshes=20, repeats=REPEATS):
+    from .live_plot import LivePlot
+
+    for n in lengths:
+        recorder = _history(n)
+        plot = LivePlot(recorder, *size)
+        seconds, runs = measure(plot.draw, repeats, plot.reset)
+        yield BenchResult('plot.full', {'history': n}, seconds, runs, {})
+
+        # A few new samples per refresh, inside the current limits
+        last = recorder.column('t')[-1]
+
+        def run():
+            nonlocal last
+            for _ in range(refreshes):
+                t = last + np.arange(1, 5) * 1e-4
+                recorder.extend(t, np.full(4, 50.0), np.full(4, -10.0))
+                plot.draw()
+                last = t[-1]
+
+        seconds, runs = measure(run, repeats)
+        yield BenchResult('plot.refresh', {'history': n}, seconds / refreshes,
+                          [r / refreshes for r in runs], {})
+
+
+def bench_sweep(sizes=SWEEP_SIZES, repeats=REPEATS):
+    from .sweep import METHODS, parameter_grid, simulate_chunk
+
+    for n in sizes:
+        side = round(n ** (1 / 3))
+        params = parameter_grid(np.linspace(1.0, 20.0, side), np.linspace(1.0, 100.0, side),
+                                np.linspace(0.1, 2.0, max(n // side ** 2, 1)))
+        for method in METHODS:
+            seconds, runs = measure(lambda: simulate_chunk(params, trajectories=False, method=method), repeats)
+            yield BenchResult('sweep.chunk', {'runs': len(params), 'method': method}, seconds, runs,
+                              {'runs_per_second': len(params) / seconds})
+
+
+def run_all(quick=False, repeats=REPEATS):
+    """Every benchmark, as a list of ``BenchResult``."""
+    first = (lambda sizes: sizes[:1]) if quick else (lambda sizes: sizes)
+    results = []
+    results += bench_step(first(BODY_COUNTS), repeats=repeats)
+    results += bench_sprites(first(SPRITE_COUNTS), repeats=repeats)
+    results += bench_plot(first(HISTORY_LENGTHS), repeats=repeats)
+    results += bench_sweep(first(SWEEP_SIZES), repeats=repeats)
+    return results
+
+
+def main(argv=None):
+    run_suite(run_all, 'applefall', 'Benchmark the simulation and plotting hot paths.', argv)
+
+
+if __name__ == '__main__':
+    main()
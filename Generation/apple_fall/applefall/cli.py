@@ -0,0 +1,132 @@
+"""Command line entry point: ``python -m applefall MODE ...``.
+
+``interactive``
+    open a window on a scene (``--scene``, see ``scenes``).
+``headless``
+    run a scene offscreen and uncapped, for ``--max-frames`` frames or one
+    ``--replay`` log, optionally saving ``--frames`` and ``--profile``.
+``sweep``
+    simulate a gravity/height/mass grid across a process pool and report
+    the errors against the closed-form fall.
+``export``
+    write a sweep's trajectories to a trajectory file for PINN training,
+    and with ``--tensors`` also as a torch ``.pt`` of its columns.
+
+Nothing heavy is imported until a mode runs, and then only what the mode
+needs.  The scenes load pygame, and the plot scenes matplotlib; sweep and
+export only need NumPy, and torch is loaded only by ``--tensors``.  So
+sweeps start without any GUI library, and their worker processes carry no
+GUI state whether they are forked or spawned.
+
+Grid values are given as ``START:STOP:NUM`` (``np.linspace``), as a
+comma-separated list, or as a single number::
+
+    python -m applefall headless --scene pile --max-frames 300 --frames run.rgb
+    python -m applefall sweep --gravity 1.6:9.8:32 --height 1:100:256 --method events
+    python -m applefall export drops.bin --height 0.5:5:64 --tensors drops.pt
+"""
+import argparse
+
+
+def grid_values(text):
+    """Parse ``START:STOP:NUM``, ``a,b,c`` or a single number into an array."""
+    import numpy as np
+
+    try:
+        if ':' in text:
+            start, stop, num = text.split(':')
+            return np.linspace(float(start), float(stop), int(num))
+        return np.array([float(value) for value in text.split(',')])
+    except ValueError:
+        raise argparse.ArgumentTypeError(f'expected START:STOP:NUM or a list of numbers, got {text!r}')
+
+
+def _add_grid_options(parser):
+    parser.add_argument('--gravity', type=grid_values, default='9.81', help='m/s^2 (default 9.81)')
+    parser.add_argument('--height', type=grid_values, default='1:100:100', help='m (default 1:100:100)')
+    parser.add_argument('--mass', type=grid_values, default='0.2', help='kg (default 0.2)')
+    parser.add_argument('--time-scale', type=grid_values, default='1', help='playback speed (default 1)')
+    parser.add_argument('--method', choices=('step', 'events'), default='step',
+                        help='fixed-step simulation or closed-form impacts (default step)')
+    parser.add_argument('--processes', type=int, metavar='N', help='worker processes (default: all cores)')
+
+
+def build_parser():
+    from .headless import add_run_options
+    from .scenes import DEFAULT_SCENE, SCENES
+
+    parser = argparse.ArgumentParser(prog='python -m applefall', description='Apple fall simulations.')
+    modes = parser.add_subparsers(dest='mode', metavar='MODE')
+    for mode, text in (('interactive', 'open a window on a scene'),
+                       ('headless', 'run a scene offscreen as fast as possible')):
+        sub = modes.add_parser(mode, help=text, description=text)
+        sub.add_argument('--scene', choices=tuple(SCENES), default=DEFAULT_SCENE,
+                         help=f'default {DEFAULT_SCENE}')
+        add_run_options(sub)
+
+    sub = modes.add_parser('sweep', help='simulate a parameter grid in parallel')
+    _add_grid_options(sub)
+    sub.add_argument('--out', metavar='NPY', help='save the result rows with np.save')
+
+    sub = modes.add_parser('export', help='save sweep trajectories as PINN training data')
+    sub.add_argument('path', help='trajectory file to write')
+    _add_grid_options(sub)
+    sub.add_argument('--tensors', metavar='PT', help='also save the columns as torch tensors')
+    return parser
+
+
+def main(argv=None):
+    parser = build_parser()
+    options = parser.parse_args(argv)
+    if options.mode is None:
+        # A bare ``python -m applefall`` opens the default scene
+        options = parser.parse_args(['interactive'])
+    mode = options.mode
+    if mode in ('interactive', 'headless'):
+        from .headless import apply_run_options
+        from .scenes import run
+
+        options.headless = options.headless or mode == 'headless'
+        run(options.scene, apply_run_options(parser, options))
+    else:
+        try:
+            if mode == 'sweep':
+                _sweep(options)
+            else:
+                _export(options)
+        except ValueError as error:  # e.g. a grid with drops that never land
+            parser.error(str(error))
+
+
+def _run_sweep(options, **kwargs):
+    from .sweep import run_sweep
+
+    return run_sweep(options.gravity, options.height, options.mass, options.time_scale,
+                     processes=options.processes, method=options.method, **kwargs)
+
+
+def _sweep(options):
+    import numpy as np
+
+    from .sweep import summarize
+
+    sweep = _run_sweep(options, trajectories=False)
+    print(summarize(sweep))
+    if options.out:
+        np.save(options.out, sweep.results)
+
+
+def _export(options):
+    from .sweep import summarize
+    from .trajectory_io import RECORD_DTYPE, TrajectoryReader
+
+    sweep = _run_sweep(options, path=options.path)
+    print(summarize(sweep))
+    reader = TrajectoryReader(options.path)
+    print(f'{len(reader):,} records written to {options.path}')
+    if options.tensors:
+        import torch
+
+        # Compact copies, not views that would each save the whole record buffer
+        torch.save({name: reader.tensor(name).clone() for name in RECORD_DTYPE.names}, options.tensors)
+        print(f'tensors saved to {options.tensors}')
@@ -0,0 +1,254 @@
+"""Apple-apple collisions for square bodies in a FallEngine.
+
+Broad phase: a uniform grid whose cells are one body wide, so two squares
+can only touch if their cells are neighbours.  Bodies are sorted by cell key
+and each awake body looks up its 3x3 neighbourhood with ``searchsorted``.
+The sort reuses the previous step's order, and since bodies rarely change
+cell between steps the stable sort is close to linear.
+
+Narrow phase: vectorized AABB overlap over all candidate pairs.  A pair is
+pushed apart along the axis on which it was apart at the start of the step,
+falling back to the axis of least penetration, so a fast body that sank deep
+into another is still pushed back out of the side it came from.  Every body
+in a pass gets the average of its corrections rather than their sum; a body
+squeezed by many neighbours would otherwise be thrown out of the pile.
+
+Bodies that were stopped when a step began are asleep: they act as fixed
+obstacles and never move again.  After the last pass, an awake body falls
+asleep once it moves slower than ``SLEEP_SPEED`` while resting on the floor
+or on sleeping bodies, or at the latest ``SLEEP_TIMEOUT`` seconds after its
+first contact, so a body jammed between others cannot keep the pile awake.
+A body falls asleep at the height where it clears every sleeper beside it,
+so sleepers never overlap.  That is what lets a pile build up and come to
+rest.
+"""
+import numpy as np
+
+# Cell keys pack (column, row) into one int64
+ROW_BITS = 32
+# Gap or overlap, as a fraction of the body size, that still counts as resting contact
+CONTACT_SLOP = 1e-2
+# Deepest overlap, as a fraction of the body size, a still body is lifted out of
+MAX_LIFT = 0.25
+# Speed, in body sizes per second, below which a resting body falls asleep
+SLEEP_SPEED = 0.5
+# Seconds after its first contact at which a body falls asleep anyway
+SLEEP_TIMEOUT = 1.0
+NEIGHBOURS = [(dx, dy) for dx in (-1, 0, 1) for dy in (-1, 0, 1)]
+
+
+class SpatialHash:
+    def __init__(self, cell_size):
+        self.cell_size = cell_size
+        self.order = np.empty(0, dtype=np.int64)
+        self.keys = np.empty(0, dtype=np.int64)  # sorted
+        self.body_keys = np.empty(0, dtype=np.int64)  # per body, unsorted
+
+    def rebuild(self, x, y):
+        """Re-bin all bodies, starting from the previous sort order."""
+        n = len(x)
+        keys = self.cell_keys(x, y)
+        self.body_keys = keys
+        if len(self.order) != n:
+            self.order = np.arange(n)
+        candidate = keys[self.order]
+        resort = np.argsort(candidate, kind='stable')
+        self.order = self.order[resort]
+        self.keys = candidate[resort]
+
+    def cell_keys(self, x, y):
+        cx = np.floor(x / self.cell_size).astype(np.int64)
+        cy = np.floor(y / self.cell_size).astype(np.int64)
+        return (cx << ROW_BITS) + cy
+
+    def neighbour_pairs(self, query):
+        """Candidate pairs (i, j) with i in ``query`` and j in a neighbouring cell."""
+        first, second = [], []
+        own = self.body_keys[query]
+        for dx, dy in NEIGHBOURS:
+            target = own + (dx << ROW_BITS) + dy
+            lo = np.searchsorted(self.keys, target, 'left')
+            hi = np.searchsorted(self.keys, target, 'right')
+            counts = hi - lo
+            total = counts.sum()
+            if total == 0:
+                continue
+            # Expand each [lo, hi) range into one entry per neighbour
+            starts = np.repeat(lo - np.cumsum(counts) + counts, counts)
+            first.append(np.repeat(query, counts))
+            second.append(self.order[starts + np.arange(total)])
+        if not first:
+            empty = np.empty(0, dtype=np.int64)
+            return empty, empty
+        return np.concatenate(first), np.concatenate(second)
+
+
+class CollisionWorld:
+    """Steps a FallEngine and keeps its square bodies from overlapping.
+
+    ``size`` is the side length of every body in engine units.  The world has
+    the same ``step(dt, gravity)`` signature as the engine, so it can be
+    handed to a FixedStepper in its place.
+    """
+
+    def __init__(self, engine, size, restitution=0.0, iterations=4):
+        self.engine = engine
+        self.size = size
+        self.restitution = restitution
+        self.iterations = iterations
+        self.grid = SpatialHash(size)
+
+    def step(self, dt, gravity):
+        """Advance the engine by ``dt`` and resolve contacts; return the mask of
+        bodies that fell asleep.
+        """
+        e = self.engine
+        n = e.count
+        asleep = e.stopped[:n].copy()
+        self.start_x = e.x[:n].copy()
+        self.start_y = e.y[:n].copy()
+        # An awake body on the floor lands again every step; keep its first impact
+        time_stopped = e.time_stopped[:n].copy()
+        impact_velocity = e.impact_velocity[:n].copy()
+        e.step(dt, gravity)
+        landed = ~np.isnan(time_stopped)
+        e.time_stopped[:n][landed] = time_stopped[landed]
+        e.impact_velocity[:n][landed] = impact_velocity[landed]
+        # Speed just before any contact, recorded as impact velocity on a pile
+        fall_velocity = e.vy[:n].copy()
+        # The engine only knows the floor; contacts decide who really stopped
+        e.stopped[:n] = asleep
+        touched = np.zeros(n, dtype=bool)
+        for _ in range(self.iterations):
+            if not self.resolve(asleep, touched):
+                break
+        hit = touched & np.isnan(e.time_stopped[:n])
+        e.time_stopped[:n][hit] = e.time
+        e.impact_velocity[:n][hit] = fall_velocity[hit]
+        return self._sleep(asleep, dt)
+
+    def resolve(self, asleep, touched=None):
+        """One pass of overlap resolution; return the number of contacts.
+
+        ``asleep`` marks the bodies that were stopped before this step.  The
+        bodies of every contact are marked in ``touched`` if it is given.
+        """
+        e = self.engine
+        n = e.count
+        self.grid.rebuild(e.x[:n], e.y[:n])
+        awake = np.flatnonzero(~asleep)
+        if len(awake) == 0:
+            return 0
+        i, j, dx, dy, over_x, over_y = self._contacts(awake)
+        hit = (over_x > 0) & (over_y > 0)
+        i, j, dx, dy, over_x, over_y = i[hit], j[hit], dx[hit], dy[hit], over_x[hit], over_y[hit]
+        if len(i) == 0:
+            return 0
+        if touched is not None:
+            touched[i] = True
+            touched[j] = True
+
+        # Where the pair was apart on exactly one axis, separate along it
+        sx = self.start_x[j] - self.start_x[i]
+        sy = self.start_y[j] - self.start_y[i]
+        apart_x = np.abs(sx) >= self.size
+        apart_y = np.abs(sy) >= self.size
+        vertical = np.where(apart_x != apart_y, apart_y, over_y <= over_x)
+        # The normal points from i to j
+        sign = np.where(vertical,
+                        np.where(apart_y, np.sign(sy), np.sign(dy)),
+                        np.where(apart_x, np.sign(sx), np.sign(dx)))
+        sign[sign == 0] = 1.0
+        depth = np.maximum(self.size - sign * np.where(vertical, dy, dx), 0.0)
+
+        # Sleeping bodies, and the floor under a body pushed down, do not give way
+        inv_i = 1.0 / e.mass[i]
+        inv_j = np.where(asleep[j], 0.0, 1.0 / e.mass[j])
+        on_floor = e.y[:n] <= e.floor
+        inv_i[vertical & (sign > 0) & on_floor[i]] = 0.0
+        inv_j[vertical & (sign < 0) & on_floor[j]] = 0.0
+        total = inv_i + inv_j
+        movable = total > 0
+        total[~movable] = 1.0
+        share_i = np.where(movable, inv_i / total, 0.0)
+        share_j = np.where(movable, inv_j / total, 0.0)
+
+        # Relative velocity along the normal; negative means approaching
+        v_i = np.where(vertical, e.vy[i], e.vx[i])
+        v_j = np.where(vertical, e.vy[j], e.vx[j])
+        closing = np.minimum((v_j - v_i) * sign, 0.0) * (1 + self.restitution)
+
+        for axis, pos, vel in ((vertical, e.y, e.vy), (~vertical, e.x, e.vx)):
+            a, b, s = i[axis], j[axis], sign[axis]
+            moves = np.zeros(n)
+            kicks = np.zeros(n)
+            counts = np.zeros(n)
+            np.add.at(moves, a, -s * depth[axis] * share_i[axis])
+            np.add.at(moves, b, s * depth[axis] * share_j[axis])
+            np.add.at(kicks, a, s * closing[axis] * share_i[axis])
+            np.add.at(kicks, b, -s * closing[axis] * share_j[axis])
+            np.add.at(counts, a, share_i[axis] > 0)
+            np.add.at(counts, b, share_j[axis] > 0)
+            np.maximum(counts, 1.0, out=counts)
+            pos[:n] += moves / counts
+            vel[:n] += kicks / counts
+
+        below = e.y[:n] < e.floor
+        e.y[:n][below] = e.floor
+        e.vy[:n][below & (e.vy[:n] < 0)] = 0.0
+        return len(i)
+
+    def _contacts(self, query):
+        """Pairs (i, j) with i in ``query`` whose squares touch or overlap."""
+        x, y = self.engine.x, self.engine.y
+        i, j = self.grid.neighbour_pairs(query)
+        # A pair inside the query shows up from both sides; keep one of them
+        queried = np.zeros(self.engine.count, dtype=bool)
+        queried[query] = True
+        keep = (i != j) & (~queried[j] | (i < j))
+        i, j = i[keep], j[keep]
+        dx = x[j] - x[i]
+        dy = y[j] - y[i]
+        over_x = self.size - np.abs(dx)
+        over_y = self.size - np.abs(dy)
+        hit = (over_x >= 0) & (over_y >= 0)
+        return i[hit], j[hit], dx[hit], dy[hit], over_x[hit], over_y[hit]
+
+    def _sleep(self, asleep, dt):
+        e = self.engine
+        n = e.count
+        settle = np.zeros(n, dtype=bool)
+        speed = np.hypot(e.x[:n] - self.start_x, e.y[:n] - self.start_y) / dt
+        still = speed < SLEEP_SPEED * self.size
+        timed_out = e.time - e.time_stopped[:n] >= SLEEP_TIMEOUT
+        # Lowest first, so a stack settles bottom-up within one step
+        candidates = np.flatnonzero(~asleep & (still | timed_out))
+        for body in candidates[np.argsort(e.y[candidates], kind='stable')]:
+            rest = self._rest_height(body)
+            # A still body must already rest there; one timed out is moved
+            lift = rest - e.y[body]
+            if timed_out[body] or -CONTACT_SLOP * self.size <= lift <= MAX_LIFT * self.size:
+                e.y[body] = rest
+                e.stopped[body] = True
+                settle[body] = True
+        e.vx[:n][settle] = 0.0
+        e.vy[:n][settle] = 0.0
+        return settle
+
+    def _rest_height(self, body):
+        """Lowest height at which ``body`` lies on the floor or on the
+        sleepers under it and clears every sleeper beside it.
+        """
+        e = self.engine
+        n = e.count
+        slop = CONTACT_SLOP * self.size
+        x, y = e.x[:n], e.y[:n]
+        beside = np.flatnonzero(e.stopped[:n] & (np.abs(x - x[body]) < self.size - slop))
+        tops = y[beside] + self.size
+        # Drop onto whatever is under the body, then climb over anything still in the way
+        height = tops[y[beside] < y[body] + self.size - slop].max(initial=e.floor)
+        while True:
+            blocking = (tops > height + slop) & (y[beside] < height + self.size - slop)
+            if not blocking.any():
+                return height
+            height = tops[blocking].max()
@@ -0,0 +1,115 @@
+"""Headless many-body fall simulation.
+
+State is kept as one NumPy array per quantity (struct-of-arrays) so a single
+``step`` call advances every body at once.  Heights are measured upwards from
+the floor and velocities are positive upwards; gravity is given as a positive
+magnitude.  The engine has no notion of units, each caller picks its own
+(pixels per frame, metres per second, ...).
+"""
+import numpy as np
+
+
+def impact_time(height, velocity, gravity):
+    """Time until a body ``height`` above the floor, moving at ``velocity``,
+    reaches it; ``inf`` if it never does.
+    """
+    h, v, g = np.broadcast_arrays(*(np.asarray(a, dtype=np.float64) for a in (height, velocity, gravity)))
+    # Solve h + v t - g t^2 / 2 = 0 for the first t >= 0
+    disc = np.sqrt(np.maximum(v * v + 2 * g * h, 0.0))
+    with np.errstate(divide='ignore', invalid='ignore'):
+        # Pick the root form that avoids cancellation for each sign of v
+        tau = np.where(v <= 0, 2 * h / (disc - v), (v + disc) / g)
+    # 0 / 0 is a body resting on the floor
+    return np.maximum(np.where(np.isnan(tau), 0.0, tau), 0.0)
+
+
+class FallEngine:
+    def __init__(self, capacity=16, floor=0.0):
+        self.floor = floor
+        self.time = 0.0
+        self.count = 0
+        self.x = np.zeros(capacity)
+        self.y = np.zeros(capacity)
+        self.vx = np.zeros(capacity)
+        self.vy = np.zeros(capacity)
+        self.mass = np.ones(capacity)
+        self.stopped = np.zeros(capacity, dtype=bool)
+        self.time_stopped = np.full(capacity, np.nan)
+        self.impact_velocity = np.full(capacity, np.nan)
+
+    def __len__(self):
+        return self.count
+
+    def add(self, x=0.0, y=0.0, vy=0.0, mass=1.0, vx=0.0):
+        """Add bodies (scalars or arrays, broadcast together); return their indices."""
+        x, y, vy, mass, vx = np.broadcast_arrays(
+            np.atleast_1d(x), np.atleast_1d(y), np.atleast_1d(vy), np.atleast_1d(mass),
+            np.atleast_1d(vx))
+        n = len(x)
+        self._reserve(self.count + n)
+        index = np.arange(self.count, self.count + n)
+        self.count += n
+        self.set_state(index, x, y, vy, mass, vx)
+        return index
+
+    def set_state(self, index, x, y, vy=0.0, mass=None, vx=0.0):
+        """Overwrite the state of existing bodies and mark them as falling."""
+        self.x[index] = x
+        self.y[index] = y
+        self.vx[index] = vx
+        self.vy[index] = vy
+        if mass is not None:
+            self.mass[index] = mass
+        self.stopped[index] = False
+        self.time_stopped[index] = np.nan
+        self.impact_velocity[index] = np.nan
+
+    def clear(self):
+        self.count = 0
+        self.time = 0.0
+
+    def step(self, dt, gravity):
+        """Advance all bodies by ``dt``; return the mask of bodies that landed.
+
+        ``gravity`` may be a scalar or one value per body.
+        """
+        n = self.count
+        y = self.y[:n]
+        vy = self.vy[:n]
+        stopped = self.stopped[:n]
+        active = ~stopped
+        g = np.broadcast_to(gravity, (n,))
+
+        # Gravity is constant over a step, so the closed-form update is exact
+        y0 = y.copy()
+        vy0 = vy.copy()
+        np.add(y, vy * dt - 0.5 * g * dt * dt, out=y, where=active)
+        np.add(self.x[:n], self.vx[:n] * dt, out=self.x[:n], where=active)
+        np.subtract(vy, g * dt, out=vy, where=active)
+
+        landed = active & (y <= self.floor)
+        if landed.any():
+            v, gl = vy0[landed], g[landed]
+            tau = np.minimum(impact_time(y0[landed] - self.floor, v, gl), dt)
+            y[landed] = self.floor
+            # Back to where the body was at impact, not at the end of the step
+            self.x[:n][landed] -= self.vx[:n][landed] * (dt - tau)
+            self.impact_velocity[:n][landed] = v - gl * tau
+            self.time_stopped[:n][landed] = self.time + tau
+            vy[landed] = 0.0
+            self.vx[:n][landed] = 0.0
+            stopped |= landed
+        self.time += dt
+        return landed
+
+    def _reserve(self, size):
+        capacity = len(self.x)
+        if size <= capacity:
+            return
+        while capacity < size:
+            capacity *= 2
+        for name in ('x', 'y', 'vx', 'vy', 'mass', 'stopped', 'time_stopped', 'impact_velocity'):
+            old = getattr(self, name)
+            new = np.empty(capacity, dtype=old.dtype)
+            new[:len(old)] = old
+            setattr(self, name, new)
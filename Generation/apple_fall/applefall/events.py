@@ -0,0 +1,192 @@
+"""Event-driven fall simulation: jump from impact to impact.
+
+Under constant gravity a body's flight is a parabola, so stepping it frame by
+frame until it reaches the floor mostly computes nothing new.
+``EventTimeline`` takes a snapshot of a ``FallEngine`` and solves each
+body's next time of impact in closed form (``engine.impact_time``).  Those
+times are kept in a heap, and the earliest impact is always handled next:
+the body bounces with ``restitution`` and its next impact is pushed.  A body
+comes to rest once its rebound speed drops below ``rest_speed`` or after
+``max_bounces``, which keeps the geometric series of ever shorter hops
+finite.
+
+Each event starts a new flight segment for its body, appended to a log.
+Segments are only added, never changed, so the log is the whole timeline.
+``state_at(t)`` finds each body's segment by binary search, in
+``O(log events)``, and evaluates the parabola there.  Scrubbing back and
+forth costs the same as playing forward.  Events are processed lazily, only
+up to the latest time asked for.
+
+Horizontal velocity is kept through bounces (the floor is frictionless) and
+dropped once the body rests, as ``FallEngine.step`` does on landing.  With
+the default ``restitution=0`` every body stops at its first impact, which
+matches the stepped engine exactly.
+"""
+import heapq
+from collections import namedtuple
+
+import numpy as np
+
+from .engine import impact_time
+
+BodyState = namedtuple('BodyState', 'x y vx vy stopped')
+
+# Rebound speed, in engine units per second, below which a body stays down
+REST_SPEED = 1e-3
+MAX_BOUNCES = 256
+
+SEGMENT_FIELDS = ('t0', 'x0', 'y0', 'vx', 'vy0', 'body')
+
+
+class EventTimeline:
+    """The exact trajectories of an engine's bodies from ``engine.time`` on.
+
+    ``gravity`` is a scalar or one value per body and is held constant; build
+    a new timeline from the engine when it changes.
+    """
+
+    def __init__(self, engine, gravity, restitution=0.0, rest_speed=REST_SPEED, max_bounces=MAX_BOUNCES):
+        n = engine.count
+        self.floor = engine.floor
+        self.start = engine.time
+        self.gravity = np.broadcast_to(np.asarray(gravity, dtype=np.float64), (n,)).copy()
+        self.restitution = restitution
+        self.rest_speed = rest_speed
+        self.max_bounces = max_bounces
+        self.bounces = np.zeros(n, dtype=np.int64)
+        self.rest_time = np.where(engine.stopped[:n], engine.time_stopped[:n], np.inf)
+        self.first_impact_time = engine.time_stopped[:n].copy()
+        self.first_impact_velocity = engine.impact_velocity[:n].copy()
+        self.mass = engine.mass[:n].copy()
+
+        # Flight segments, in the order they happen
+        self.count = 0
+        for name in SEGMENT_FIELDS:
+            setattr(self, name, np.empty(max(2 * n, 16), dtype=np.int64 if name == 'body' else np.float64))
+        self._order = self._first = self._sorted_t0 = None
+        stopped = engine.stopped[:n]
+        vx = np.where(stopped, 0.0, engine.vx[:n])
+        vy = np.where(stopped, 0.0, engine.vy[:n])
+        self.current = self._append(np.full(n, self.start), engine.x[:n], engine.y[:n], vx, vy, np.arange(n))
+
+        impact = self.start + impact_time(engine.y[:n] - self.floor, vy, self.gravity)
+        falling = np.flatnonzero(~stopped & np.isfinite(impact))
+        self._queue = list(zip(impact[falling].tolist(), falling.tolist()))
+        heapq.heapify(self._queue)
+
+    def __len__(self):
+        return len(self.gravity)
+
+    @property
+    def end_time(self):
+        """Time by which every body is at rest (``inf`` if some never land)."""
+        self.advance_to(np.inf)
+        return float(self.rest_time.max(initial=self.start))
+
+    def next_event_time(self):
+        return self._queue[0][0] if self._queue else np.inf
+
+    def advance_to(self, t):
+        """Handle every impact up to time ``t``; return the number handled.
+
+        Bodies do not interact, so all impacts due by ``t`` are popped and
+        handled together; a bounce that lands again before ``t`` is handled
+        in the next round.
+        """
+        handled = 0
+        queue = self._queue
+        while queue and queue[0][0] <= t:
+            due = []
+            while queue and queue[0][0] <= t:
+                due.append(heapq.heappop(queue))
+            times, bodies = (np.array(column) for column in zip(*due))
+            for item in zip(*self._impact(times, bodies)):
+                heapq.heappush(queue, item)
+            handled += len(due)
+        return handled
+
+    def _impact(self, time, body):
+        """Bounce or stop ``body`` at ``time``; return the next impacts."""
+        segment = self.current[body]
+        dt = time - self.t0[segment]
+        g = self.gravity[body]
+        velocity = self.vy0[segment] - g * dt
+        x = self.x0[segment] + self.vx[segment] * dt
+        first = self.bounces[body] == 0
+        self.first_impact_time[body[first]] = time[first]
+        self.first_impact_velocity[body[first]] = velocity[first]
+
+        rebound = -self.restitution * velocity
+        rest = (rebound < self.rest_speed) | (self.bounces[body] >= self.max_bounces)
+        self.rest_time[body[rest]] = time[rest]
+        self.bounces[body[~rest]] += 1
+        vx = np.where(rest, 0.0, self.vx[segment])
+        rebound = np.where(rest, 0.0, rebound)
+        self.current[body] = self._append(time, x, np.full(len(body), self.floor), vx, rebound, body)
+        # Leaves the floor at ``rebound`` and is back after 2 v / g
+        again = ~rest & (g > 0)
+        return (time[again] + 2 * rebound[again] / g[again]).tolist(), body[again].tolist()
+
+    def _append(self, t0, x0, y0, vx, vy0, body):
+        n = len(body)
+        if self.count + n > len(self.t0):
+            for name in SEGMENT_FIELDS:
+                old = getattr(self, name)
+                new = np.empty(max(2 * len(old), self.count + n), dtype=old.dtype)
+                new[:self.count] = old[:self.count]
+                setattr(self, name, new)
+        index = np.arange(self.count, self.count + n)
+        for name, value in zip(SEGMENT_FIELDS, (t0, x0, y0, vx, vy0, body)):
+            getattr(self, name)[index] = value
+        self.count += n
+        self._order = None
+        return index
+
+    def _segments(self, t):
+        """Index of each body's segment at time ``t``, by binary search."""
+        if self._order is None:
+            # Appended in time order, so a stable sort keeps each body's segments sorted
+            self._order = np.argsort(self.body[:self.count], kind='stable')
+            self._first = np.searchsorted(self.body[self._order], np.arange(len(self) + 1))
+            self._sorted_t0 = self.t0[self._order]
+        lo, hi = self._first[:-1].copy(), self._first[1:].copy()
+        t0 = self._sorted_t0
+        # Invariant: t0[lo] <= t (or lo is the first segment) and t0[hi] > t
+        while True:
+            wide = hi - lo > 1
+            if not wide.any():
+                break
+            mid = (lo + hi) // 2
+            later = wide & (t0[mid] > t)
+            hi = np.where(later, mid, hi)
+            lo = np.where(wide & ~later, mid, lo)
+        return self._order[lo]
+
+    def state_at(self, t):
+        """``BodyState`` of every body at time ``t`` (not before the start)."""
+        t = max(t, self.start)
+        self.advance_to(t)
+        segment = self._segments(t)
+        dt = t - self.t0[segment]
+        stopped = self.rest_time <= t
+        g = np.where(stopped, 0.0, self.gravity)
+        return BodyState(self.x0[segment] + self.vx[segment] * dt,
+                         self.y0[segment] + self.vy0[segment] * dt - 0.5 * g * dt * dt,
+                         self.vx[segment].copy(),
+                         self.vy0[segment] - g * dt,
+                         stopped)
+
+    def sync(self, engine, t):
+        """Put ``engine`` in the state of time ``t``, so it can be drawn or stepped on."""
+        state = self.state_at(t)
+        n = len(self)
+        engine.time = max(t, self.start)
+        engine.x[:n] = state.x
+        engine.y[:n] = state.y
+        engine.vx[:n] = state.vx
+        engine.vy[:n] = state.vy
+        engine.stopped[:n] = state.stopped
+        engine.time_stopped[:n] = np.where(state.stopped, self.rest_time, np.nan)
+        landed = self.first_impact_time <= engine.time
+        engine.impact_velocity[:n] = np.where(landed, self.first_impact_velocity, np.nan)
+        return state
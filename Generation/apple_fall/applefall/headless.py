@@ -0,0 +1,252 @@
+"""Headless, uncapped run mode with frames streamed to disk.
+
+With ``--headless`` the scripts draw into SDL's dummy video driver, so no
+window (or display server) is needed, and the frame clock stops sleeping:
+every frame advances the simulation by exactly ``1 / fps`` seconds and the
+loop runs as fast as the machine allows.  ``--frames`` saves every rendered
+frame, either as a numbered PNG sequence (a directory) or as one raw RGB24
+stream (a path ending in ``.rgb``), which ffmpeg can turn into a video::
+
+    ffmpeg -f rawvideo -pix_fmt rgb24 -s 1400x600 -r 60 -i run.rgb run.mp4
+
+The frame size and rate of a raw stream are also written next to it as JSON.
+Frames are copied out of the screen on the main thread and encoded and
+written by a background thread, so slow PNG compression or disk writes
+overlap with simulating the next frames.
+
+``--record`` and ``--replay`` log a session's input and play it back
+headlessly, for benchmarks on identical sessions (see ``replay``).
+
+pygame is only imported once frames are run or saved, so the options can be
+parsed by the command line without loading it.
+"""
+import json
+import os
+import queue
+import threading
+import time
+
+# Frames queued for the encoder before the main loop has to wait for it
+QUEUE_FRAMES = 32
+# Frames rendered by a headless run when --max-frames is not given
+DEFAULT_HEADLESS_FRAMES = 600
+
+
+def add_run_options(parser):
+    """Add the run options (``--headless``, ``--frames`` ...) to an argparse parser."""
+    parser.add_argument('--headless', action='store_true',
+                        help='render offscreen and run as fast as possible')
+    parser.add_argument('--frames', metavar='PATH',
+                        help='save frames to a directory of PNGs or a raw .rgb stream')
+    parser.add_argument('--max-frames', type=int, metavar='N',
+                        help=f'stop after N frames (default {DEFAULT_HEADLESS_FRAMES} when headless)')
+    parser.add_argument('--profile', metavar='CSV',
+                        help='write per-frame phase timings to a CSV file')
+    parser.add_argument('--record', metavar='PATH',
+                        help='log input events and mouse state to a .npz file')
+    parser.add_argument('--replay', metavar='PATH',
+                        help='replay a --record log headlessly and report timings')
+    parser.add_argument('--report', metavar='JSON',
+                        help='also save the --replay timing report as JSON')
+    parser.add_argument('--baseline', metavar='JSON',
+                        help='compare the --replay timing report with one saved by --report')
+    parser.add_argument('--seed', type=int, default=0,
+                        help='seed of the random apple positions (default 0)')
+    return parser
+
+
+def apply_run_options(parser, options):
+    """Check parsed run options and fill in the defaults they imply.
+
+    Selects the dummy video driver for headless runs, which only takes effect
+    if SDL has not been initialised yet.
+    """
+    if options.record and options.replay:
+        parser.error('--record and --replay cannot be combined')
+    if (options.report or options.baseline) and not options.replay:
+        parser.error('--report and --baseline need --replay')
+    if options.replay:
+        # The log decides the frame count; the report needs the timings
+        options.headless = True
+        options.max_frames = None
+        if options.profile is None:
+            options.profile = os.path.splitext(options.replay)[0] + '.profile.csv'
+    elif options.headless and options.max_frames is None:
+        options.max_frames = DEFAULT_HEADLESS_FRAMES
+    if options.headless:
+        os.environ['SDL_VIDEODRIVER'] = 'dummy'
+        os.environ.setdefault('SDL_AUDIODRIVER', 'dummy')
+    return options
+
+
+class FrameExporter:
+    """Writes frames from a background thread as PNGs or one raw RGB stream."""
+
+    def __init__(self, path, size, fps, max_queued=QUEUE_FRAMES):
+        self.path = path
+        self.size = tuple(size)
+        self.raw = path.endswith('.rgb')
+        if self.raw:
+            self._fh = open(path, 'wb')
+            with open(path + '.json', 'w') as fh:
+                json.dump({'width': self.size[0], 'height': self.size[1],
+                           'fps': fps, 'pix_fmt': 'rgb24'}, fh)
+        else:
+            os.makedirs(path, exist_ok=True)
+            self._fh = None
+        self.frames_written = 0
+        self.error = None
+        # Bounded, so a slow disk throttles the producer instead of eating memory
+        self._queue = queue.Queue(maxsize=max_queued)
+        self._thread = threading.Thread(target=self._run, name='frame-exporter', daemon=True)
+        self._thread.start()
+
+    def submit(self, surface):
+        """Queue a copy of ``surface``; blocks while the encoder is behind."""
+        import pygame
+
+        if self.error is not None:
+            raise self.error
+        self._queue.put(pygame.image.tobytes(surface, 'RGB'))
+
+    def close(self):
+        self._queue.put(None)
+        self._thread.join()
+        if self._fh is not None:
+            self._fh.close()
+        if self.error is not None:
+            raise self.error
+
+    def _run(self):
+        while True:
+            pixels = self._queue.get()
+            if pixels is None:
+                return
+            if self.error is not None:
+                continue  # Keep draining so the producer never blocks forever
+            try:
+                self._write(pixels)
+            except Exception as exc:
+                self.error = exc
+
+    def _write(self, pixels):
+        if self.raw:
+            self._fh.write(pixels)
+        else:
+            import pygame
+
+            frame = pygame.image.frombytes(pixels, self.size, 'RGB')
+            pygame.image.save(frame, os.path.join(self.path, f'frame_{self.frames_written:06d}.png'))
+        self.frames_written += 1
+
+
+class FrameRunner:
+    """Frame clock for the main loop, capped in a window and uncapped headless.
+
+    ``tick`` returns the frame time to feed the physics.  ``now`` is the clock
+    that time-based refreshes (such as the live plot) should use: wall-clock
+    time in a window, simulated frame time when headless, so exported frames
+    do not depend on how fast the machine is.  When replaying, frame times
+    come from the log instead.
+
+    ``events`` replaces ``pygame.event.get()`` in the loops, so input can be
+    recorded or replayed.
+    """
+
+    def __init__(self, options, fps=60):
+        import pygame
+
+        from .replay import InputRecorder, InputReplay
+
+        self.options = options
+        self.fps = fps
+        self.headless = options.headless
+        self.frames = 0
+        self.clock = pygame.time.Clock()
+        self.exporter = None
+        self.started = time.perf_counter()
+        self.now = 0.0 if self.headless else self.started
+        self.recorder = InputRecorder(options.record, fps) if options.record else None
+        self.replay = None
+        if options.replay:
+            self.replay = InputReplay(options.replay)
+            self.replay.install()
+        self._frame_time = 0.0
+        self._events = []
+
+    @property
+    def done(self):
+        if self.replay is not None:
+            return self.replay.done
+        limit = self.options.max_frames
+        return limit is not None and self.frames >= limit
+
+    def tick(self):
+        if self.replay is not None:
+            frame_time, self._events = self.replay.next_frame()
+            self.now += frame_time
+        elif self.headless:
+            frame_time = 1.0 / self.fps
+            self.now += frame_time
+        else:
+            frame_time = self.clock.tick(self.fps) / 1000.0
+            self.now = time.perf_counter()
+        self._frame_time = frame_time
+        return frame_time
+
+    def events(self):
+        """This frame's input events: replayed, or live (and logged if recording)."""
+        import pygame
+
+        if self.replay is not None:
+            pygame.event.pump()
+            return self._events
+        events = pygame.event.get()
+        if self.recorder is not None:
+            self.recorder.record(self._frame_time, events)
+        return events
+
+    def capture(self, surface):
+        """Count a finished frame and queue it for export if requested."""
+        self.frames += 1
+        if self.options.frames is None:
+            return
+        if self.exporter is None:
+            self.exporter = FrameExporter(self.options.frames, surface.get_size(), self.fps)
+        self.exporter.submit(surface)
+
+    @property
+    def frames_per_second(self):
+        elapsed = time.perf_counter() - self.started
+        return self.frames / elapsed if elapsed > 0 else 0.0
+
+    def close(self):
+        """Flush the exporter and report the frame rate.
+
+        Call after ``FrameProfiler.close``: a replay reads its timings back
+        from the profile CSV.
+        """
+        if self.exporter is not None:
+            self.exporter.close()
+        if self.recorder is not None:
+            self.recorder.close()
+            print(f'{len(self.recorder.frames)} frames of input saved to {self.options.record}')
+        if self.replay is not None:
+            from .replay import format_report, timing_report
+
+            self.replay.uninstall()
+            report = timing_report(self.options.profile, self.frames, time.perf_counter() - self.started)
+            baseline = None
+            if self.options.baseline:
+                with open(self.options.baseline) as fh:
+                    baseline = json.load(fh)
+            print(format_report(report, baseline))
+            if self.options.report:
+                with open(self.options.report, 'w') as fh:
+                    json.dump(report, fh, indent=2)
+            return
+        fps = self.frames_per_second
+        report = f'{self.frames} frames at {fps:.1f} frames/s ({fps / self.fps:.1f}x real time)'
+        if self.exporter is not None:
+            report += f', saved to {self.options.frames}'
+        print(report)
@@ -0,0 +1,125 @@
+"""Persistent position/velocity plot rendered straight into a pygame surface.
+
+The figure is built once.  New samples are drawn on top of the previous frame
+as a short line segment, so a refresh costs the same no matter how long the
+run has been going.  The axes are only rebuilt when the data leaves the
+current limits, and the limits grow geometrically so that happens rarely.
+A rebuild draws the history downsampled to a few points per pixel column.
+"""
+import time
+
+import numpy as np
+import pygame
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from matplotlib.figure import Figure
+
+from .recorder import minmax_indices
+
+# Fraction by which an axis grows past the data when it has to be rescaled
+AXIS_HEADROOM = 0.5
+
+
+class LivePlot:
+    """Plots the ``t``/``position``/``velocity`` columns of a TrajectoryRecorder."""
+
+    def __init__(self, source, width, height, refresh_hz=15.0, dpi=100):
+        self.source = source
+        self.max_buckets = width
+        self.refresh_interval = 1.0 / refresh_hz
+        self.figure = Figure(figsize=(width / dpi, height / dpi), dpi=dpi)
+        self.canvas = FigureCanvasAgg(self.figure)
+        self.ax_pos, self.ax_vel = self.figure.subplots(2, 1)
+
+        self.ax_pos.set_xlabel('Time (s)')
+        self.ax_pos.set_ylabel('Position (m)')
+        self.ax_pos.set_title('Apple Position Over Time')
+        self.ax_vel.set_xlabel('Time (s)')
+        self.ax_vel.set_ylabel('Velocity (m/s)')
+        self.ax_vel.set_title('Apple Velocity Over Time')
+        for ax in (self.ax_pos, self.ax_vel):
+            ax.grid(True)
+            ax.set_autoscale_on(False)
+        self.figure.tight_layout()
+
+        # Lines are animated so canvas.draw() only paints the static axes
+        self.pos_line, = self.ax_pos.plot([], [], 'r-', animated=True)
+        self.vel_line, = self.ax_vel.plot([], [], 'b-', animated=True)
+
+        self.surface = None
+        self.version = 0  # Bumped on every render so callers know when to blit
+        self.reset()
+
+    def reset(self):
+        self.drawn = 0
+        self.needs_full_redraw = True
+        self.last_refresh = None
+        for ax in (self.ax_pos, self.ax_vel):
+            ax.set_xlim(0, 1)
+            ax.set_ylim(0, 1)
+
+    def update(self, now=None):
+        """Re-render if the refresh interval has passed; return the plot surface."""
+        if now is None:
+            now = time.perf_counter()
+        due = self.last_refresh is None or now - self.last_refresh >= self.refresh_interval
+        if due and (self.source.total != self.drawn or self.surface is None):
+            self.render()
+            self.last_refresh = now
+        return self.surface
+
+    def render(self):
+        self.draw()
+        # Wraps the Agg buffer directly, no copy and no trip through a PNG
+        self.surface = pygame.image.frombuffer(
+            self.canvas.buffer_rgba(), self.canvas.get_width_height(), 'RGBA')
+        return self.surface
+
+    def draw(self):
+        """Bring the Agg canvas up to date with the source."""
+        total = self.source.total
+        if total < self.drawn:
+            # The recorder was cleared behind our back
+            self.reset()
+        if not self.needs_full_redraw:
+            t, pos, vel = self.source.tail(total - self.drawn + 1)
+            self.needs_full_redraw = len(t) > 0 and (
+                _outside(self.ax_pos, t, pos) or _outside(self.ax_vel, t, vel))
+
+        if self.needs_full_redraw:
+            t = self.source.column('t')
+            pos = self.source.column('position')
+            vel = self.source.column('velocity')
+            self._rescale(t, pos, vel)
+            self.canvas.draw()
+            self.needs_full_redraw = False
+            keep = np.union1d(minmax_indices(pos, self.max_buckets), minmax_indices(vel, self.max_buckets))
+            t, pos, vel = t[keep], pos[keep], vel[keep]
+
+        # Incremental draws overlap the last sample so consecutive segments join up
+        self.pos_line.set_data(t, pos)
+        self.vel_line.set_data(t, vel)
+        self.ax_pos.draw_artist(self.pos_line)
+        self.ax_vel.draw_artist(self.vel_line)
+        self.drawn = total
+        self.version += 1
+
+    def _rescale(self, t, pos, vel):
+        if len(t) == 0:
+            return
+        _fit(self.ax_pos.set_xlim, 0.0, t.max())
+        _fit(self.ax_vel.set_xlim, 0.0, t.max())
+        _fit(self.ax_pos.set_ylim, pos.min(), pos.max())
+        _fit(self.ax_vel.set_ylim, vel.min(), vel.max())
+
+
+def _outside(ax, x, y):
+    x0, x1 = ax.get_xlim()
+    y0, y1 = ax.get_ylim()
+    return x.min() < x0 or x.max() > x1 or y.min() < y0 or y.max() > y1
+
+
+def _fit(set_lim, lo, hi):
+    # Limits always include zero and leave headroom on the side the data grows
+    lo, hi = min(lo, 0.0), max(hi, 0.0)
+    pad = AXIS_HEADROOM * max(hi - lo, 1e-3)
+    set_lim(lo - pad if lo < 0 else 0.0, hi + pad if hi > 0 or lo == 0 else 0.0)
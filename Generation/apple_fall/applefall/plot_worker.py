@@ -0,0 +1,182 @@
+"""Live plot rendered by a worker process, off the pygame thread.
+
+``LivePlot`` is cheap per refresh, but it still runs inside the main loop,
+so any hiccup in matplotlib shows up as a dropped frame.  ``PlotWorker`` has
+the same ``update``/``reset``/``version``/``surface`` interface, but the
+drawing happens in a separate process: no GIL to share, and matplotlib never
+runs on two threads.
+
+Samples go one way through shared memory.  The main loop copies the samples
+added to its recorder since the last frame into a ring (``capacity`` per
+field).  Each refresh it queues a request naming the sample count, so the
+worker can bring a private recorder up to date with those samples.  Frames
+come back through three shared RGB buffers.  The worker renders into a
+buffer the main loop has released, and queues its index.  The main loop
+polls without blocking, blits the newest frame, and releases every frame it
+has taken, stale ones included.
+
+Nothing queues up.  The worker drains its requests and renders only the
+latest.  Frames from before a ``reset`` are dropped.  If the worker falls
+behind, the main loop keeps showing the last frame and never waits.  The
+ring must hold all samples added between two refreshes; at the physics rate
+that is a few hundred.
+
+The worker is forked where the platform allows, so the scripts need no
+``__main__`` guard.  Create it before starting other threads.
+"""
+import multiprocessing as mp
+import queue
+import time
+from multiprocessing import shared_memory
+
+import numpy as np
+import pygame
+
+from .live_plot import LivePlot
+from .recorder import TrajectoryRecorder
+
+FRAME_BUFFERS = 3
+RING_CAPACITY = 65536
+
+
+def _context():
+    return mp.get_context('fork' if 'fork' in mp.get_all_start_methods() else 'spawn')
+
+
+class PlotWorker:
+    def __init__(self, source, width, height, refresh_hz=15.0, dpi=100, capacity=RING_CAPACITY):
+        self.source = source
+        self.size = (width, height)
+        self.refresh_interval = 1.0 / refresh_hz
+        self.capacity = capacity
+        fields = len(source.fields)
+        self._ring_memory = shared_memory.SharedMemory(create=True, size=fields * capacity * 8)
+        self._frame_memory = shared_memory.SharedMemory(create=True, size=FRAME_BUFFERS * width * height * 3)
+        self._ring = np.ndarray((fields, capacity), dtype=np.float64, buffer=self._ring_memory.buf)
+        self._frames = np.ndarray((FRAME_BUFFERS, height, width, 3), dtype=np.uint8,
+                                  buffer=self._frame_memory.buf)
+
+        context = _context()
+        self._requests = context.Queue()
+        self._results = context.Queue()
+        self._process = context.Process(
+            target=_run, name='plot-worker', daemon=True,
+            args=(self._ring_memory, self._frame_memory, source.fields, width, height,
+                  dpi, capacity, self._requests, self._results))
+        self._process.start()
+
+        self.surface = None
+        self.version = 0  # Bumped whenever a new frame arrives
+        self.generation = 0
+        self.pushed = 0
+        self.requested = 0
+        self.last_request = None
+        self.dropped_frames = 0
+
+    def reset(self):
+        """Start over with an empty plot; frames still in flight are dropped."""
+        self.generation += 1
+        self.pushed = self.requested = 0
+        self.last_request = None
+
+    def update(self, now=None):
+        """Share new samples, ask for a frame when due, and return the newest surface."""
+        if now is None:
+            now = time.perf_counter()
+        if self.source.total < self.pushed:
+            # The recorder was cleared behind our back
+            self.reset()
+        self._push()
+        due = self.last_request is None or now - self.last_request >= self.refresh_interval
+        if due and (self.pushed != self.requested or self.last_request is None):
+            self._requests.put(('render', self.generation, self.pushed))
+            self.requested = self.pushed
+            self.last_request = now
+        self._receive()
+        return self.surface
+
+    def _push(self):
+        total = self.source.total
+        count = min(total - self.pushed, self.capacity, len(self.source))
+        if count > 0:
+            slots = np.arange(total - count, total) % self.capacity
+            self._ring[:, slots] = self.source.tail(count)
+        self.pushed = total
+
+    def _receive(self):
+        latest = None
+        while True:
+            try:
+                index, generation = self._results.get_nowait()
+            except queue.Empty:
+                break
+            if latest is not None:
+                self._requests.put(('release', latest))
+                self.dropped_frames += 1
+            if generation != self.generation:
+                self._requests.put(('release', index))
+                continue
+            latest = index
+        if latest is None:
+            return
+        if self.surface is None:
+            self.surface = pygame.Surface(self.size)
+        # Copy out of the shared buffer so the worker can reuse it at once
+        self.surface.blit(pygame.image.frombuffer(self._frames[latest], self.size, 'RGB'), (0, 0))
+        self._requests.put(('release', latest))
+        self.version += 1
+
+    def close(self):
+        self._requests.put(('close',))
+        self._process.join(timeout=2.0)
+        if self._process.is_alive():
+            self._process.terminate()
+        for memory in (self._ring_memory, self._frame_memory):
+            memory.close()
+            memory.unlink()
+
+
+def _run(ring_memory, frame_memory, fields, width, height, dpi, capacity, requests, results):
+    """Worker loop: coalesce requests, render the newest, hand back frames."""
+    ring = np.ndarray((len(fields), capacity), dtype=np.float64, buffer=ring_memory.buf)
+    frames = np.ndarray((FRAME_BUFFERS, height, width, 3), dtype=np.uint8, buffer=frame_memory.buf)
+    recorder = TrajectoryRecorder(fields, capacity=capacity)
+    plot = LivePlot(recorder, width, height, dpi=dpi)
+    free = list(range(FRAME_BUFFERS))
+    generation, read, pending = 0, 0, None
+    try:
+        while True:
+            # Wait for work, then take everything else that is already queued
+            messages = [requests.get()]
+            while True:
+                try:
+                    messages.append(requests.get_nowait())
+                except queue.Empty:
+                    break
+            for message in messages:
+                if message[0] == 'close':
+                    return
+                if message[0] == 'release':
+                    free.append(message[1])
+                else:
+                    pending = message[1:]
+            if pending is None or not free:
+                continue
+
+            request_generation, total = pending
+            pending = None
+            if request_generation != generation:
+                generation, read = request_generation, 0
+                recorder.clear()
+                plot.reset()
+            start = max(read, total - capacity)
+            if total > start:
+                recorder.extend(*ring[:, np.arange(start, total) % capacity])
+            read = total
+            plot.draw()
+            index = free.pop()
+            frames[index] = np.asarray(plot.canvas.buffer_rgba())[:, :, :3]
+            results.put((index, generation))
+    finally:
+        ring_memory.close()
+        frame_memory.close()
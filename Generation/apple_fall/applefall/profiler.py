@@ -0,0 +1,147 @@
+"""Per-phase frame timing for the pygame main loops.
+
+The loop calls ``start_frame`` once per frame and ``mark(phase)`` after each
+phase; a mark charges the time since the previous one to that phase.  That
+is one ``perf_counter`` call and one array store per phase, cheap enough to
+leave on all the time.  Timings go into a preallocated ring of frames, so the
+rolling p50/p99 shown by ``ProfilerHUD`` always covers the newest frames.
+With a CSV path every frame is also written out, one row per frame and one
+column per phase, in blocks as the ring fills up.
+"""
+import csv
+import time
+
+import numpy as np
+import pygame
+
+from .widgets import Widget
+
+# Frames kept for the rolling statistics (and written to CSV per block)
+WINDOW_FRAMES = 600
+HUD_REFRESH_S = 0.25
+HUD_BACKGROUND = (0, 0, 0, 170)
+HUD_TEXT = (255, 255, 255)
+TOGGLE_KEY = pygame.K_F3
+
+
+class FrameProfiler:
+    def __init__(self, phases, window=WINDOW_FRAMES, csv_path=None):
+        self.phases = tuple(phases)
+        self._column = {name: i for i, name in enumerate(self.phases)}
+        # Seconds per phase, plus a final column with the whole frame
+        self.times = np.zeros((window, len(self.phases) + 1))
+        self.frames = 0
+        self._row = None
+        self._flushed = 0
+        self._csv = None
+        if csv_path is not None:
+            self._fh = open(csv_path, 'w', newline='')
+            self._csv = csv.writer(self._fh)
+            self._csv.writerow(['frame'] + [f'{name}_ms' for name in self.phases] + ['total_ms'])
+
+    def start_frame(self):
+        now = time.perf_counter()
+        if self._row is not None:
+            self._finish(now)
+        if self.frames - self._flushed == len(self.times):
+            self.flush()
+        self._row = self.times[self.frames % len(self.times)]
+        self._row[:] = 0.0
+        self._frame_start = self._last = now
+
+    def mark(self, phase):
+        """Charge the time since the previous mark to ``phase``."""
+        now = time.perf_counter()
+        self._row[self._column[phase]] += now - self._last
+        self._last = now
+
+    def _finish(self, now):
+        self._row[-1] = now - self._frame_start
+        self._row = None
+        self.frames += 1
+
+    def recent(self):
+        """Timings of the frames in the rolling window, oldest first (seconds)."""
+        n = min(self.frames, len(self.times))
+        start = self.frames % len(self.times)
+        return np.roll(self.times, -start, axis=0)[-n:] if n else self.times[:0]
+
+    def percentiles(self, q=(50, 99)):
+        """Per-phase percentiles in milliseconds, shape ``(len(q), phases + 1)``."""
+        recent = self.recent()
+        if len(recent) == 0:
+            return np.zeros((len(q), self.times.shape[1]))
+        return np.percentile(recent, q, axis=0) * 1000.0
+
+    def flush(self):
+        """Write the frames finished since the last flush to the CSV file."""
+        if self._csv is None:
+            self._flushed = self.frames
+            return
+        window = len(self.times)
+        for frame in range(self._flushed, self.frames):
+            row = self.times[frame % window] * 1000.0
+            self._csv.writerow([frame] + [f'{ms:.4f}' for ms in row])
+        self._flushed = self.frames
+        self._fh.flush()
+
+    def close(self):
+        if self._row is not None:
+            self._finish(time.perf_counter())
+        if self._csv is not None:
+            self.flush()
+            self._fh.close()
+            self._csv = None
+
+
+class ProfilerHUD(Widget):
+    """Overlay with rolling p50/p99 per phase, toggled with F3.
+
+    The numbers are refreshed a few times a second, not every frame, so the
+    overlay does not show up in the timings it reports.
+    """
+
+    def __init__(self, profiler, font, pos=(10, 10)):
+        super().__init__()
+        self.profiler = profiler
+        self.font = font
+        self.pos = pos
+        self.visible = False
+        self.lines = []
+        self.last_refresh = None
+
+    def handle_event(self, event):
+        if event.type == pygame.KEYDOWN and event.key == TOGGLE_KEY:
+            self.visible = not self.visible
+            self.last_refresh = None
+            self.dirty = True
+
+    def refresh(self, now=None):
+        """Recompute the statistics if the overlay is shown and they are stale."""
+        if not self.visible:
+            return
+        if now is None:
+            now = time.perf_counter()
+        if self.last_refresh is not None and now - self.last_refresh < HUD_REFRESH_S:
+            return
+        self.last_refresh = now
+        p50, p99 = self.profiler.percentiles()
+        names = self.profiler.phases + ('frame',)
+        width = max(len(name) for name in names)
+        self.lines = [f"{'phase':<{width}}   p50 ms   p99 ms"]
+        self.lines += [f'{name:<{width}} {a:8.2f} {b:8.2f}' for name, a, b in zip(names, p50, p99)]
+        self.dirty = True
+
+    def paint(self, screen):
+        if not self.visible or not self.lines:
+            return pygame.Rect(self.pos, (0, 0))
+        surfaces = [self.font.render(line, True, HUD_TEXT) for line in self.lines]
+        width = max(s.get_width() for s in surfaces) + 12
+        height = sum(s.get_height() for s in surfaces) + 12
+        panel = pygame.Surface((width, height), pygame.SRCALPHA)
+        panel.fill(HUD_BACKGROUND)
+        y = 6
+        for surface in surfaces:
+            panel.blit(surface, (6, y))
+            y += surface.get_height()
+        return screen.blit(panel, self.pos)
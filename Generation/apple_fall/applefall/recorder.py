@@ -0,0 +1,141 @@
+"""Columnar trajectory storage and shape-preserving downsampling.
+
+``TrajectoryRecorder`` keeps one preallocated NumPy row per field.  Without a
+capacity it grows chunk by chunk and never drops samples; with a capacity it
+is a ring buffer that keeps only the newest samples.  The downsamplers return
+indices so any column can be reduced the same way, letting plots and exports
+touch a number of points proportional to the screen, not to the history.
+"""
+import numpy as np
+
+DEFAULT_FIELDS = ('t', 'position', 'velocity')
+
+
+class TrajectoryRecorder:
+    def __init__(self, fields=DEFAULT_FIELDS, capacity=None, chunk_size=4096, dtype=np.float64):
+        self.fields = tuple(fields)
+        self.capacity = capacity
+        self.chunk_size = capacity or chunk_size
+        self.dtype = dtype
+        self._index = {name: i for i, name in enumerate(self.fields)}
+        self.clear()
+
+    def __len__(self):
+        """Number of samples currently held."""
+        if self.capacity is not None:
+            return min(self.total, self.capacity)
+        return self.total
+
+    def clear(self):
+        self._chunks = [self._new_chunk()]
+        self._fill = 0  # samples in the last chunk, or the ring write position
+        self.total = 0  # samples ever appended, including dropped ones
+
+    def append(self, *values):
+        """Append one sample, given in field order."""
+        chunk = self._chunks[-1]
+        if self._fill == self.chunk_size:
+            if self.capacity is None:
+                chunk = self._new_chunk()
+                self._chunks.append(chunk)
+            self._fill = 0
+        chunk[:, self._fill] = values
+        self._fill += 1
+        self.total += 1
+
+    def extend(self, *columns):
+        """Append many samples at once, one array per field."""
+        block = np.asarray(np.broadcast_arrays(*columns), dtype=self.dtype)
+        if self.capacity is not None and block.shape[1] > self.capacity:
+            self.total += block.shape[1] - self.capacity
+            block = block[:, -self.capacity:]
+        while block.shape[1]:
+            if self._fill == self.chunk_size:
+                if self.capacity is None:
+                    self._chunks.append(self._new_chunk())
+                self._fill = 0
+            n = min(block.shape[1], self.chunk_size - self._fill)
+            self._chunks[-1][:, self._fill:self._fill + n] = block[:, :n]
+            self._fill += n
+            self.total += n
+            block = block[:, n:]
+
+    def column(self, name):
+        """All held samples of one field, oldest first."""
+        return self.tail(len(self), name)
+
+    def columns(self):
+        return {name: self.column(name) for name in self.fields}
+
+    def tail(self, count, name=None):
+        """The newest ``count`` samples, as one column or as a (fields, count) array."""
+        count = min(count, len(self))
+        row = slice(None) if name is None else self._index[name]
+        if self.capacity is not None:
+            ring = self._chunks[0]
+            start = self._fill - count
+            if start >= 0:
+                return ring[row, start:self._fill].copy()
+            return np.concatenate((ring[row, start:], ring[row, :self._fill]), axis=-1)
+
+        parts = []
+        remaining = count
+        for i in range(len(self._chunks) - 1, -1, -1):
+            if remaining == 0:
+                break
+            filled = self._fill if i == len(self._chunks) - 1 else self.chunk_size
+            n = min(remaining, filled)
+            parts.append(self._chunks[i][row, filled - n:filled])
+            remaining -= n
+        if not parts:
+            return np.empty((len(self.fields), 0) if name is None else 0, dtype=self.dtype)
+        return np.concatenate(parts[::-1], axis=-1)
+
+    def _new_chunk(self):
+        return np.empty((len(self.fields), self.chunk_size), dtype=self.dtype)
+
+
+def minmax_indices(y, buckets):
+    """Indices of the minimum and maximum of ``y`` in each of ``buckets`` slices.
+
+    Keeps every spike visible at twice the bucket count; a good fit for line
+    plots where each bucket is one pixel column.
+    """
+    n = len(y)
+    if n <= 2 * buckets:
+        return np.arange(n)
+    size = -(-n // buckets)
+    padded = np.empty(size * buckets, dtype=y.dtype)
+    padded[:n] = y
+    padded[n:] = y[-1]
+    padded = padded.reshape(buckets, size)
+    offsets = np.arange(buckets) * size
+    lo = padded.argmin(axis=1) + offsets
+    hi = padded.argmax(axis=1) + offsets
+    return np.unique(np.clip(np.concatenate(([0], lo, hi, [n - 1])), 0, n - 1))
+
+
+def lttb_indices(x, y, threshold):
+    """Largest-Triangle-Three-Buckets downsampling to ``threshold`` points.
+
+    Each bucket keeps the point that forms the largest triangle with the point
+    chosen in the previous bucket and the mean of the next bucket.  The loop
+    runs once per output point and each iteration is vectorized over a bucket.
+    """
+    n = len(x)
+    if threshold >= n or threshold < 3:
+        return np.arange(n)
+    edges = np.linspace(1, n - 1, threshold - 1).astype(np.int64)
+    selected = np.empty(threshold, dtype=np.int64)
+    selected[0] = 0
+    selected[-1] = n - 1
+    a = 0
+    for i in range(threshold - 2):
+        lo, hi = edges[i], edges[i + 1]
+        nlo, nhi = edges[i + 1], edges[i + 2] if i + 2 < len(edges) else n
+        avg_x = x[nlo:nhi].mean()
+        avg_y = y[nlo:nhi].mean()
+        area = np.abs((x[a] - avg_x) * (y[lo:hi] - y[a]) - (x[a] - x[lo:hi]) * (avg_y - y[a]))
+        a = lo + int(area.argmax())
+        selected[i + 1] = a
+    return selected
@@ -0,0 +1,197 @@
+"""Record a session's input and replay it headlessly for benchmarks.
+
+The loops react to live mouse input.  Sliders read mouse events, and buttons
+poll ``pygame.mouse.get_pressed()`` every frame, so two runs are never the
+same session and their timings cannot be compared.  With ``--record PATH``
+a script logs, per frame, its frame time, the mouse position and buttons,
+and the input events it received.  ``--replay PATH`` runs headless and as
+fast as it can.  It feeds the recorded events back through
+``FrameRunner.events()`` and answers ``pygame.mouse.get_pos`` and
+``get_pressed`` from the log.  It also advances the physics by the recorded
+frame times, so the simulation follows the original session exactly.
+
+A log is a compressed ``.npz`` of two small structured arrays: one row per
+frame and one row per input event.  Window and focus events are not kept,
+since they mean nothing headless.
+
+A replay writes the per-frame phase timings to its ``--profile`` CSV.  By
+default that is the log path with ``.profile.csv``.  At the end it prints a
+per-phase report (mean, p50, p99 and total, in ms).  With ``--report PATH``
+the report is also saved as JSON, and with ``--baseline PATH`` each phase is
+compared with a report saved that way, e.g. by another build on the same
+log::
+
+    python -m applefall headless --scene plot --replay session.npz --report old.json
+    python -m applefall headless --scene plot --replay session.npz --baseline old.json
+"""
+import csv
+import json
+from functools import lru_cache
+
+import numpy as np
+
+VERSION = 1
+
+FRAME_DTYPE = np.dtype([
+    ('frame_time', '<f8'),
+    ('mouse_x', '<i4'),
+    ('mouse_y', '<i4'),
+    ('buttons', 'u1'),  # bit i set while mouse button i + 1 is held
+])
+EVENT_DTYPE = np.dtype([
+    ('frame', '<i4'),
+    ('type', '<i4'),
+    ('values', '<i4', (5,)),
+])
+
+
+@lru_cache(maxsize=None)
+def event_fields():
+    """Attributes kept per event type, in the order they are packed into ``values``.
+
+    Keyed by pygame's event constants, so pygame is only loaded once a log
+    is recorded or replayed, not to read a report.
+    """
+    import pygame
+
+    return {
+        pygame.QUIT: (),
+        pygame.KEYDOWN: ('key', 'mod', 'scancode'),
+        pygame.KEYUP: ('key', 'mod', 'scancode'),
+        pygame.MOUSEBUTTONDOWN: ('pos', 'button'),
+        pygame.MOUSEBUTTONUP: ('pos', 'button'),
+        pygame.MOUSEMOTION: ('pos', 'rel', 'buttons'),
+        pygame.MOUSEWHEEL: ('x', 'y'),
+    }
+
+
+def _pack(event):
+    values = []
+    for name in event_fields()[event.type]:
+        value = getattr(event, name, 0)
+        if name == 'buttons':
+            value = sum(1 << i for i, held in enumerate(value) if held)
+        values.extend(value if isinstance(value, tuple) else (value,))
+    return values + [0] * (5 - len(values))
+
+
+def _unpack(kind, values):
+    import pygame
+
+    attributes, i = {}, 0
+    for name in event_fields()[kind]:
+        if name in ('pos', 'rel'):
+            attributes[name] = (int(values[i]), int(values[i + 1]))
+            i += 2
+        elif name == 'buttons':
+            attributes[name] = tuple(bool(values[i] >> b & 1) for b in range(3))
+            i += 1
+        else:
+            attributes[name] = int(values[i])
+            i += 1
+    return pygame.event.Event(kind, attributes)
+
+
+class InputRecorder:
+    def __init__(self, path, fps):
+        self.path = path
+        self.fps = fps
+        self.frames = []
+        self.events = []
+
+    def record(self, frame_time, events):
+        """Log one frame: its frame time, the mouse now, and ``events``."""
+        import pygame
+
+        fields = event_fields()
+        x, y = pygame.mouse.get_pos()
+        buttons = sum(1 << i for i, held in enumerate(pygame.mouse.get_pressed()) if held)
+        frame = len(self.frames)
+        self.frames.append((frame_time, x, y, buttons))
+        for event in events:
+            if event.type in fields:
+                self.events.append((frame, event.type, _pack(event)))
+
+    def close(self):
+        meta = json.dumps({'version': VERSION, 'fps': self.fps})
+        with open(self.path, 'wb') as fh:
+            np.savez_compressed(fh, meta=np.array(meta), frames=np.array(self.frames, dtype=FRAME_DTYPE),
+                                events=np.array(self.events, dtype=EVENT_DTYPE))
+
+
+class InputReplay:
+    """Plays a log back frame by frame, standing in for the mouse."""
+
+    def __init__(self, path):
+        with np.load(path) as data:
+            meta = json.loads(str(data['meta']))
+            if meta['version'] != VERSION:
+                raise ValueError(f"unsupported input log version {meta['version']}")
+            self.fps = meta['fps']
+            self.frames = data['frames']
+            self.events = data['events']
+        # Events of frame i are events[starts[i]:starts[i + 1]]
+        self.starts = np.searchsorted(self.events['frame'], np.arange(len(self.frames) + 1))
+        self.frame = 0
+        self.mouse_pos = (0, 0)
+        self.mouse_pressed = (False, False, False)
+        self._saved = None
+
+    def __len__(self):
+        return len(self.frames)
+
+    @property
+    def done(self):
+        return self.frame >= len(self.frames)
+
+    def next_frame(self):
+        """Frame time and events of the next frame; the mouse moves to its state."""
+        row = self.frames[self.frame]
+        self.mouse_pos = (int(row['mouse_x']), int(row['mouse_y']))
+        self.mouse_pressed = tuple(bool(row['buttons'] >> b & 1) for b in range(3))
+        events = self.events[self.starts[self.frame]:self.starts[self.frame + 1]]
+        self.frame += 1
+        return float(row['frame_time']), [_unpack(int(e['type']), e['values']) for e in events]
+
+    def install(self):
+        """Answer ``pygame.mouse.get_pos``/``get_pressed`` from the log."""
+        import pygame
+
+        self._saved = pygame.mouse.get_pos, pygame.mouse.get_pressed
+        pygame.mouse.get_pos = lambda: self.mouse_pos
+        pygame.mouse.get_pressed = lambda num_buttons=3: self.mouse_pressed
+
+    def uninstall(self):
+        import pygame
+
+        if self._saved is not None:
+            pygame.mouse.get_pos, pygame.mouse.get_pressed = self._saved
+            self._saved = None
+
+
+def timing_report(profile_path, frames, seconds):
+    """Per-phase statistics (ms) of a profiler CSV, plus the run's frame rate."""
+    with open(profile_path, newline='') as fh:
+        rows = list(csv.reader(fh))
+    header, values = rows[0][1:], np.array(rows[1:], dtype=np.float64)[:, 1:]
+    phases = {}
+    for name, column in zip(header, values.T if len(values) else np.zeros((len(header), 0))):
+        if len(column) == 0:
+            continue
+        p50, p99 = np.percentile(column, (50, 99))
+        phases[name[:-len('_ms')]] = {'mean': column.mean(), 'p50': p50, 'p99': p99, 'total': column.sum()}
+    return {'frames': frames, 'seconds': seconds, 'frames_per_second': frames / seconds if seconds else 0.0,
+            'phases': phases}
+
+
+def format_report(report, baseline=None):
+    """A table of the report, with the change from ``baseline`` if given."""
+    lines = [f"{report['frames']} frames in {report['seconds']:.2f}s ({report['frames_per_second']:.1f} frames/s)"]
+    lines.append(f"{'phase':<10}{'mean':>9}{'p50':>9}{'p99':>9}{'total':>10}" + ('   vs baseline' if baseline else ''))
+    for name, stats in report['phases'].items():
+        line = f"{name:<10}{stats['mean']:>9.3f}{stats['p50']:>9.3f}{stats['p99']:>9.3f}{stats['total']:>10.1f}"
+        old = baseline['phases'].get(name) if baseline else None
+        if old and old['total'] > 0:
+            line += f"   {100.0 * (stats['total'] / old['total'] - 1):+6.1f}%"
+        lines.append(line)
+    return '\n'.join(lines)
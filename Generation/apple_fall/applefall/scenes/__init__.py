@@ -0,0 +1,37 @@
+"""The apple_fall scenes, each a pygame main loop behind ``run(options)``.
+
+``drop``
+    one apple dropped from the top of the window (``apple_fall(2D).py``).
+``pile``
+    hundreds of apples dropped together, colliding as they pile up.
+``plot``
+    one apple beside a live position/velocity plot (``apple_fall(2D_plot).py``).
+``plot-metric``
+    the same in metric units, with a 1x/0.5x speed toggle
+    (``apple_fall(2DplotClaude).py``).
+``controller``
+    one apple with gravity and timeline sliders (``apple_fall(2Dcontroller).py``).
+
+``options`` are the run options that ``cli`` parses with
+``headless.add_run_options`` and checks with ``headless.apply_run_options``.
+A scene module imports pygame, and the plot scenes also matplotlib, so the
+module is only loaded by ``run`` once that scene is about to start.
+"""
+import importlib
+
+# Scene name: (module, keyword arguments of its run)
+SCENES = {
+    'drop': ('drop', {'variant': 'drop'}),
+    'pile': ('drop', {'variant': 'pile'}),
+    'plot': ('plot', {'variant': 'plot'}),
+    'plot-metric': ('plot', {'variant': 'plot-metric'}),
+    'controller': ('controller', {}),
+}
+DEFAULT_SCENE = 'plot'
+
+
+def run(name, options):
+    if name not in SCENES:
+        raise ValueError(f'unknown scene {name!r}, expected one of {tuple(SCENES)}')
+    module, kwargs = SCENES[name]
+    return importlib.import_module(f'.{module}', __name__).run(options, **kwargs)
@@ -0,0 +1,195 @@
+"""One apple with a gravity slider and a timeline slider to scrub through the fall."""
+import time
+
+import pygame
+
+from ..engine import FallEngine
+from ..events import EventTimeline
+from ..headless import FrameRunner
+from ..profiler import FrameProfiler, ProfilerHUD
+from ..sprites import BodySprite
+from ..timestep import FixedStepper
+from ..widgets import Button, Slider, TextCache
+
+# Constants
+SCREEN_WIDTH = 800
+SCREEN_HEIGHT = 600
+WHITE = (255, 255, 255)
+RED = (255, 0, 0)
+BLACK = (0, 0, 0)
+FPS = 60
+GRAVITY_MIN = 0.1  # Gravity in pixels/frame^2 at 60 fps
+GRAVITY_MAX = 0.5  # Lower gravity to slow down the fall
+GRAVITY_STEP = 0.05
+TIMELINE_STEP = 0.01  # Seconds per step of the timeline slider
+FLOOR = 460
+
+
+# Apple class
+class Apple(BodySprite):
+    def __init__(self, engine):
+        super().__init__(engine, 10, RED, FLOOR)  # Make the apple smaller
+        self.reset()
+
+    @property
+    def velocity_y(self):
+        return -self.velocity  # Screen y grows downwards
+
+    def reset(self):
+        self.place(SCREEN_WIDTH // 2, 0)  # Start from the top, in the middle
+        self.start_time = time.time()
+        self.time_stopped = None
+
+    def update(self, heights=None):
+        super().update(heights)
+        if self.time_stopped is None and self.stopped:
+            self.time_stopped = time.time()
+
+    def get_time_elapsed(self):
+        if self.time_stopped:
+            return min(time.time() - self.start_time, self.time_stopped - self.start_time + 5)
+        else:
+            return time.time() - self.start_time
+
+
+def run(options):
+    # Initialize Pygame and set up the display
+    pygame.init()
+    screen = pygame.display.set_mode((SCREEN_WIDTH, SCREEN_HEIGHT))
+    pygame.display.set_caption('Apple Fall Simulation')
+
+    # Font for buttons and text
+    font = pygame.font.Font(None, 36)
+    text_cache = TextCache(font)
+
+    # Action functions
+    def restart_action():
+        nonlocal time_scale
+        apple.reset()
+        stepper.reset()
+        rebuild_timeline()
+        time_scale = 1.0
+
+    def slow_down_action():
+        nonlocal time_scale
+        time_scale *= 0.5  # Physics sub-steps at the same fixed dt, just fewer per frame
+
+    def rebuild_timeline():
+        """Solve the rest of the fall in closed form for the timeline slider."""
+        nonlocal timeline, timeline_gravity
+        timeline_gravity = gravity_slider.value
+        timeline = EventTimeline(engine, timeline_gravity * FPS ** 2)
+        time_slider.min_val = timeline.start
+        time_slider.max_val = max(timeline.end_time, timeline.start + TIMELINE_STEP)
+
+    def scrub(t):
+        """Jump the engine to simulated time ``t`` without stepping."""
+        timeline.sync(engine, t)
+        stepper.prev_y = engine.y[:engine.count].copy()
+        stepper.accumulator = 0.0
+
+    # Create the simulation engine and an apple
+    engine = FallEngine()
+    apple = Apple(engine)
+    stepper = FixedStepper(engine)
+    time_scale = 1.0
+
+    # Create buttons
+    buttons = [
+        Button(50, 500, 200, 50, 'Restart', restart_action, text_cache),
+        Button(300, 500, 200, 50, 'Slow Down', slow_down_action, text_cache)
+    ]
+
+    # Create slider
+    gravity_slider = Slider(550, 510, 200, GRAVITY_MIN, GRAVITY_MAX, GRAVITY_STEP)
+
+    # Timeline slider: drag to scrub through the fall, which is solved ahead of
+    # time event by event and looked up instead of re-simulated
+    time_slider = Slider(50, 570, 700, 0.0, 1.0, TIMELINE_STEP)
+    timeline = timeline_gravity = None
+    rebuild_timeline()
+
+    # Create a sprite group
+    all_sprites = pygame.sprite.Group()
+    all_sprites.add(apple)
+
+    # Per-phase frame timings; F3 shows the rolling p50/p99
+    profiler = FrameProfiler(('tick', 'events', 'physics', 'sprites', 'widgets', 'display', 'export'),
+                             csv_path=options.profile)
+    profiler_hud = ProfilerHUD(profiler, pygame.font.SysFont('monospace', 16), pos=(SCREEN_WIDTH - 330, 10))
+
+    # Main loop
+    running = True
+    runner = FrameRunner(options, FPS)
+
+    while running:
+        profiler.start_frame()
+        # Cap the frame rate (uncapped when headless); physics runs at its own fixed rate
+        frame_time = runner.tick()
+        profiler.mark('tick')
+
+        for event in runner.events():
+            if event.type == pygame.QUIT:
+                running = False
+            gravity_slider.handle_event(event)
+            time_slider.handle_event(event)
+            profiler_hud.handle_event(event)
+        profiler.mark('events')
+
+        # Update the apple, or follow the timeline while it is being dragged
+        if gravity_slider.value != timeline_gravity:
+            rebuild_timeline()
+        if time_slider.dragging:
+            scrub(time_slider.value)
+        else:
+            stepper.advance(frame_time, gravity_slider.value * FPS ** 2, time_scale)
+            time_slider.value = min(engine.time, time_slider.max_val)
+        profiler.mark('physics')
+        all_sprites.update(stepper.interpolated_heights())
+
+        # Clear the screen
+        screen.fill(WHITE)
+
+        # Draw all sprites
+        all_sprites.draw(screen)
+        profiler.mark('sprites')
+
+        # Draw buttons; the whole frame is repainted, so no widget is erased first
+        for button in buttons:
+            button.hover = button.rect.collidepoint(pygame.mouse.get_pos())
+            button.paint(screen)
+            button.check_click()
+
+        # Draw sliders
+        gravity_slider.paint(screen)
+        time_slider.paint(screen)
+
+        # Draw the floor
+        pygame.draw.rect(screen, BLACK, (0, FLOOR, SCREEN_WIDTH, 2))
+
+        # Display time, position, and velocity
+        elapsed_time = apple.get_time_elapsed()
+        screen.blit(text_cache.render(f"Gravity: {gravity_slider.value:.2f}"), (550, 480))
+        screen.blit(text_cache.render(f"Time: {elapsed_time:.2f}s"), (50, 50))
+        screen.blit(text_cache.render(f"Position: ({apple.rect.x}, {apple.rect.y})"), (50, 100))
+        screen.blit(text_cache.render(f"Velocity: {apple.velocity_y / FPS:.2f}"), (50, 150))
+
+        # Frame timing overlay
+        profiler_hud.refresh(runner.now)
+        if profiler_hud.visible:
+            profiler_hud.paint(screen)
+        profiler.mark('widgets')
+
+        # Flip the display
+        pygame.display.flip()
+        profiler.mark('display')
+
+        # Save the frame and stop once a headless run has rendered enough
+        runner.capture(screen)
+        profiler.mark('export')
+        if runner.done:
+            running = False
+
+    profiler.close()
+    runner.close()
+    pygame.quit()
@@ -0,0 +1,126 @@
+"""Apples dropped from the top of the window.
+
+``variant='drop'`` drops one apple at a random x (the original
+``apple_fall(2D).py``).  ``'pile'`` drops ``APPLE_COUNT`` apples in loose
+rows stacked above the window, colliding as they pile up.  ``options.seed``
+seeds the random positions, so a run and its replay see the same apples.
+"""
+import random
+
+import pygame
+
+from ..collision import CollisionWorld
+from ..engine import FallEngine
+from ..headless import FrameRunner
+from ..profiler import FrameProfiler, ProfilerHUD
+from ..sprites import BodySprite
+from ..timestep import FixedStepper
+
+VARIANTS = ('drop', 'pile')
+
+# Constants
+SCREEN_WIDTH = 800
+SCREEN_HEIGHT = 600
+WHITE = (255, 255, 255)
+RED = (255, 0, 0)
+FPS = 60
+APPLE_SIZE = 20
+APPLE_COUNT = 800
+GRAVITY = 0.5 * FPS ** 2  # pixels/s^2, i.e. 0.5 pixels/frame^2 at 60 fps
+
+
+# Apple class
+class Apple(BodySprite):
+    def __init__(self, engine, x, y):
+        super().__init__(engine, APPLE_SIZE, RED, SCREEN_HEIGHT)
+        self.place(x, y)
+
+    @property
+    def velocity_y(self):
+        return -self.velocity  # Screen y grows downwards
+
+
+# Drop the apples in loose rows stacked above the screen so none overlap
+def spawn_positions(count, rng):
+    per_row = SCREEN_WIDTH // (APPLE_SIZE + 5)
+    for i in range(count):
+        row, column = divmod(i, per_row)
+        x = column * (APPLE_SIZE + 5) + rng.randint(0, 4)
+        y = -row * (APPLE_SIZE + 5) - rng.randint(0, 4)
+        yield x, y
+
+
+def run(options, variant='drop'):
+    if variant not in VARIANTS:
+        raise ValueError(f'unknown drop variant {variant!r}, expected one of {VARIANTS}')
+    rng = random.Random(options.seed)
+
+    # Initialize Pygame and set up the display
+    pygame.init()
+    screen = pygame.display.set_mode((SCREEN_WIDTH, SCREEN_HEIGHT))
+    pygame.display.set_caption('Apple Fall Simulation')
+
+    # Create the simulation engine and the apples; a pile also collides
+    if variant == 'pile':
+        engine = FallEngine(capacity=APPLE_COUNT)
+        apples = [Apple(engine, x, y) for x, y in spawn_positions(APPLE_COUNT, rng)]
+        stepper = FixedStepper(engine, world=CollisionWorld(engine, APPLE_SIZE))
+    else:
+        engine = FallEngine()
+        apples = [Apple(engine, rng.randint(0, SCREEN_WIDTH - APPLE_SIZE), 0)]
+        stepper = FixedStepper(engine)
+
+    # Create a sprite group
+    all_sprites = pygame.sprite.Group()
+    all_sprites.add(apples)
+
+    # Per-phase frame timings; F3 shows the rolling p50/p99
+    profiler = FrameProfiler(('tick', 'events', 'physics', 'sprites', 'display', 'export'), csv_path=options.profile)
+    profiler_hud = ProfilerHUD(profiler, pygame.font.SysFont('monospace', 16), pos=(SCREEN_WIDTH - 330, 10))
+
+    # Main loop
+    running = True
+    runner = FrameRunner(options, FPS)
+
+    while running:
+        profiler.start_frame()
+        # Cap the frame rate (uncapped when headless); physics runs at its own fixed rate
+        frame_time = runner.tick()
+        profiler.mark('tick')
+
+        for event in runner.events():
+            if event.type == pygame.QUIT:
+                running = False
+            profiler_hud.handle_event(event)
+        profiler.mark('events')
+
+        # Update the apples
+        stepper.advance(frame_time, GRAVITY)
+        profiler.mark('physics')
+        all_sprites.update(stepper.interpolated_heights())
+
+        # Clear the screen
+        screen.fill(WHITE)
+
+        # Draw all sprites
+        all_sprites.draw(screen)
+
+        # Frame timing overlay
+        profiler_hud.refresh(runner.now)
+        if profiler_hud.visible:
+            profiler_hud.paint(screen)
+        profiler.mark('sprites')
+
+        # Flip the display
+        pygame.display.flip()
+        profiler.mark('display')
+
+        # Save the frame and stop once a headless run has rendered enough
+        runner.capture(screen)
+        profiler.mark('export')
+        if runner.done:
+            running = False
+
+    profiler.close()
+    runner.close()
+    pygame.quit()
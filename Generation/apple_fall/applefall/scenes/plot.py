@@ -0,0 +1,241 @@
+"""One apple beside a live plot of its position and velocity.
+
+``variant='plot'`` starts at half speed, and "Slow Down" keeps halving it.
+``'plot-metric'`` starts at full speed, toggles between 1x and 0.5x, and
+labels the state in metres.
+"""
+import pygame
+
+from ..engine import FallEngine
+from ..headless import FrameRunner
+from ..plot_worker import PlotWorker
+from ..profiler import FrameProfiler, ProfilerHUD
+from ..recorder import TrajectoryRecorder
+from ..sprites import BodySprite
+from ..timestep import FixedStepper
+from ..trajectory_io import TrajectoryWriter
+from ..widgets import Button, Label, Slider, TextCache, draw_widgets
+
+VARIANTS = ('plot', 'plot-metric')
+
+# Constants
+SCREEN_WIDTH = 800
+SCREEN_HEIGHT = 600
+PLOT_WIDTH = 600
+PLOT_HEIGHT = 600
+PLOT_REFRESH_HZ = 15  # Plot redraws per second, independent of the physics rate
+HISTORY_CAPACITY = 100000  # Newest samples kept for plotting
+EXPORT_PATH = None  # e.g. 'trajectories.bin' to save every finished drop for PINN training
+WHITE = (255, 255, 255)
+RED = (255, 0, 0)
+BLACK = (0, 0, 0)
+GRAVITY_MIN = 1.6  # Minimum gravity to simulate Earth-like conditions
+GRAVITY_MAX = 9.8  # Maximum gravity to simulate Earth-like conditions
+GRAVITY_STEP = 0.1
+FLOOR = 460
+
+# Physical constants
+METER_TO_PIXEL = 100  # 1 meter is 100 pixels
+APPLE_MASS = 0.2  # mass of the apple in kg (just an example)
+
+
+# Apple class
+class Apple(BodySprite):
+    def __init__(self, engine):
+        super().__init__(engine, 10, RED, FLOOR, METER_TO_PIXEL)  # Make the apple smaller
+        self.trajectory = TrajectoryRecorder(capacity=HISTORY_CAPACITY)
+        self.reset()
+
+    @property
+    def velocity_y(self):
+        return -self.velocity  # Screen y grows downwards
+
+    def reset(self):
+        self.place(SCREEN_WIDTH // 2, 0)  # Start from the top, in the middle
+        self.time_stopped = None
+        self.exported = False
+        self.trajectory.clear()
+
+    def update(self, heights=None, steps=1):
+        super().update(heights)
+        # One sample per frame that stepped the physics, plus the starting state
+        if self.time_stopped is None and (steps or not len(self.trajectory)):
+            # Simulation time, not real time, so slowed-down runs plot the same
+            self.trajectory.append(self.engine.time, self.height, self.velocity_y)
+            if self.stopped:
+                self.time_stopped = self.engine.time
+
+    def get_time_elapsed(self):
+        return self.engine.time if self.time_stopped is None else self.time_stopped
+
+
+def run(options, variant='plot'):
+    if variant not in VARIANTS:
+        raise ValueError(f'unknown plot variant {variant!r}, expected one of {VARIANTS}')
+    metric = variant == 'plot-metric'
+    initial_time_scale = 1.0 if metric else 0.5
+    time_scale = initial_time_scale
+
+    # Initialize Pygame and set up the display
+    pygame.init()
+    screen = pygame.display.set_mode((SCREEN_WIDTH + PLOT_WIDTH, SCREEN_HEIGHT))
+    pygame.display.set_caption('Apple Fall Simulation with Plot')
+
+    # Font for buttons and text, rendered once per distinct string
+    font = pygame.font.Font(None, 36)
+    text_cache = TextCache(font)
+
+    # Action functions
+    def slow_down_action():
+        nonlocal time_scale
+        if metric:
+            time_scale = 0.5 if time_scale == 1.0 else 1.0
+        else:
+            time_scale *= 0.5  # Halve the time_scale to slow down the simulation
+
+    def restart_action():
+        nonlocal time_scale
+        if not metric:
+            time_scale = initial_time_scale
+        apple.reset()
+        stepper.reset()
+        live_plot.reset()
+
+    # Create the simulation engine and an apple
+    engine = FallEngine()
+    apple = Apple(engine)
+    stepper = FixedStepper(engine)
+
+    # Finished drops are appended here, one run id per drop
+    trajectory_writer = TrajectoryWriter(EXPORT_PATH, append=True) if EXPORT_PATH else None
+    run_id = trajectory_writer.next_run_id if trajectory_writer else 0
+
+    # Create the live plot panel, drawn by a worker process so matplotlib never
+    # holds up this loop; a finished frame is blitted whenever one is ready
+    live_plot = PlotWorker(apple.trajectory, PLOT_WIDTH, PLOT_HEIGHT, refresh_hz=PLOT_REFRESH_HZ)
+
+    # Create buttons
+    buttons = [
+        Button(50, 500, 200, 50, 'Restart', restart_action, text_cache),
+        Button(300, 500, 200, 50, 'Slow Down', slow_down_action, text_cache)
+    ]
+
+    # Create slider
+    gravity_slider = Slider(550, 510, 200, GRAVITY_MIN, GRAVITY_MAX, GRAVITY_STEP)
+
+    # Create the HUD labels; constant ones are drawn once and never again
+    time_label = Label(text_cache, (50, 50))
+    position_label = Label(text_cache, (50, 100))
+    velocity_label = Label(text_cache, (50, 150))
+    gravity_label = Label(text_cache, (550, 480))
+    speed_label = Label(text_cache, (50, 300))
+    hud = [
+        time_label,
+        position_label,
+        velocity_label,
+        gravity_label,
+        Label(text_cache, (50, 200), f"1 meter = {METER_TO_PIXEL} pixels"),
+        Label(text_cache, (50, 250), f"Apple Mass: {APPLE_MASS} kg"),
+    ]
+    if metric:
+        hud.append(speed_label)
+
+    # Per-phase frame timings; F3 shows the rolling p50/p99
+    profiler = FrameProfiler(('tick', 'events', 'physics', 'sprites', 'widgets', 'plot', 'display', 'export'),
+                             csv_path=options.profile)
+    profiler_hud = ProfilerHUD(profiler, pygame.font.SysFont('monospace', 16), pos=(SCREEN_WIDTH - 330, 10))
+
+    widgets = buttons + [gravity_slider] + hud + [profiler_hud]
+
+    # Static background: sprites and widgets are erased by copying from it
+    background = pygame.Surface(screen.get_size())
+    background.fill(WHITE)
+    pygame.draw.rect(background, BLACK, (0, FLOOR, SCREEN_WIDTH, 2))  # The floor
+    screen.blit(background, (0, 0))
+    pygame.display.flip()
+    plot_rect = pygame.Rect(SCREEN_WIDTH, 0, PLOT_WIDTH, PLOT_HEIGHT)
+    plot_version = None
+
+    # Create a sprite group that reports the rects it draws
+    all_sprites = pygame.sprite.RenderUpdates()
+    all_sprites.add(apple)
+
+    # Main loop
+    running = True
+    runner = FrameRunner(options)
+
+    while running:
+        profiler.start_frame()
+        # Cap the frame rate (uncapped when headless); physics runs at its own fixed rate
+        frame_time = runner.tick()
+        profiler.mark('tick')
+
+        for event in runner.events():
+            if event.type == pygame.QUIT:
+                running = False
+            gravity_slider.handle_event(event)
+            profiler_hud.handle_event(event)
+        profiler.mark('events')
+
+        # Update the apple, sub-stepping at a fixed dt scaled by time_scale
+        steps = stepper.advance(frame_time, gravity_slider.value, time_scale)
+        profiler.mark('physics')
+        all_sprites.update(stepper.interpolated_heights(), steps)
+
+        # Erase sprites from where they were and draw them where they are
+        all_sprites.clear(screen, background)
+        dirty_rects = all_sprites.draw(screen)
+        profiler.mark('sprites')
+
+        # Handle button clicks
+        for button in buttons:
+            button.check_click()
+
+        # Display time, position, velocity, and mass
+        elapsed_time = apple.get_time_elapsed()
+        time_label.set_text(f"Time: {elapsed_time:.2f}s")
+        if metric:
+            position_label.set_text(f"Position: {apple.height:.2f}m")
+            velocity_label.set_text(f"Velocity: {apple.velocity_y:.2f}m/s")
+            gravity_label.set_text(f"Gravity: {gravity_slider.value:.2f}m/s²")
+            speed_label.set_text(f"Speed: {'0.5x' if time_scale == 0.5 else '1.0x'}")
+        else:
+            position_label.set_text(f"Position: ({apple.rect.x}, {apple.rect.y})")
+            velocity_label.set_text(f"Velocity: {apple.velocity_y:.2f}")
+            gravity_label.set_text(f"Gravity: {gravity_slider.value:.2f}")
+
+        # Draw buttons, slider and labels that changed
+        profiler_hud.refresh(runner.now)
+        dirty_rects += draw_widgets(widgets, screen, background)
+        profiler.mark('widgets')
+
+        # Save the drop once the apple has landed
+        if trajectory_writer is not None and apple.time_stopped is not None and not apple.exported:
+            trajectory_writer.write_recorder(apple.trajectory, gravity_slider.value, APPLE_MASS, run_id)
+            apple.exported = True
+            run_id += 1
+
+        # Plot positions
+        plot_surface = live_plot.update(runner.now)
+        if plot_surface is not None and live_plot.version != plot_version:
+            screen.blit(plot_surface, plot_rect)
+            dirty_rects.append(plot_rect)
+            plot_version = live_plot.version
+        profiler.mark('plot')
+
+        # Push only the changed parts of the screen
+        pygame.display.update(dirty_rects)
+        profiler.mark('display')
+
+        # Save the frame and stop once a headless run has rendered enough
+        runner.capture(screen)
+        profiler.mark('export')
+        if runner.done:
+            running = False
+
+    if trajectory_writer is not None:
+        trajectory_writer.close()
+    live_plot.close()
+    profiler.close()
+    runner.close()
+    pygame.quit()
@@ -0,0 +1,48 @@
+"""Pygame sprites that display bodies owned by a FallEngine."""
+import pygame
+
+
+class BodySprite(pygame.sprite.Sprite):
+    """Thin view over one row of a FallEngine.
+
+    The engine owns the physical state; the sprite only converts it to screen
+    coordinates.  ``floor`` is the screen row of the floor and ``scale`` the
+    number of pixels per engine length unit.
+    """
+
+    def __init__(self, engine, size, color, floor, scale=1.0):
+        super().__init__()
+        self.engine = engine
+        self.floor = floor
+        self.scale = scale
+        self.image = pygame.Surface((size, size))
+        self.image.fill(color)
+        self.rect = self.image.get_rect()
+        self.index = int(engine.add()[0])
+
+    @property
+    def height(self):
+        return self.engine.y[self.index]
+
+    @property
+    def velocity(self):
+        return self.engine.vy[self.index]
+
+    @property
+    def stopped(self):
+        return bool(self.engine.stopped[self.index])
+
+    def place(self, x, y, vy=0.0, mass=None):
+        """Put the body back at screen position (x, y) of its top-left corner."""
+        height = (self.floor - self.rect.height - y) / self.scale
+        self.engine.set_state(self.index, x / self.scale, height, vy, mass)
+        self.sync()
+
+    def sync(self, heights=None):
+        """Move the rect to the body's state, or to ``heights`` if given."""
+        height = self.height if heights is None else heights[self.index]
+        self.rect.x = round(self.engine.x[self.index] * self.scale)
+        self.rect.bottom = round(self.floor - height * self.scale)
+
+    def update(self, heights=None):
+        self.sync(heights)
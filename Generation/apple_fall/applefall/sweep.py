@@ -0,0 +1,161 @@
+"""Parallel parameter sweeps over gravity, drop height, mass and time scale.
+
+The grid is split into chunks and each chunk is simulated as one vectorized
+FallEngine batch inside a worker process, so a worker advances thousands of
+drops per NumPy call.  Every run is compared with the closed-form answer for
+a drop from rest: t = sqrt(2 h / g) and v = -sqrt(2 g h).
+
+``time_scale`` only changes how long a run takes on screen.  The fixed
+timestep makes the trajectory independent of it, which the sweep reports
+through ``display_time`` and the error columns.
+
+``method='events'`` skips the stepping: an ``EventTimeline`` solves every
+impact in closed form, and the trajectory of a run is its first record and
+its impact.
+"""
+import os
+import time
+from collections import namedtuple
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from .engine import FallEngine
+from .events import EventTimeline
+from .timestep import PHYSICS_HZ
+from .trajectory_io import RECORD_DTYPE, TrajectoryWriter, check_drops, record_block, step_records
+
+RESULT_DTYPE = np.dtype([
+    ('run_id', '<i8'),
+    ('gravity', '<f8'),
+    ('height', '<f8'),
+    ('mass', '<f8'),
+    ('time_scale', '<f8'),
+    ('fall_time', '<f8'),
+    ('impact_velocity', '<f8'),
+    ('display_time', '<f8'),
+    ('analytic_fall_time', '<f8'),
+    ('analytic_impact_velocity', '<f8'),
+    ('fall_time_error', '<f8'),
+    ('impact_velocity_error', '<f8'),
+])
+
+METHODS = ('step', 'events')
+
+SweepResult = namedtuple('SweepResult', 'results trajectories elapsed runs_per_second')
+
+
+def available_cores():
+    if hasattr(os, 'sched_getaffinity'):
+        return len(os.sched_getaffinity(0))
+    return os.cpu_count() or 1
+
+
+def parameter_grid(gravity, height, mass, time_scale=1.0):
+    """Every combination of the given values as a RESULT_DTYPE array.
+
+    Raises ValueError for gravity or heights that would never land.
+    """
+    axes = [np.atleast_1d(np.asarray(v, dtype=np.float64)) for v in (gravity, height, mass, time_scale)]
+    check_drops(axes[0], axes[1])
+    mesh = np.meshgrid(*axes, indexing='ij')
+    grid = np.zeros(mesh[0].size, dtype=RESULT_DTYPE)
+    grid['run_id'] = np.arange(len(grid))
+    for name, values in zip(('gravity', 'height', 'mass', 'time_scale'), mesh):
+        grid[name] = values.ravel()
+    return grid
+
+
+def simulate_chunk(params, dt=1.0 / PHYSICS_HZ, trajectories=True, method='step'):
+    """Run one chunk of the grid as a single engine batch.
+
+    Returns the filled-in result rows and, if requested, every step of every
+    run (every event with ``method='events'``) as RECORD_DTYPE records.
+    """
+    if method not in METHODS:
+        raise ValueError(f'unknown method {method!r}, expected one of {METHODS}')
+    check_drops(params['gravity'], params['height'])
+    engine = FallEngine(capacity=len(params))
+    engine.add(y=params['height'], mass=params['mass'])
+    n = engine.count
+    blocks = []
+    if method == 'events':
+        args = params['gravity'], engine.mass[:n], params['run_id'], np.ones(n, dtype=bool)
+        if trajectories:
+            blocks.append(record_block(engine.time, engine.y[:n], engine.vy[:n], *args))
+        timeline = EventTimeline(engine, params['gravity'])
+        timeline.sync(engine, timeline.end_time)
+        if trajectories:
+            blocks.append(record_block(engine.time_stopped[:n], engine.y[:n], engine.impact_velocity[:n], *args))
+    else:
+        for block in step_records(engine, params['gravity'], params['run_id'], dt):
+            if trajectories:
+                blocks.append(block)
+
+    results = params.copy()
+    results['fall_time'] = engine.time_stopped[:n]
+    results['impact_velocity'] = engine.impact_velocity[:n]
+    results['display_time'] = results['fall_time'] / results['time_scale']
+    g, h = results['gravity'], results['height']
+    results['analytic_fall_time'] = np.sqrt(2 * h / g)
+    results['analytic_impact_velocity'] = -np.sqrt(2 * g * h)
+    results['fall_time_error'] = results['fall_time'] - results['analytic_fall_time']
+    results['impact_velocity_error'] = results['impact_velocity'] - results['analytic_impact_velocity']
+
+    records = np.concatenate(blocks) if blocks else np.empty(0, dtype=RECORD_DTYPE)
+    return results, records
+
+
+def run_sweep(gravity, height, mass, time_scale=1.0, dt=1.0 / PHYSICS_HZ,
+              processes=None, chunks_per_process=4, trajectories=True, path=None, method='step'):
+    """Sweep the full grid across a process pool.
+
+    With ``path`` the trajectories are streamed to a trajectory file as chunks
+    finish instead of being kept in memory.  ``processes=1`` runs inline.
+    """
+    start = time.perf_counter()
+    grid = parameter_grid(gravity, height, mass, time_scale)
+    processes = min(processes or available_cores(), len(grid))
+    chunks = np.array_split(grid, max(1, processes * chunks_per_process))
+    chunks = [chunk for chunk in chunks if len(chunk)]
+    keep = trajectories and path is None
+
+    writer = TrajectoryWriter(path) if path and trajectories else None
+    results, records = [], []
+    try:
+        if processes == 1:
+            outputs = (simulate_chunk(chunk, dt, trajectories, method) for chunk in chunks)
+            _collect(outputs, results, records, keep, writer)
+        else:
+            with ProcessPoolExecutor(max_workers=processes) as pool:
+                outputs = pool.map(simulate_chunk, chunks, [dt] * len(chunks),
+                                   [trajectories] * len(chunks), [method] * len(chunks))
+                _collect(outputs, results, records, keep, writer)
+    finally:
+        if writer is not None:
+            writer.close()
+
+    results = np.concatenate(results)
+    records = np.concatenate(records) if records else np.empty(0, dtype=RECORD_DTYPE)
+    elapsed = time.perf_counter() - start
+    return SweepResult(results, records, elapsed, len(results) / elapsed)
+
+
+def _collect(outputs, results, records, keep, writer):
+    for chunk_results, chunk_records in outputs:
+        results.append(chunk_results)
+        if writer is not None:
+            writer.write_records(chunk_records)
+        elif keep:
+            records.append(chunk_records)
+
+
+def summarize(sweep):
+    """A short human-readable report of a SweepResult."""
+    r = sweep.results
+    return '\n'.join([
+        f'runs: {len(r)}  elapsed: {sweep.elapsed:.3f}s  throughput: {sweep.runs_per_second:,.0f} runs/s',
+        f'trajectory samples: {len(sweep.trajectories)}',
+        f'max |fall time error|: {np.abs(r["fall_time_error"]).max():.3e} s',
+        f'max |impact velocity error|: {np.abs(r["impact_velocity_error"]).max():.3e} m/s',
+    ])
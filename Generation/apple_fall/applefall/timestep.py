@@ -0,0 +1,54 @@
+"""Fixed-timestep driver that decouples physics from the render rate.
+
+Wall-clock frame time is fed into an accumulator and the engine is advanced
+in whole steps of ``dt`` simulated seconds, so the trajectory only depends on
+``dt`` and never on how long a frame happened to take.  Slow motion simply
+feeds less simulated time per frame; the leftover fraction of a step is used
+to interpolate between the last two physics states when drawing.
+"""
+import numpy as np
+
+PHYSICS_HZ = 240
+# Longest frame we try to catch up on; anything beyond is dropped so a stall
+# (window drag, debugger) cannot trigger an ever-growing backlog of steps.
+MAX_FRAME_TIME = 0.25
+
+
+class FixedStepper:
+    def __init__(self, engine, dt=1.0 / PHYSICS_HZ, max_frame_time=MAX_FRAME_TIME, world=None):
+        self.engine = engine
+        # Anything with the engine's step(dt, gravity), e.g. a CollisionWorld
+        self.world = engine if world is None else world
+        self.dt = dt
+        self.max_frame_time = max_frame_time
+        self.accumulator = 0.0
+        self.prev_y = engine.y[:engine.count].copy()
+
+    @property
+    def alpha(self):
+        """Fraction of a step between the previous and the current state."""
+        return self.accumulator / self.dt
+
+    def reset(self):
+        self.engine.time = 0.0
+        self.accumulator = 0.0
+        self.prev_y = self.engine.y[:self.engine.count].copy()
+
+    def advance(self, frame_time, gravity, time_scale=1.0):
+        """Consume one frame of wall-clock time; return the number of steps taken."""
+        self.accumulator += min(frame_time, self.max_frame_time) * time_scale
+        steps = int(self.accumulator // self.dt)
+        for i in range(steps):
+            if i == steps - 1:
+                self.prev_y = self.engine.y[:self.engine.count].copy()
+            self.world.step(self.dt, gravity)
+        self.accumulator -= steps * self.dt
+        return steps
+
+    def interpolated_heights(self):
+        """Heights blended between the last two physics states for drawing."""
+        y = self.engine.y[:self.engine.count]
+        if len(self.prev_y) != len(y):
+            self.prev_y = y.copy()
+        # Bodies that have landed are drawn exactly on the floor
+        return np.where(self.engine.stopped[:len(y)], y, self.prev_y + (y - self.prev_y) * self.alpha)
@@ -0,0 +1,241 @@
+"""Streaming binary trajectory files for PINN training data.
+
+A file is a short JSON header followed by fixed-size little-endian records
+(``RECORD_DTYPE``).  The writer appends records in chunks, so memory use is
+bounded by the chunk size no matter how long a run is.  The reader maps the
+file with ``np.memmap``: columns are zero-copy strided views, and a training
+job can open millions of samples without reading them up front.
+"""
+import json
+import os
+
+import numpy as np
+
+from .engine import FallEngine
+
+MAGIC = b'APPLETRJ'
+VERSION = 1
+HEADER_ALIGN = 64
+
+RECORD_DTYPE = np.dtype([
+    ('t', '<f8'),
+    ('position', '<f8'),
+    ('velocity', '<f8'),
+    ('gravity', '<f8'),
+    ('mass', '<f8'),
+    ('run_id', '<i8'),
+])
+
+
+def _header_bytes():
+    meta = json.dumps({'version': VERSION, 'descr': RECORD_DTYPE.descr}).encode()
+    size = len(MAGIC) + 4 + len(meta)
+    size += -size % HEADER_ALIGN
+    header = MAGIC + size.to_bytes(4, 'little') + meta
+    return header.ljust(size, b' ')
+
+
+def _read_header(fh):
+    magic = fh.read(len(MAGIC))
+    if magic != MAGIC:
+        raise ValueError('not an apple_fall trajectory file')
+    size = int.from_bytes(fh.read(4), 'little')
+    meta = json.loads(fh.read(size - len(MAGIC) - 4).decode())
+    if meta['version'] != VERSION:
+        raise ValueError(f"unsupported trajectory file version {meta['version']}")
+    dtype = np.dtype([tuple(field) for field in meta['descr']])
+    if dtype != RECORD_DTYPE:
+        raise ValueError('trajectory file has an unexpected record layout')
+    return size
+
+
+class TrajectoryWriter:
+    def __init__(self, path, chunk_records=65536, append=False):
+        self.path = path
+        exists = append and os.path.exists(path) and os.path.getsize(path) > 0
+        if exists:
+            with open(path, 'rb') as fh:
+                self.header_size = _read_header(fh)
+            self._fh = open(path, 'r+b')
+            # Drop a torn record left by an interrupted writer
+            body = os.path.getsize(path) - self.header_size
+            self._fh.truncate(self.header_size + body - body % RECORD_DTYPE.itemsize)
+            self._fh.seek(0, os.SEEK_END)
+            run_ids = TrajectoryReader(path).column('run_id')
+            self.next_run_id = int(run_ids.max()) + 1 if len(run_ids) else 0
+        else:
+            header = _header_bytes()
+            self.header_size = len(header)
+            self._fh = open(path, 'wb')
+            self._fh.write(header)
+            self.next_run_id = 0
+        self._buffer = np.empty(chunk_records, dtype=RECORD_DTYPE)
+        self._fill = 0
+        self.records_written = 0
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def write(self, t, position, velocity, gravity, mass, run_id):
+        """Append records; arguments are scalars or arrays broadcast together."""
+        columns = [c.ravel() for c in np.broadcast_arrays(t, position, velocity, gravity, mass, run_id)]
+        n = columns[0].size
+        start = 0
+        while start < n:
+            take = min(n - start, len(self._buffer) - self._fill)
+            rows = self._buffer[self._fill:self._fill + take]
+            for name, column in zip(RECORD_DTYPE.names, columns):
+                rows[name] = column[start:start + take]
+            self._fill += take
+            start += take
+            if self._fill == len(self._buffer):
+                self.flush()
+
+    def write_records(self, block):
+        """Append an array that already has ``RECORD_DTYPE``."""
+        if self._fill + len(block) > len(self._buffer):
+            self.flush()
+        if len(block) >= len(self._buffer):
+            self._fh.write(np.ascontiguousarray(block, dtype=RECORD_DTYPE).tobytes())
+            self.records_written += len(block)
+            return
+        self._buffer[self._fill:self._fill + len(block)] = block
+        self._fill += len(block)
+
+    def write_recorder(self, recorder, gravity, mass, run_id):
+        """Append a TrajectoryRecorder's t/position/velocity columns as one run."""
+        self.write(recorder.column('t'), recorder.column('position'),
+                   recorder.column('velocity'), gravity, mass, run_id)
+
+    def flush(self):
+        if self._fill:
+            self._fh.write(self._buffer[:self._fill].tobytes())
+            self.records_written += self._fill
+            self._fill = 0
+        self._fh.flush()
+
+    def close(self):
+        if not self._fh.closed:
+            self.flush()
+            self._fh.close()
+
+
+class TrajectoryReader:
+    def __init__(self, path):
+        self.path = path
+        with open(path, 'rb') as fh:
+            self.header_size = _read_header(fh)
+        count = (os.path.getsize(path) - self.header_size) // RECORD_DTYPE.itemsize
+        # Copy-on-write keeps the mapping zero-copy but lets torch.from_numpy
+        # wrap it without complaining about read-only memory
+        if count:
+            self.records = np.memmap(path, dtype=RECORD_DTYPE, mode='c',
+                                     offset=self.header_size, shape=(count,))
+        else:
+            self.records = np.empty(0, dtype=RECORD_DTYPE)
+        self._runs = None
+
+    def __len__(self):
+        return len(self.records)
+
+    def column(self, name):
+        return self.records[name]
+
+    def tensor(self, name):
+        """A zero-copy torch tensor over one column."""
+        import torch
+        return torch.from_numpy(self.records[name])
+
+    def run_ids(self):
+        return self._run_index()[0]
+
+    def run(self, run_id):
+        """All records of one run, in the order they were written.
+
+        Runs written back to back come out as a zero-copy slice; interleaved
+        runs (for example one record per body per step) are gathered.
+        """
+        ids, starts, stops, order = self._run_index()
+        i = np.searchsorted(ids, run_id)
+        if i == len(ids) or ids[i] != run_id:
+            raise KeyError(run_id)
+        if order is None:
+            return self.records[starts[i]:stops[i]]
+        return self.records[order[starts[i]:stops[i]]]
+
+    def _run_index(self):
+        if self._runs is None:
+            run_id = self.records['run_id']
+            order = None
+            if len(run_id) and np.any(run_id[1:] < run_id[:-1]):
+                order = np.argsort(run_id, kind='stable')
+                run_id = run_id[order]
+            ids, starts = np.unique(run_id, return_index=True)
+            stops = np.append(starts[1:], len(run_id))
+            self._runs = ids, starts, stops, order
+        return self._runs
+
+
+def check_drops(gravity, height):
+    """Raise ValueError unless every drop lands: positive, finite gravity and finite heights."""
+    gravity, height = np.asarray(gravity, dtype=np.float64), np.asarray(height, dtype=np.float64)
+    if not np.all(np.isfinite(gravity) & (gravity > 0)):
+        raise ValueError('gravity must be positive and finite, or a body never lands')
+    if not np.all(np.isfinite(height)):
+        raise ValueError('heights must be finite, or a body never lands')
+
+
+def step_records(engine, gravity, run_id, dt=1.0 / 240):
+    """Step ``engine`` until every body has landed, yielding records per step.
+
+    The first block is the initial state.  Bodies that land during a step are
+    logged at their exact impact time and velocity, stopped bodies are skipped.
+    Raises ValueError up front for drops that would never land.
+    """
+    n = engine.count
+    gravity = np.broadcast_to(gravity, (n,))
+    run_id = np.broadcast_to(run_id, (n,))
+    active = ~engine.stopped[:n]
+    if not dt > 0:
+        raise ValueError(f'dt must be positive, got {dt}')
+    check_drops(gravity[active], engine.y[:n][active])
+    yield record_block(engine.time, engine.y[:n], engine.vy[:n], gravity, engine.mass[:n], run_id, active)
+    while active.any():
+        landed = engine.step(dt, gravity)
+        t = np.where(landed, engine.time_stopped[:n], engine.time)
+        v = np.where(landed, engine.impact_velocity[:n], engine.vy[:n])
+        yield record_block(t, engine.y[:n], v, gravity, engine.mass[:n], run_id, active)
+        active = ~engine.stopped[:n]
+
+
+def record_block(t, position, velocity, gravity, mass, run_id, mask):
+    """The ``mask``-ed bodies' state as RECORD_DTYPE records; ``t`` may be a scalar."""
+    block = np.empty(np.count_nonzero(mask), dtype=RECORD_DTYPE)
+    block['t'] = np.broadcast_to(t, mask.shape)[mask]
+    block['position'] = position[mask]
+    block['velocity'] = velocity[mask]
+    block['gravity'] = gravity[mask]
+    block['mass'] = mass[mask]
+    block['run_id'] = run_id[mask]
+    return block
+
+
+def export_drops(path, heights, gravity, mass=1.0, dt=1.0 / 240, run_id_start=0,
+                 append=False):
+    """Simulate a batch of drops headlessly and stream every step to ``path``.
+
+    One body per run; ``heights``, ``gravity`` and ``mass`` broadcast together.
+    Returns the engine so callers can read stop times and impact velocities.
+    """
+    heights, gravity, mass = np.broadcast_arrays(
+        np.atleast_1d(heights), np.atleast_1d(gravity), np.atleast_1d(mass))
+    engine = FallEngine(capacity=len(heights))
+    engine.add(y=heights, mass=mass)
+    run_id = np.arange(run_id_start, run_id_start + len(heights))
+    with TrajectoryWriter(path, append=append) as writer:
+        for block in step_records(engine, gravity, run_id, dt):
+            writer.write_records(block)
+    return engine
@@ -0,0 +1,157 @@
+"""Retained-mode UI widgets for dirty-rectangle rendering.
+
+Each widget remembers what it last drew and only repaints, returning the
+screen rectangles it touched, when its visible state changes.  The caller
+collects those rectangles and passes them to ``pygame.display.update`` instead
+of flipping the whole window.  Text goes through a ``TextCache`` so a string
+is rasterised once, no matter how many frames show it.
+"""
+from collections import OrderedDict
+
+import pygame
+
+WHITE = (255, 255, 255)
+BLACK = (0, 0, 0)
+BUTTON_COLOR = (0, 128, 255)
+BUTTON_HOVER_COLOR = (0, 64, 128)
+
+
+class TextCache:
+    """Least-recently-used cache of rendered text surfaces keyed by string."""
+
+    def __init__(self, font, max_entries=256):
+        self.font = font
+        self.max_entries = max_entries
+        self._surfaces = OrderedDict()
+
+    def render(self, text, color=BLACK):
+        key = (text, color)
+        surface = self._surfaces.get(key)
+        if surface is None:
+            surface = self.font.render(text, True, color)
+            self._surfaces[key] = surface
+            if len(self._surfaces) > self.max_entries:
+                self._surfaces.popitem(last=False)
+        else:
+            self._surfaces.move_to_end(key)
+        return surface
+
+
+class Widget:
+    def __init__(self):
+        self.dirty = True
+        self.drawn_rect = None
+
+    def erase(self, screen, background):
+        if self.drawn_rect is not None:
+            screen.blit(background, self.drawn_rect, self.drawn_rect)
+
+    def draw(self, screen, background):
+        """Repaint if needed; return the list of screen rects that changed."""
+        if not self.dirty:
+            return []
+        old = self.drawn_rect
+        self.erase(screen, background)
+        self.drawn_rect = self.paint(screen)
+        self.dirty = False
+        return [self.drawn_rect if old is None else old.union(self.drawn_rect)]
+
+    def paint(self, screen):
+        raise NotImplementedError
+
+
+class Label(Widget):
+    def __init__(self, text_cache, pos, text='', color=BLACK):
+        super().__init__()
+        self.text_cache = text_cache
+        self.pos = pos
+        self.text = text
+        self.color = color
+
+    def set_text(self, text):
+        if text != self.text:
+            self.text = text
+            self.dirty = True
+
+    def paint(self, screen):
+        return screen.blit(self.text_cache.render(self.text, self.color), self.pos)
+
+
+class Button(Widget):
+    def __init__(self, x, y, width, height, text, action, text_cache):
+        super().__init__()
+        self.rect = pygame.Rect(x, y, width, height)
+        self.text = text
+        self.action = action
+        self.text_cache = text_cache
+        self.hover = False
+
+    def draw(self, screen, background):
+        hover = self.rect.collidepoint(pygame.mouse.get_pos())
+        if hover != self.hover:
+            self.hover = hover
+            self.dirty = True
+        return super().draw(screen, background)
+
+    def paint(self, screen):
+        pygame.draw.rect(screen, BUTTON_HOVER_COLOR if self.hover else BUTTON_COLOR, self.rect)
+        text_surface = self.text_cache.render(self.text, WHITE)
+        screen.blit(text_surface, text_surface.get_rect(center=self.rect.center))
+        return self.rect.copy()
+
+    def check_click(self):
+        if self.rect.collidepoint(pygame.mouse.get_pos()):
+            if pygame.mouse.get_pressed()[0]:
+                self.action()
+
+
+class Slider(Widget):
+    def __init__(self, x, y, width, min_val, max_val, step):
+        super().__init__()
+        self.rect = pygame.Rect(x, y, width, 20)
+        self.min_val = min_val
+        self.max_val = max_val
+        self.step = step
+        self.value = (min_val + max_val) / 2
+        self.handle_rect = pygame.Rect(0, y - 10, 10, 40)
+        self.dragging = False
+        self.update_handle()
+
+    def update_handle(self):
+        ratio = (self.value - self.min_val) / (self.max_val - self.min_val)
+        self.handle_rect.centerx = self.rect.left + ratio * self.rect.width
+
+    def paint(self, screen):
+        self.update_handle()
+        pygame.draw.rect(screen, BLACK, self.rect, 2)
+        pygame.draw.rect(screen, BUTTON_COLOR, self.handle_rect)
+        # The handle can overhang either end of the track by half its width
+        return self.rect.union(self.handle_rect).inflate(self.handle_rect.width, 0)
+
+    def handle_event(self, event):
+        if event.type == pygame.MOUSEBUTTONDOWN and self.handle_rect.collidepoint(event.pos):
+            self.dragging = True
+        elif event.type == pygame.MOUSEBUTTONUP:
+            self.dragging = False
+        elif event.type == pygame.MOUSEMOTION and self.dragging:
+            self.handle_rect.centerx = max(self.rect.left, min(event.pos[0], self.rect.right))
+            ratio = (self.handle_rect.centerx - self.rect.left) / self.rect.width
+            self.value = self.min_val + ratio * (self.max_val - self.min_val)
+            self.value = round(self.value / self.step) * self.step
+            self.dirty = True
+
+
+def draw_widgets(widgets, screen, background):
+    """Draw a list of widgets, returning the changed screen rects.
+
+    Erasing a widget also wipes anything that overlaps it, so clean widgets
+    whose last drawn area touches a dirty one are repainted as well.
+    """
+    stale = [w.drawn_rect for w in widgets if w.dirty and w.drawn_rect is not None]
+    for widget in widgets:
+        if not widget.dirty and widget.drawn_rect is not None and widget.drawn_rect.collidelist(stale) != -1:
+            widget.dirty = True
+    rects = []
+    for widget in widgets:
+        rects += widget.draw(screen, background)
+    return rects
@@ -0,0 +1,39 @@
+import random
+
+import numpy as np
+import pytest
+
+from applefall.collision import CONTACT_SLOP, CollisionWorld
+from applefall.engine import FallEngine
+
+SIZE = 20
+
+
+def drop_pile(seed, count, width=800, seconds=3.0, dt=1.0 / 240):
+    # Loose rows stacked upwards, as in the pile scene
+    rng = random.Random(seed)
+    engine = FallEngine(capacity=count)
+    per_row = width // (SIZE + 5)
+    for i in range(count):
+        row, column = divmod(i, per_row)
+        engine.add(x=column * (SIZE + 5) + rng.randint(0, 4), y=580 + row * (SIZE + 5) + rng.randint(0, 4))
+    world = CollisionWorld(engine, SIZE)
+    for _ in range(int(seconds / dt)):
+        world.step(dt, 1800.0)
+    return engine
+
+
+@pytest.mark.parametrize('seed', [0, 1, 2])
+def test_pile_comes_to_rest_without_overlaps(seed):
+    engine = drop_pile(seed, 800)
+    n = engine.count
+    assert engine.stopped[:n].all()
+
+    x, y = engine.x[:n], engine.y[:n]
+    slop = CONTACT_SLOP * SIZE
+    overlap_x = SIZE - np.abs(x[:, None] - x[None])
+    overlap_y = SIZE - np.abs(y[:, None] - y[None])
+    overlapping = (overlap_x > slop) & (overlap_y > slop)
+    np.fill_diagonal(overlapping, False)
+    assert not overlapping.any()
+    assert (y >= engine.floor).all()
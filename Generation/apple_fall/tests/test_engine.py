@@ -0,0 +1,29 @@
+import numpy as np
+import pytest
+
+from applefall.engine import FallEngine, impact_time
+
+
+@pytest.mark.parametrize('dt', [1.0 / 240, 1.0 / 60, 0.37])
+def test_drop_lands_at_the_closed_form_time_and_speed(dt):
+    heights = np.array([0.5, 1.0, 10.0, 100.0])
+    gravity = np.array([9.81, 1.6, 9.81, 3.7])
+    engine = FallEngine(capacity=2)
+    engine.add(y=heights)
+    while not engine.stopped[:engine.count].all():
+        engine.step(dt, gravity)
+
+    # The step is exact under constant gravity, so only rounding is left
+    np.testing.assert_allclose(engine.time_stopped[:4], np.sqrt(2 * heights / gravity), rtol=1e-12)
+    np.testing.assert_allclose(engine.impact_velocity[:4], -np.sqrt(2 * gravity * heights), rtol=1e-12)
+    assert (engine.y[:4] == engine.floor).all()
+    assert (engine.vy[:4] == 0).all()
+
+
+def test_impact_time_of_a_throw():
+    # Thrown up at 5 m/s from 2 m: up and back down through the start height
+    v, h, g = 5.0, 2.0, 9.81
+    expected = (v + np.sqrt(v * v + 2 * g * h)) / g
+    assert impact_time(h, v, g) == pytest.approx(expected, rel=1e-12)
+    assert impact_time(0.0, 0.0, g) == 0.0
+    assert impact_time(h, v, 0.0) == np.inf
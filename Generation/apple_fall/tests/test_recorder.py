@@ -0,0 +1,49 @@
+import numpy as np
+import pytest
+
+from applefall.recorder import TrajectoryRecorder, minmax_indices
+
+
+def test_ring_keeps_the_newest_samples_across_the_wrap():
+    recorder = TrajectoryRecorder(capacity=8)
+    for i in range(5):
+        recorder.append(i, 10 * i, -i)
+    recorder.extend(np.arange(5, 13), np.arange(50, 130, 10), -np.arange(5, 13))
+    recorder.append(13, 130, -13)
+
+    assert len(recorder) == 8 and recorder.total == 14
+    np.testing.assert_array_equal(recorder.column('t'), np.arange(6, 14))
+    np.testing.assert_array_equal(recorder.column('position'), np.arange(60, 140, 10))
+    np.testing.assert_array_equal(recorder.tail(3), [[11, 12, 13], [110, 120, 130], [-11, -12, -13]])
+
+    # A block longer than the ring only keeps its end
+    recorder.extend(np.arange(100), 0, 0)
+    assert recorder.total == 114
+    np.testing.assert_array_equal(recorder.column('t'), np.arange(92, 100))
+
+
+def test_unbounded_recorder_grows_by_chunks():
+    recorder = TrajectoryRecorder(chunk_size=4)
+    recorder.extend(np.arange(10), 0, 0)
+    for i in range(10, 13):
+        recorder.append(i, 0, 0)
+    np.testing.assert_array_equal(recorder.column('t'), np.arange(13))
+    np.testing.assert_array_equal(recorder.tail(6, 't'), np.arange(7, 13))
+
+
+@pytest.mark.parametrize('n, buckets', [(10, 5), (1000, 7), (1001, 50)])
+def test_minmax_keeps_every_bucket_extreme(n, buckets):
+    y = np.random.default_rng(n).normal(size=n)
+    y[n // 3] = 100.0  # A spike must survive
+    kept = minmax_indices(y, buckets)
+
+    assert (np.diff(kept) > 0).all() and kept[0] == 0 and kept[-1] == n - 1
+    assert n // 3 in kept
+    if n <= 2 * buckets:
+        np.testing.assert_array_equal(kept, np.arange(n))
+        return
+    size = -(-n // buckets)
+    for start in range(0, n, size):
+        bucket = y[start:start + size]
+        assert start + bucket.argmin() in kept and start + bucket.argmax() in kept
+    assert len(kept) <= 2 * buckets + 2
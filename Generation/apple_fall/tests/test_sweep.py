@@ -0,0 +1,40 @@
+import numpy as np
+import pytest
+
+from applefall.sweep import parameter_grid, run_sweep
+from applefall.trajectory_io import TrajectoryReader
+
+GRID = dict(gravity=[1.6, 9.81], height=np.linspace(0.5, 20.0, 7), mass=[0.2, 1.0], time_scale=[1.0, 0.5])
+
+
+def by_run(records):
+    # A chunk interleaves its runs step by step, and the chunks depend on the
+    # process count, so records are compared run by run
+    return records[np.argsort(records['run_id'], kind='stable')]
+
+
+@pytest.mark.parametrize('method', ['step', 'events'])
+def test_process_pool_matches_inline(method):
+    inline = run_sweep(**GRID, processes=1, method=method)
+    pooled = run_sweep(**GRID, processes=2, method=method)
+
+    np.testing.assert_array_equal(pooled.results, inline.results)
+    np.testing.assert_array_equal(by_run(pooled.trajectories), by_run(inline.trajectories))
+    np.testing.assert_array_equal(np.sort(inline.results['run_id']), np.arange(2 * 7 * 2 * 2))
+    np.testing.assert_allclose(inline.results['fall_time'], inline.results['analytic_fall_time'], rtol=1e-12)
+    np.testing.assert_allclose(inline.results['display_time'],
+                               inline.results['fall_time'] / inline.results['time_scale'])
+
+
+def test_streamed_trajectories_match_the_kept_ones(tmp_path):
+    path = str(tmp_path / 'sweep.bin')
+    kept = run_sweep(**GRID, processes=2)
+    streamed = run_sweep(**GRID, processes=2, path=path)
+
+    assert len(streamed.trajectories) == 0
+    np.testing.assert_array_equal(TrajectoryReader(path).records, kept.trajectories)
+
+
+def test_drops_that_never_land_are_rejected():
+    with pytest.raises(ValueError):
+        parameter_grid(gravity=[9.81, 0.0], height=1.0, mass=1.0)
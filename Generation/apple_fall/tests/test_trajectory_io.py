@@ -0,0 +1,59 @@
+import numpy as np
+import pytest
+
+from applefall.recorder import TrajectoryRecorder
+from applefall.trajectory_io import RECORD_DTYPE, TrajectoryReader, TrajectoryWriter, export_drops
+
+
+def test_write_append_and_read_back(tmp_path):
+    path = str(tmp_path / 'drops.bin')
+    t = np.linspace(0.0, 1.0, 11)
+    # A small chunk, so the records go out in several flushes
+    with TrajectoryWriter(path, chunk_records=4) as writer:
+        writer.write(t, 5.0 - t, -t, 9.81, 0.2, 0)
+        assert writer.next_run_id == 0
+
+    recorder = TrajectoryRecorder()
+    recorder.extend(t[:3], [3.0, 2.0, 1.0], [0.0, -1.0, -2.0])
+    with TrajectoryWriter(path, append=True) as writer:
+        assert writer.next_run_id == 1
+        writer.write_recorder(recorder, 1.6, 0.5, writer.next_run_id)
+
+    reader = TrajectoryReader(path)
+    assert len(reader) == 14
+    assert isinstance(reader.records, np.memmap)
+    np.testing.assert_array_equal(reader.run_ids(), [0, 1])
+    first = reader.run(0)
+    np.testing.assert_array_equal(first['t'], t)
+    np.testing.assert_array_equal(first['position'], 5.0 - t)
+    second = reader.run(1)
+    np.testing.assert_array_equal(second['position'], [3.0, 2.0, 1.0])
+    assert (second['gravity'] == 1.6).all() and (second['mass'] == 0.5).all()
+    np.testing.assert_array_equal(reader.column('velocity')[-3:], [0.0, -1.0, -2.0])
+    with pytest.raises(KeyError):
+        reader.run(2)
+
+
+def test_append_drops_a_torn_record(tmp_path):
+    path = str(tmp_path / 'drops.bin')
+    with TrajectoryWriter(path) as writer:
+        writer.write(np.arange(3.0), 1.0, 0.0, 9.81, 1.0, 7)
+    with open(path, 'ab') as fh:
+        fh.write(b'\0' * (RECORD_DTYPE.itemsize // 2))
+    with TrajectoryWriter(path, append=True) as writer:
+        assert writer.next_run_id == 8
+        writer.write(3.0, 1.0, 0.0, 9.81, 1.0, 8)
+    np.testing.assert_array_equal(TrajectoryReader(path).column('t'), np.arange(4.0))
+
+
+def test_exported_drops_end_at_the_impact(tmp_path):
+    path = str(tmp_path / 'drops.bin')
+    heights = np.array([1.0, 4.0, 9.0])
+    engine = export_drops(path, heights, gravity=9.81)
+    reader = TrajectoryReader(path)
+    for run_id, height in enumerate(heights):
+        run = reader.run(run_id)
+        assert run['position'][0] == height and run['position'][-1] == 0.0
+        assert run['t'][-1] == pytest.approx(np.sqrt(2 * height / 9.81), rel=1e-12)
+        assert (np.diff(run['t']) > 0).all()
+    np.testing.assert_array_equal(engine.stopped[:3], True)
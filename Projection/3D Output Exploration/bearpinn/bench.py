@@ -0,0 +1,155 @@
+"""Headless CPU benchmarks of voxelization, training and reconstruction.
+
+The cases, each measured against the size that drives its cost:
+
+``voxelize``
+    ``voxelize`` of a union of spheres, versus grid size and sphere count
+    (the notebook's ``create_sphere``/``in_sphere`` step).
+``train.epoch``
+    the first ``PINNTrainer.run_epoch`` of a new model on the bear
+    voxelized at a resolution; the model is rebuilt before every run.
+    ``saved_bytes`` is the epoch's peak memory as ``run_epoch`` reports
+    it, and ``occupancy_bytes`` is the training grid the sampler holds.
+``infer.dense`` / ``infer.adaptive``
+    reconstruction of a briefly trained model at a grid size.
+``mesh.surface`` / ``mesh.render``
+    ``marching_cubes`` of the adaptive reconstruction, then ``plot_mesh``
+    drawn on an Agg canvas.  These replaced the ``ax.voxels`` plots.
+
+Each case is timed by ``benchutil.measure``, and the results are saved as
+JSON in the same layout as ``applefall.bench``, whose harness is a copy of
+this one::
+
+    python -m bearpinn.bench --out bench.json
+    python -m bearpinn.bench --out new.json --baseline bench.json
+
+``--quick`` runs the smallest sizes only.
+"""
+import numpy as np
+import torch
+
+from .benchutil import REPEATS, BenchResult, main as run_suite, measure
+
+VOXEL_SIZES = (64, 128, 256)
+PRIMITIVE_COUNTS = (5, 50, 500)
+TRAIN_RESOLUTIONS = (32, 64, 128)
+INFER_SIZES = (64, 128, 256)
+# Epochs of the model that the reconstruction cases evaluate
+TRAIN_EPOCHS = 10
+
+
+def _spheres(count, seed=0):
+    """``count`` random spheres inside the 50^3 domain of ``shapes.bear``."""
+    from .shapes import Sphere, Union
+
+    rng = np.random.default_rng(seed)
+    centers = rng.uniform(10.0, 40.0, (count, 3))
+    radii = rng.uniform(2.0, 10.0, count)
+    return Union(*(Sphere(c, r) for c, r in zip(centers, radii)))
+
+
+def bench_voxelize(sizes=VOXEL_SIZES, counts=PRIMITIVE_COUNTS, repeats=REPEATS):
+    from .shapes import voxelize
+
+    for count in counts:
+        shape = _spheres(count)
+        for size in sizes:
+            seconds, runs = measure(lambda: voxelize(shape, size, lo=0.0, hi=49.0), repeats)
+            yield BenchResult('voxelize', {'size': size, 'primitives': count}, seconds, runs,
+                              {'voxels_per_second': size ** 3 / seconds})
+
+
+def bench_training(resolutions=TRAIN_RESOLUTIONS, repeats=REPEATS):
+    from .model import BearPINN
+    from .sampling import CollocationSampler
+    from .shapes import bear, voxelize
+    from .training import PINNTrainer
+
+    for size in resolutions:
+        occupancy = torch.from_numpy(voxelize(bear(), size, lo=0.0, hi=49.0).astype(np.float32))
+        sampler = trainer = None
+
+        def fresh():
+            # Every timed epoch is the first epoch of a new model, sampler and optimizer
+            nonlocal sampler, trainer
+            torch.manual_seed(0)
+            sampler = CollocationSampler(occupancy, generator=torch.Generator().manual_seed(0))
+            model = BearPINN(grid_size=size)
+            trainer = PINNTrainer(model, torch.optim.Adam(model.parameters(), lr=1e-3))
+
+        epochs = []
+        seconds, runs = measure(lambda: epochs.append(trainer.run_epoch(sampler.batches(), sampler)),
+                                repeats, fresh)
+        yield BenchResult('train.epoch', {'resolution': size}, seconds, runs,
+                          {'saved_bytes': epochs[-1].peak_memory, 'occupancy_bytes': occupancy.nbytes,
+                           'points_per_second': epochs[-1].points / seconds})
+
+
+def trained_model(epochs=TRAIN_EPOCHS, seed=0):
+    """A ``BearPINN`` fitted to the 50^3 bear for a few epochs."""
+    from .model import BearPINN
+    from .sampling import CollocationSampler
+    from .shapes import bear, voxelize
+    from .training import PINNTrainer
+
+    torch.manual_seed(seed)
+    occupancy = torch.from_numpy(voxelize(bear(), 50).astype(np.float32))
+    sampler = CollocationSampler(occupancy, generator=torch.Generator().manual_seed(seed))
+    model = BearPINN(grid_size=50)
+    trainer = PINNTrainer(model, torch.optim.Adam(model.parameters(), lr=1e-2))
+    for _ in range(epochs):
+        trainer.run_epoch(sampler.batches(), sampler)
+    return model.eval()
+
+
+@torch.no_grad()
+def bench_inference(model, sizes=INFER_SIZES, repeats=REPEATS):
+    from matplotlib.backends.backend_agg import FigureCanvasAgg
+    from matplotlib.figure import Figure
+
+    from .inference import infer_adaptive, infer_dense
+    from .mesh import marching_cubes, plot_mesh
+
+    for size in sizes:
+        seconds, runs = measure(lambda: infer_dense(model, size, threshold=0.5), repeats)
+        yield BenchResult('infer.dense', {'size': size}, seconds, runs,
+                          {'points_per_second': size ** 3 / seconds})
+
+        results = []
+        seconds, runs = measure(lambda: results.append(infer_adaptive(model, size)), repeats)
+        volume, stats = results[-1]
+        yield BenchResult('infer.adaptive', {'size': size}, seconds, runs,
+                          {'points': stats.points, 'volume_bytes': volume.nbytes})
+
+        meshes = []
+        seconds, runs = measure(lambda: meshes.append(marching_cubes(volume)), repeats)
+        mesh = meshes[-1]
+        yield BenchResult('mesh.surface', {'size': size}, seconds, runs, {'triangles': len(mesh.faces)})
+
+        def render():
+            figure = Figure(figsize=(6, 6), dpi=100)
+            canvas = FigureCanvasAgg(figure)
+            plot_mesh(figure.add_subplot(projection='3d'), mesh)
+            canvas.draw()
+
+        seconds, runs = measure(render, repeats)
+        yield BenchResult('mesh.render', {'size': size}, seconds, runs, {'triangles': len(mesh.faces)})
+
+
+def run_all(quick=False, repeats=REPEATS):
+    """Every benchmark, as a list of ``BenchResult``."""
+    first = (lambda sizes: sizes[:1]) if quick else (lambda sizes: sizes)
+    results = []
+    results += bench_voxelize(first(VOXEL_SIZES), first(PRIMITIVE_COUNTS), repeats=repeats)
+    results += bench_training(first(TRAIN_RESOLUTIONS), repeats=repeats)
+    results += bench_inference(trained_model(), first(INFER_SIZES), repeats=repeats)
+    return results
+
+
+def main(argv=None):
+    run_suite(run_all, 'bearpinn', 'Benchmark voxelization, training and reconstruction.', argv,
+              {'torch': torch.__version__, 'threads': torch.get_num_threads()})
+
+
+if __name__ == '__main__':
+    main()
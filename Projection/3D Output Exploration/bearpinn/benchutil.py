@@ -0,0 +1,109 @@
+"""Harness of the ``bearpinn.bench`` suite.
+
+A suite is a ``run_all(quick, repeats)`` that returns ``BenchResult`` rows;
+``main`` runs it, prints a table, and saves it as JSON with the commit and
+platform it was measured on.  ``applefall.bench`` keeps its own copy of this
+harness and writes the same layout, so one baseline check reads either::
+
+    python -m bearpinn.bench --out new.json --baseline bench.json
+
+Every case is timed by ``measure``: ``repeats`` runs after one warm-up, of
+which the median is kept.  With ``--baseline``, the cases that got slower by
+more than ``--tolerance`` are listed and the exit status is 1.
+"""
+import argparse
+import json
+import platform
+import subprocess
+import sys
+import time
+from collections import namedtuple
+
+import numpy as np
+
+BenchResult = namedtuple('BenchResult', 'name params seconds runs metrics')
+
+REPEATS = 5
+TOLERANCE = 0.2
+
+
+def measure(fn, repeats=REPEATS, setup=None):
+    """Median and all wall times of ``fn()``, after one warm-up call.
+
+    ``setup``, if given, runs untimed before every call.
+    """
+    runs = []
+    for i in range(repeats + 1):
+        if setup is not None:
+            setup()
+        start = time.perf_counter()
+        fn()
+        if i:
+            runs.append(time.perf_counter() - start)
+    return float(np.median(runs)), runs
+
+
+def _commit():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True,
+                              check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def to_json(results, suite, **versions):
+    """The results as a JSON document; ``versions`` are added to its platform."""
+    return {
+        'suite': suite,
+        'commit': _commit(),
+        'created': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'platform': {'python': platform.python_version(), 'machine': platform.machine(),
+                     'system': platform.system(), 'numpy': np.__version__, **versions},
+        'results': [result._asdict() for result in results],
+    }
+
+
+def compare(current, baseline, tolerance=TOLERANCE):
+    """Cases of ``current`` more than ``tolerance`` slower than in ``baseline``.
+
+    Both are JSON documents; cases are matched by name and parameters.
+    Returns ``(name, params, old_seconds, new_seconds)`` tuples.
+    """
+    def key(result):
+        return result['name'], json.dumps(result['params'], sort_keys=True)
+
+    old = {key(result): result['seconds'] for result in baseline['results']}
+    slower = []
+    for result in current['results']:
+        before = old.get(key(result))
+        if before and result['seconds'] > before * (1 + tolerance):
+            slower.append((result['name'], result['params'], before, result['seconds']))
+    return slower
+
+
+def main(run_all, suite, description, argv=None, versions=None):
+    """Command line of a suite: run ``run_all``, print, save and compare."""
+    parser = argparse.ArgumentParser(description=description)
+    parser.add_argument('--out', metavar='JSON', help='write the results here')
+    parser.add_argument('--baseline', metavar='JSON', help='flag cases slower than in these results')
+    parser.add_argument('--tolerance', type=float, default=TOLERANCE,
+                        help=f'allowed slowdown against the baseline, as a fraction (default {TOLERANCE})')
+    parser.add_argument('--repeats', type=int, default=REPEATS)
+    parser.add_argument('--quick', action='store_true', help='smallest sizes only')
+    options = parser.parse_args(argv)
+
+    results = run_all(options.quick, options.repeats)
+    for result in results:
+        params = ', '.join(f'{k}={v}' for k, v in result.params.items())
+        print(f'{result.name:<16} {params:<28} {result.seconds * 1e3:10.3f} ms')
+    document = to_json(results, suite, **(versions or {}))
+    if options.out:
+        with open(options.out, 'w') as fh:
+            json.dump(document, fh, indent=2)
+    if options.baseline:
+        with open(options.baseline) as fh:
+            slower = compare(document, json.load(fh), options.tolerance)
+        for name, params, before, after in slower:
+            print(f'slower: {name} {params} {before * 1e3:.3f} -> {after * 1e3:.3f} ms')
+        if slower:
+            sys.exit(1)
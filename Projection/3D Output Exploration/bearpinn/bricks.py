@@ -0,0 +1,253 @@
+"""Block-sparse occupancy volumes (a brick map).
+
+A dense ``N^3`` float64 grid costs ``8 N^3`` bytes however little of it the
+shape fills: 8 GB at 1024^3.  ``BrickVolume`` cuts the grid into
+``brick_size^3`` bricks and keeps one state byte per brick.  Bricks that are
+all empty or all full collapse to that byte; only the mixed bricks along the
+surface store their voxels, bit-packed.  Memory then grows with the surface
+area rather than the volume: the bear at 1024^3 takes about 13 MB.
+
+Volumes are built from dense arrays or tensors (``from_dense``) or straight
+from a ``shapes`` scene one slab of bricks at a time (``from_shape``), so the
+dense grid never has to exist.  They answer point queries, iterate over the
+bricks of a region, list the boundary voxels without expanding the interior,
+and convert back with ``to_dense`` and ``to_tensor``.  Indices and shapes
+follow the dense array the volume stands for.
+"""
+import numpy as np
+import torch
+
+from .shapes import Sampling
+
+EMPTY, FULL, MIXED = 0, 1, 2
+# Bricks whose voxels are expanded at once by boundary_voxels
+BOUNDARY_BATCH = 4096
+
+
+def _as_numpy(array):
+    if torch.is_tensor(array):
+        return array.detach().cpu().numpy()
+    return np.asarray(array)
+
+
+class BrickVolume:
+    def __init__(self, shape, brick_size=8):
+        if brick_size < 2 or brick_size & (brick_size - 1):
+            raise ValueError(f'brick_size must be a power of two, not {brick_size}')
+        self.shape = tuple(int(n) for n in shape)
+        self.brick_size = brick_size
+        self.grid = tuple(-(-n // brick_size) for n in self.shape)
+        self.states = np.full(self.grid, EMPTY, dtype=np.int8)
+        # Row of each mixed brick in ``packed``, -1 for the others
+        self.slots = np.full(self.grid, -1, dtype=np.int32)
+        self.packed = np.empty((0, brick_size ** 3 // 8), dtype=np.uint8)
+
+    @classmethod
+    def from_dense(cls, volume, brick_size=8, threshold=0.5):
+        """Bricks of ``volume > threshold`` for a 3-D array or tensor."""
+        bricks = cls(volume.shape, brick_size)
+        rows, stored = [], 0
+        for start in range(0, bricks.shape[0], brick_size):
+            slab = _as_numpy(volume[start:start + brick_size]) > threshold
+            rows.append(bricks._store_slab(start // brick_size, slab, stored))
+            stored += len(rows[-1])
+        bricks._finish(rows)
+        return bricks
+
+    @classmethod
+    def from_shape(cls, shape, size, lo=0.0, hi=None, indexing='ij', brick_size=8):
+        """Voxelize a ``shapes`` scene as ``voxelize`` would, one slab at a time."""
+        if hi is None:
+            hi = np.asarray(size) - 1
+        sampling = Sampling(size, lo, hi, indexing)
+        bricks = cls(sampling.shape, brick_size)
+        full = sampling.full()
+        rows, stored = [], 0
+        for start in range(0, bricks.shape[0], brick_size):
+            region = (slice(start, min(start + brick_size, bricks.shape[0])),) + full[1:]
+            slab = np.zeros(sampling.region_shape(region), dtype=bool)
+            shape.fill(slab, sampling, region, region)
+            rows.append(bricks._store_slab(start // brick_size, slab, stored))
+            stored += len(rows[-1])
+        bricks._finish(rows)
+        return bricks
+
+    @classmethod
+    def from_tensor(cls, tensor, brick_size=8, threshold=0.5):
+        return cls.from_dense(tensor, brick_size, threshold)
+
+    def _store_slab(self, row, slab, stored):
+        """Classify the bricks of one slab; returns the packed mixed bricks."""
+        b = self.brick_size
+        pad = [(0, b - slab.shape[0])] + [(0, g * b - n) for g, n in zip(self.grid[1:], self.shape[1:])]
+        slab = np.pad(slab, pad)
+        bricks = slab.reshape(b, self.grid[1], b, self.grid[2], b).transpose(1, 3, 0, 2, 4)
+        bricks = bricks.reshape(self.grid[1], self.grid[2], -1)
+        count = bricks.sum(axis=-1)
+        states = np.where(count == 0, EMPTY, np.where(count == b ** 3, FULL, MIXED)).astype(np.int8)
+        mixed = states == MIXED
+        self.states[row] = states
+        self.slots[row][mixed] = stored + np.arange(mixed.sum(), dtype=np.int32)
+        return np.packbits(bricks[mixed], axis=-1)
+
+    def store_blocks(self, bricks, voxels):
+        """Set the bricks with flat indices ``bricks`` to the ``(n, B, B, B)`` voxels.
+
+        The bricks must not have been stored as mixed before.
+        """
+        voxels = np.asarray(voxels, dtype=bool).reshape(len(bricks), -1)
+        count = voxels.sum(axis=1)
+        states = np.where(count == 0, EMPTY, np.where(count == voxels.shape[1], FULL, MIXED)).astype(np.int8)
+        mixed = states == MIXED
+        self.states.reshape(-1)[bricks] = states
+        self.slots.reshape(-1)[np.asarray(bricks)[mixed]] = len(self.packed) + np.arange(mixed.sum(), dtype=np.int32)
+        self.packed = np.concatenate([self.packed, np.packbits(voxels[mixed], axis=-1)])
+
+    def _finish(self, rows):
+        if rows:
+            self.packed = np.concatenate(rows)
+
+    @property
+    def nbytes(self):
+        return self.states.nbytes + self.slots.nbytes + self.packed.nbytes
+
+    def count(self):
+        """Number of occupied voxels."""
+        b = self.brick_size
+        total = int((self.states == FULL).sum()) * b ** 3
+        return total + int(np.unpackbits(self.packed, axis=-1).sum())
+
+    def blocks(self, bricks):
+        """Voxels ``(n, B, B, B)`` of the bricks with the given flat brick indices."""
+        b = self.brick_size
+        bricks = np.asarray(bricks, dtype=np.int64)
+        states = self.states.reshape(-1)[bricks]
+        out = np.zeros((len(bricks), b ** 3), dtype=bool)
+        out[states == FULL] = True
+        mixed = states == MIXED
+        if mixed.any():
+            slots = self.slots.reshape(-1)[bricks[mixed]]
+            out[mixed] = np.unpackbits(self.packed[slots], axis=-1).astype(bool)
+        return out.reshape(-1, b, b, b)
+
+    def query(self, points):
+        """Occupancy at ``(n, 3)`` voxel coordinates, rounded to the nearest voxel.
+
+        Points outside the grid are empty.
+        """
+        index = np.rint(_as_numpy(points)).astype(np.int64).reshape(-1, 3)
+        inside = np.all((index >= 0) & (index < self.shape), axis=1)
+        result = np.zeros(len(index), dtype=bool)
+        index = index[inside]
+        b = self.brick_size
+        brick = np.ravel_multi_index(tuple((index // b).T), self.grid)
+        states = self.states.reshape(-1)[brick]
+        hit = states == FULL
+        mixed = states == MIXED
+        if mixed.any():
+            slots = self.slots.reshape(-1)[brick[mixed]]
+            bit = np.ravel_multi_index(tuple((index[mixed] % b).T), (b, b, b))
+            byte = self.packed[slots, bit >> 3]
+            hit[mixed] = (byte >> (7 - (bit & 7))) & 1 == 1
+        result[inside] = hit
+        return result
+
+    def iter_blocks(self, lo=None, hi=None, skip_empty=True):
+        """Yield ``(slices, voxels)`` for the bricks overlapping ``[lo, hi)``.
+
+        ``slices`` index the dense array the volume stands for, and
+        ``voxels`` is the boolean block they select, clipped to the region.
+        """
+        lo = np.zeros(3, dtype=np.int64) if lo is None else np.maximum(lo, 0)
+        hi = np.asarray(self.shape) if hi is None else np.minimum(hi, self.shape)
+        b = self.brick_size
+        first, last = lo // b, -(-hi // b)
+        grid = self.states[first[0]:last[0], first[1]:last[1], first[2]:last[2]]
+        for local in np.argwhere(grid != EMPTY if skip_empty else np.ones(grid.shape, dtype=bool)):
+            brick = first + local
+            start = np.maximum(brick * b, lo)
+            stop = np.minimum(brick * b + b, hi)
+            voxels = self.blocks([np.ravel_multi_index(tuple(brick), self.grid)])[0]
+            inner = tuple(slice(s - o, e - o) for s, e, o in zip(start, stop, brick * b))
+            yield tuple(slice(s, e) for s, e in zip(start, stop)), voxels[inner]
+
+    def boundary_voxels(self):
+        """Sorted flat dense indices of voxels with a differently labelled 6-neighbour.
+
+        The same voxels as ``sampling.boundary_voxels`` on the dense grid, but
+        only mixed bricks and bricks next to a brick in another state are
+        expanded.
+        """
+        states = self.states
+        candidate = states == MIXED
+        for axis in range(3):
+            n = states.shape[axis]
+            differs = np.take(states, range(1, n), axis) != np.take(states, range(n - 1), axis)
+            lower = [slice(None)] * 3
+            upper = [slice(None)] * 3
+            lower[axis], upper[axis] = slice(0, n - 1), slice(1, n)
+            candidate[tuple(lower)] |= differs
+            candidate[tuple(upper)] |= differs
+        bricks = np.flatnonzero(candidate)
+        found = [self._brick_boundary(bricks[i:i + BOUNDARY_BATCH])
+                 for i in range(0, len(bricks), BOUNDARY_BATCH)]
+        return np.sort(np.concatenate(found)) if found else np.empty(0, dtype=np.int64)
+
+    def _brick_boundary(self, bricks):
+        b = self.brick_size
+        origin = np.stack(np.unravel_index(bricks, self.grid), axis=1) * b
+        voxels = self.blocks(bricks)
+        edge = np.zeros_like(voxels)
+        offsets = np.arange(b)
+        valid = [(origin[:, axis, None] + offsets) < self.shape[axis] for axis in range(3)]
+        for axis in range(3):
+            dim = axis + 1
+            shape = [len(bricks), 1, 1, 1]
+            shape[dim] = b - 1
+            pair_valid = valid[axis][:, 1:].reshape(shape)
+            differs = (np.take(voxels, offsets[1:], dim) != np.take(voxels, offsets[:-1], dim)) & pair_valid
+            _index(edge, dim, slice(1, None))[...] |= differs
+            _index(edge, dim, slice(0, -1))[...] |= differs
+            # Faces shared with the neighbouring bricks
+            for step, face, other in ((1, b - 1, 0), (-1, 0, b - 1)):
+                neighbour = origin // b
+                neighbour[:, axis] += step
+                inside = (neighbour[:, axis] >= 0) & (neighbour[:, axis] < self.grid[axis])
+                # The neighbour's voxel must exist in the dense grid too
+                inside &= neighbour[:, axis] * b + other < self.shape[axis]
+                if not inside.any():
+                    continue
+                ids = np.ravel_multi_index(tuple(neighbour[inside].T), self.grid)
+                theirs = _index(self.blocks(ids), dim, other)
+                mine = _index(voxels[inside], dim, face)
+                face_edge = _index(edge, dim, face)
+                face_edge[inside] |= mine != theirs
+        mask = edge & valid[0][:, :, None, None] & valid[1][:, None, :, None] & valid[2][:, None, None, :]
+        n, i, j, k = np.nonzero(mask)
+        coords = (origin[n, 0] + i, origin[n, 1] + j, origin[n, 2] + k)
+        return np.ravel_multi_index(coords, self.shape)
+
+    def slab(self, row):
+        """Dense voxels of one row of bricks along the first axis."""
+        b = self.brick_size
+        ids = np.ravel_multi_index((np.full(self.grid[1:], row),) + tuple(np.indices(self.grid[1:])), self.grid)
+        voxels = self.blocks(ids.reshape(-1)).reshape(self.grid[1], self.grid[2], b, b, b)
+        voxels = voxels.transpose(2, 0, 3, 1, 4).reshape(b, self.grid[1] * b, self.grid[2] * b)
+        return voxels[:self.shape[0] - row * b, :self.shape[1], :self.shape[2]]
+
+    def to_dense(self, dtype=bool):
+        out = np.zeros(self.shape, dtype=dtype)
+        b = self.brick_size
+        for row in range(self.grid[0]):
+            if (self.states[row] != EMPTY).any():
+                out[row * b:(row + 1) * b] = self.slab(row)
+        return out
+
+    def to_tensor(self, dtype=torch.float32, device=None):
+        return torch.from_numpy(self.to_dense()).to(dtype=dtype, device=device)
+
+
+def _index(array, dim, index):
+    key = [slice(None)] * array.ndim
+    key[dim] = index
+    return array[tuple(key)]
@@ -0,0 +1,83 @@
+"""Input encodings that let a small BearPINN fit thin features quickly.
+
+A tanh MLP on raw coordinates is biased towards smooth functions: the ears
+and snout come out blurred, and it takes many epochs to sharpen them.  Both
+encodings here lift the normalized ``[-1, 1]`` coordinates to more features
+before the MLP:
+
+``FourierFeatures``
+    ``sin`` and ``cos`` of random projections ``2 pi B x`` with
+    ``B ~ N(0, scale^2)``, next to ``x`` itself.  A fixed buffer, nothing to
+    train; ``scale`` sets the finest detail the model picks up easily.
+``HashGridEncoding``
+    the multiresolution hash grid of Instant-NGP.  ``levels`` grids from
+    ``base_resolution`` to ``finest_resolution`` cells per axis each store
+    ``features`` trainable values per vertex, trilinearly interpolated.
+    Levels with more vertices than ``2 ** log2_table_size`` share a table
+    through a spatial hash.  All levels and all eight corners are gathered
+    in one indexing operation, which keeps it fast on the CPU.
+
+Both are ordinary modules with an ``out_features`` attribute, passed to
+``BearPINN(encoding=...)``.  The interpolation is differentiable in the
+input, so the autograd and stencil penalties work unchanged.
+"""
+import math
+
+import torch
+import torch.nn as nn
+
+# Spatial hash primes from the Instant-NGP paper; the first axis is not scrambled
+PRIMES = (1, 2654435761, 805459861)
+
+
+class FourierFeatures(nn.Module):
+    def __init__(self, features=64, scale=4.0, in_features=3, generator=None):
+        super().__init__()
+        projection = torch.randn((in_features, features), generator=generator) * scale
+        self.register_buffer('projection', projection * (2 * math.pi))
+        self.out_features = in_features + 2 * features
+
+    def forward(self, x):
+        angles = x @ self.projection
+        return torch.cat([x, torch.sin(angles), torch.cos(angles)], dim=-1)
+
+
+class HashGridEncoding(nn.Module):
+    def __init__(self, levels=8, features=2, log2_table_size=14, base_resolution=4, finest_resolution=64):
+        super().__init__()
+        self.levels = levels
+        self.features = features
+        growth = math.exp((math.log(finest_resolution) - math.log(base_resolution)) / max(levels - 1, 1))
+        resolution = [math.floor(base_resolution * growth ** level) for level in range(levels)]
+        table_size = 2 ** log2_table_size
+        # Coarse levels whose vertices all fit are indexed densely, without hashing
+        sizes = [min((r + 1) ** 3, table_size) for r in resolution]
+        self.register_buffer('resolution', torch.tensor(resolution, dtype=torch.float32))
+        self.register_buffer('table_size', torch.tensor(sizes))
+        self.register_buffer('dense', torch.tensor([(r + 1) ** 3 <= table_size for r in resolution]))
+        self.register_buffer('offset', torch.tensor([0] + sizes[:-1]).cumsum(0))
+        self.register_buffer('corners', torch.tensor([[i & 1, i >> 1 & 1, i >> 2 & 1] for i in range(8)]))
+        self.table = nn.Parameter(torch.empty((sum(sizes), features)).uniform_(-1e-4, 1e-4))
+        self.out_features = levels * features
+
+    def forward(self, x):
+        # [-1, 1] -> [0, resolution] per level, (..., levels, 3)
+        resolution = self.resolution.unsqueeze(-1)
+        position = (x.unsqueeze(-2) + 1) * 0.5 * resolution
+        # The far face x = 1 belongs to the last cell
+        cell = torch.minimum(position.detach().floor(), resolution - 1)
+        frac = position - cell
+        vertex = cell.long().unsqueeze(-2) + self.corners  # (..., levels, 8, 3)
+
+        stride = (self.resolution.long() + 1).unsqueeze(-1)
+        dense = vertex[..., 0] + stride * (vertex[..., 1] + stride * vertex[..., 2])
+        hashed = (vertex[..., 0] * PRIMES[0]) ^ (vertex[..., 1] * PRIMES[1]) ^ (vertex[..., 2] * PRIMES[2])
+        index = torch.where(self.dense.unsqueeze(-1), dense, hashed) % self.table_size.unsqueeze(-1)
+        # Plain indexing: its backward is a scatter-add, where F.embedding sorts
+        values = self.table[index + self.offset.unsqueeze(-1)]  # (..., levels, 8, features)
+
+        # Trilinear weights as an outer product of per-axis weights, in the
+        # corner order i = x + 2y + 4z, then one batched matmul
+        w = torch.stack([1 - frac, frac], dim=-1)  # (..., levels, 3, 2)
+        weight = (w[..., 2, :, None, None] * w[..., 1, None, :, None] * w[..., 0, None, None, :]).flatten(-3)
+        return torch.matmul(weight.unsqueeze(-2), values).flatten(-3)
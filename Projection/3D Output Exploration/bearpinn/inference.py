@@ -0,0 +1,134 @@
+"""Memory-bounded reconstruction of a trained occupancy model on a grid.
+
+The notebook evaluated ``model(coords)`` once over an ``(N^3, 3)`` tensor, so
+the coordinates, activations and outputs all grow with ``N^3``.
+``infer_dense`` walks the grid in fixed-size chunks instead and writes each
+chunk's output straight into the result, so only the result itself is
+``O(N^3)``.
+
+Only the 0.5 iso-surface really matters, and ``infer_adaptive`` uses that.
+It evaluates the model on a coarse lattice at the corners of
+``brick_size^3`` bricks.  A brick whose corners all fall on the same side of
+the threshold is taken to be all empty or all full.  Only the bricks whose
+corners straddle the threshold, plus ``margin`` bricks around them, are
+evaluated voxel by voxel.  Features smaller than a brick that no corner
+touches can be missed; a larger ``margin`` or a smaller brick guards against
+that.  The result is a ``BrickVolume``, or its dense form.
+
+Grids of any ``size`` cover the model's own domain: with a ``grid_size`` of
+50, a 512^3 reconstruction samples ``[0, 49]`` at 512 points per axis.
+
+Both return ``InferenceStats``: the model evaluations made, the voxels of
+the grid, the wall time, and evaluations per second.
+"""
+import time
+from collections import namedtuple
+
+import numpy as np
+import torch
+
+from .bricks import EMPTY, FULL, BrickVolume
+from .model import grid_chunks
+
+InferenceStats = namedtuple('InferenceStats', 'points voxels seconds points_per_second')
+
+# Bricks refined per batch by infer_adaptive
+REFINE_BATCH = 1024
+
+
+def _scale(model, size):
+    """Factor from voxel indices of a ``size^3`` grid to the model's coordinates."""
+    grid_size = getattr(model, 'grid_size', None)
+    return 1.0 if grid_size is None or size == 1 else (grid_size - 1) / (size - 1)
+
+
+def _evaluate(model, coords, chunk_size, scale=1.0):
+    """Model output for ``(n, 3)`` voxel indices, as a float32 array of length n."""
+    device = next(model.parameters()).device
+    out = np.empty(len(coords), dtype=np.float32)
+    for start in range(0, len(coords), chunk_size):
+        chunk = coords[start:start + chunk_size].to(device) * scale
+        out[start:start + chunk_size] = model(chunk).view(-1).cpu().numpy()
+    return out
+
+
+def _stats(points, size, start):
+    seconds = time.perf_counter() - start
+    return InferenceStats(points, size ** 3, seconds, points / seconds if seconds > 0 else 0.0)
+
+
+@torch.no_grad()
+def infer_dense(model, size, chunk_size=1 << 18, threshold=None):
+    """Model output at every voxel of a ``size^3`` grid, ``chunk_size`` points at a time.
+
+    Returns a float32 volume, or a boolean one of ``output > threshold``, and
+    the ``InferenceStats``.
+    """
+    start = time.perf_counter()
+    device = next(model.parameters()).device
+    scale = _scale(model, size)
+    volume = np.empty(size ** 3, dtype=np.float32 if threshold is None else bool)
+    for flat, coords in grid_chunks(size, chunk_size):
+        out = model(coords.to(device) * scale).view(-1).cpu().numpy()
+        volume[flat.numpy()] = out if threshold is None else out > threshold
+    return volume.reshape(size, size, size), _stats(size ** 3, size, start)
+
+
+def _dilate(mask, steps):
+    """Grow ``mask`` by ``steps`` cells in every direction, diagonals included."""
+    for _ in range(steps):
+        for axis in range(mask.ndim):
+            grown = mask.copy()
+            n = mask.shape[axis]
+            grown[(slice(None),) * axis + (slice(1, None),)] |= mask[(slice(None),) * axis + (slice(0, n - 1),)]
+            grown[(slice(None),) * axis + (slice(0, n - 1),)] |= mask[(slice(None),) * axis + (slice(1, None),)]
+            mask = grown
+    return mask
+
+
+@torch.no_grad()
+def infer_adaptive(model, size, brick_size=8, threshold=0.5, margin=0, chunk_size=1 << 18, dense=False):
+    """Occupancy ``output > threshold`` on a ``size^3`` grid, refined only near the surface.
+
+    Returns a ``BrickVolume`` (or, with ``dense``, a boolean array) and the
+    ``InferenceStats``.
+    """
+    start = time.perf_counter()
+    scale = _scale(model, size)
+    volume = BrickVolume((size, size, size), brick_size)
+    grid = volume.grid[0]
+
+    # Brick corners: lattice point k sits at voxel k * brick_size, clamped to the grid
+    axis = torch.clamp(torch.arange(grid + 1) * brick_size, max=size - 1).float()
+    lattice = torch.stack(torch.meshgrid(axis, axis, axis, indexing='ij'), dim=-1).view(-1, 3)
+    inside = (_evaluate(model, lattice, chunk_size, scale) > threshold).reshape(grid + 1, grid + 1, grid + 1)
+    points = len(lattice)
+    corners = [inside[i:i + grid, j:j + grid, k:k + grid] for i in (0, 1) for j in (0, 1) for k in (0, 1)]
+    any_inside = np.logical_or.reduce(corners)
+    all_inside = np.logical_and.reduce(corners)
+    refine = _dilate(any_inside & ~all_inside, margin)
+    # Bricks that reach past the far faces of the grid are only full up to it
+    out = np.arange(grid) * brick_size + brick_size > size
+    edge = out[:, None, None] | out[None, :, None] | out[None, None, :]
+    volume.states[...] = np.where(all_inside & ~edge, FULL, EMPTY)
+    clipped = all_inside & edge & ~refine
+
+    b = brick_size
+    offsets = torch.stack(torch.meshgrid(*[torch.arange(b)] * 3, indexing='ij'), dim=-1).view(1, -1, 3)
+    for bricks, evaluate in ((np.flatnonzero(refine), True), (np.flatnonzero(clipped), False)):
+        for first in range(0, len(bricks), REFINE_BATCH):
+            batch = bricks[first:first + REFINE_BATCH]
+            origin = torch.from_numpy(np.stack(np.unravel_index(batch, volume.grid), axis=1) * b)
+            coords = (origin.unsqueeze(1) + offsets).view(-1, 3)
+            # Padding voxels past the far faces of the grid are not evaluated
+            valid = (coords < size).all(dim=1)
+            if evaluate:
+                voxels = np.zeros(len(coords), dtype=bool)
+                voxels[valid.numpy()] = _evaluate(model, coords[valid].float(), chunk_size, scale) > threshold
+                points += int(valid.sum())
+            else:
+                voxels = valid.numpy()
+            volume.store_blocks(batch, voxels.reshape(len(batch), b, b, b))
+
+    result = volume.to_dense() if dense else volume
+    return result, _stats(points, size, start)
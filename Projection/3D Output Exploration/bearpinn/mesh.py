@@ -0,0 +1,305 @@
+"""Triangle meshes of occupancy volumes: marching cubes, decimation, export.
+
+``marching_cubes`` extracts the ``level`` iso-surface of a dense array or
+tensor, or of a ``BrickVolume``.  Every cell of the grid is classified at
+once by its eight corner values, and the triangles come from a 256-case
+table, so there is no Python loop over cells, only over slabs of
+``slab_size`` cell layers that bound the temporaries.  The table is built at
+import time from the twelve cube edges.  On every face, segments cut off
+the inside corners; when the corners alternate, each inside corner is cut
+off separately.  The segments then chain into loops that are fanned into
+triangles.  Neighbouring cells see the same segments on their shared face,
+so the surface has no cracks.  Vertices on the same grid edge are shared,
+so the result is an indexed mesh with one vertex per crossed edge.
+``closed`` pads the volume with empty space so shapes that touch the
+border are capped.
+
+Vertex coordinates are voxel indices along the array axes, like the
+``ax.voxels`` plots they replace.  ``decimate`` merges vertices that fall in
+the same cell of a coarser grid.  ``write_mesh`` saves binary PLY, OBJ or
+binary glTF (GLB) by file extension.  ``plot_mesh`` draws the triangles
+into a matplotlib 3-D axis with flat shading.
+"""
+import json
+import struct
+from collections import namedtuple
+
+import numpy as np
+import torch
+
+from .bricks import BrickVolume
+
+Mesh = namedtuple('Mesh', 'vertices faces')
+
+# Corner i of a cell sits at offset (i & 1, i >> 1 & 1, i >> 2 & 1)
+CORNERS = np.array([(i & 1, i >> 1 & 1, i >> 2 & 1) for i in range(8)])
+# Edges as (lower corner, axis)
+EDGES = [(c, axis) for axis in range(3) for c in range(8) if not c >> axis & 1]
+
+
+def _faces():
+    """Corner indices of each cube face, counter-clockwise seen from outside."""
+    faces = []
+    for axis in range(3):
+        u, v = (axis + 1) % 3, (axis + 2) % 3
+        for side in (0, 1):
+            ring = [(0, 0), (1, 0), (1, 1), (0, 1)]
+            if side == 0:
+                ring = ring[::-1]
+            corners = []
+            for a, b in ring:
+                offset = [0, 0, 0]
+                offset[axis], offset[u], offset[v] = side, a, b
+                corners.append(offset[0] | offset[1] << 1 | offset[2] << 2)
+            faces.append(corners)
+    return faces
+
+
+def _edge(c0, c1):
+    lower, upper = min(c0, c1), max(c0, c1)
+    return EDGES.index((lower, (upper ^ lower).bit_length() - 1))
+
+
+def _case_triangles(case):
+    inside = [bool(case >> c & 1) for c in range(8)]
+    following = {}
+    for ring in _faces():
+        crossings = []  # (edge, is_exit) in walking order
+        for k in range(4):
+            a, b = ring[k], ring[(k + 1) % 4]
+            if inside[a] != inside[b]:
+                crossings.append((_edge(a, b), inside[a]))
+        if not crossings:
+            continue
+        # Each inside run along the face boundary starts at an entry and ends
+        # at the next exit; join its exit to its entry
+        start = next(i for i, (_, is_exit) in enumerate(crossings) if not is_exit)
+        crossings = crossings[start:] + crossings[:start]
+        for (entry, _), (exit_, _) in zip(crossings[::2], crossings[1::2]):
+            following[exit_] = entry
+    triangles = []
+    while following:
+        first, nxt = following.popitem()
+        loop = [first]
+        while nxt != first:
+            loop.append(nxt)
+            nxt = following.pop(nxt)
+        triangles += [(loop[0], loop[i + 1], loop[i]) for i in range(1, len(loop) - 1)]
+    return triangles
+
+
+def _build_table():
+    cases = [_case_triangles(case) for case in range(256)]
+    width = max(len(t) for t in cases)
+    table = np.full((256, width, 3), -1, dtype=np.int64)
+    for case, triangles in enumerate(cases):
+        if triangles:
+            table[case, :len(triangles)] = triangles
+    return table, np.array([len(t) for t in cases])
+
+
+TRIANGLES, TRIANGLE_COUNTS = _build_table()
+
+
+def _layer_source(volume, closed, fill):
+    """Shape of the (padded) grid and a function returning its rows ``[start, stop)``."""
+    pad = 1 if closed else 0
+    shape = tuple(n + 2 * pad for n in volume.shape)
+
+    if isinstance(volume, BrickVolume):
+        b = volume.brick_size
+
+        def rows(start, stop):
+            lo, hi = max(start - pad, 0), min(stop - pad, volume.shape[0])
+            dense = np.concatenate([volume.slab(row) for row in range(lo // b, -(-hi // b))])
+            return dense[lo - lo // b * b:hi - lo // b * b].astype(np.float32)
+    else:
+        def rows(start, stop):
+            lo, hi = max(start - pad, 0), min(stop - pad, volume.shape[0])
+            block = volume[lo:hi]
+            if torch.is_tensor(block):
+                block = block.detach().cpu().numpy()
+            return np.asarray(block, dtype=np.float32)
+
+    def layers(start, stop):
+        block = rows(start, stop)
+        if pad:
+            before = max(pad - start, 0)
+            after = max(stop - (shape[0] - pad), 0)
+            block = np.pad(block, [(before, after), (1, 1), (1, 1)], constant_values=fill)
+        return block
+
+    return shape, layers
+
+
+def marching_cubes(volume, level=0.5, closed=True, slab_size=32):
+    """Indexed triangle ``Mesh`` of the ``level`` iso-surface of a 3-D volume.
+
+    Faces wind counter-clockwise seen from outside, where outside is below
+    ``level``.
+    """
+    fill = min(0.0, level - 1.0)
+    shape, layers = _layer_source(volume, closed, fill)
+    offset = 1.0 if closed else 0.0
+    strides = np.array([shape[1] * shape[2], shape[2], 1])
+    corner_step = CORNERS @ strides
+    edge_corner = np.array([c for c, _ in EDGES])
+    edge_axis = np.array([axis for _, axis in EDGES])
+
+    ids, positions, faces = [], [], []
+    for start in range(0, shape[0] - 1, slab_size):
+        stop = min(start + slab_size, shape[0] - 1)
+        values = layers(start, stop + 1)
+        above = values > level
+        n0, n1, n2 = (s - 1 for s in values.shape)
+        case = np.zeros((n0, n1, n2), dtype=np.uint8)
+        for c, (dx, dy, dz) in enumerate(CORNERS):
+            case |= above[dx:dx + n0, dy:dy + n1, dz:dz + n2].astype(np.uint8) << c
+        cell = np.flatnonzero(TRIANGLE_COUNTS[case.reshape(-1)])
+        if not len(cell):
+            continue
+        cases = case.reshape(-1)[cell]
+        # Cell index within the slab to its lower grid vertex in the whole grid
+        ci, cj, ck = np.unravel_index(cell, (n0, n1, n2))
+        base = (ci + start) * strides[0] + cj * strides[1] + ck
+        tris = TRIANGLES[cases]
+        keep = np.arange(TRIANGLES.shape[1]) < TRIANGLE_COUNTS[cases][:, None]
+        owner = np.repeat(np.arange(len(cell)), keep.sum(axis=1))
+        local = tris[keep]
+        edge_id = (base[owner, None] + corner_step[edge_corner[local]]) * 3 + edge_axis[local]
+
+        unique, inverse = np.unique(edge_id, return_inverse=True)
+        vertex, axis = unique // 3, unique % 3
+        coords = np.stack(np.unravel_index(vertex, shape), axis=1)
+        flat_in_slab = vertex - start * strides[0]
+        v0 = values.reshape(-1)[flat_in_slab]
+        v1 = values.reshape(-1)[flat_in_slab + strides[axis]]
+        t = (level - v0) / np.where(v1 == v0, 1.0, v1 - v0)
+        coords = coords.astype(np.float32)
+        coords[np.arange(len(unique)), axis] += t
+        ids.append(unique)
+        positions.append(coords - offset)
+        faces.append(unique[inverse.reshape(-1, 3)])
+
+    if not ids:
+        return Mesh(np.empty((0, 3), dtype=np.float32), np.empty((0, 3), dtype=np.int64))
+    # Vertices on slab borders were found by both slabs; keep one of each
+    ids, positions = np.concatenate(ids), np.concatenate(positions)
+    unique, first = np.unique(ids, return_index=True)
+    faces = np.searchsorted(unique, np.concatenate(faces))
+    return Mesh(positions[first], faces)
+
+
+def decimate(mesh, cell_size):
+    """Merge the vertices in each ``cell_size`` cube and drop collapsed triangles."""
+    cell = np.floor(mesh.vertices / cell_size).astype(np.int64)
+    _, cluster, counts = np.unique(cell, axis=0, return_inverse=True, return_counts=True)
+    cluster = cluster.reshape(-1)
+    vertices = np.zeros((len(counts), 3))
+    np.add.at(vertices, cluster, mesh.vertices)
+    vertices /= counts[:, None]
+    faces = cluster[mesh.faces]
+    faces = faces[(faces[:, 0] != faces[:, 1]) & (faces[:, 1] != faces[:, 2]) & (faces[:, 0] != faces[:, 2])]
+    # Keep one triangle per set of three vertices
+    _, keep = np.unique(np.sort(faces, axis=1), axis=0, return_index=True)
+    return Mesh(vertices.astype(np.float32), faces[np.sort(keep)])
+
+
+def vertex_normals(mesh):
+    """Area-weighted unit vertex normals."""
+    v = mesh.vertices.astype(np.float64)
+    face_normals = np.cross(v[mesh.faces[:, 1]] - v[mesh.faces[:, 0]], v[mesh.faces[:, 2]] - v[mesh.faces[:, 0]])
+    normals = np.zeros_like(v)
+    for k in range(3):
+        np.add.at(normals, mesh.faces[:, k], face_normals)
+    length = np.linalg.norm(normals, axis=1, keepdims=True)
+    return (normals / np.where(length == 0, 1.0, length)).astype(np.float32)
+
+
+def write_ply(path, mesh):
+    vertices = mesh.vertices.astype('<f4')
+    faces = np.empty(len(mesh.faces), dtype=[('n', 'u1'), ('index', '<i4', 3)])
+    faces['n'] = 3
+    faces['index'] = mesh.faces
+    header = ('ply\nformat binary_little_endian 1.0\n'
+              f'element vertex {len(vertices)}\n'
+              'property float x\nproperty float y\nproperty float z\n'
+              f'element face {len(faces)}\n'
+              'property list uchar int vertex_indices\nend_header\n')
+    with open(path, 'wb') as fh:
+        fh.write(header.encode('ascii'))
+        fh.write(vertices.tobytes())
+        fh.write(faces.tobytes())
+
+
+def write_obj(path, mesh):
+    with open(path, 'w') as fh:
+        np.savetxt(fh, mesh.vertices, fmt='v %.4f %.4f %.4f')
+        np.savetxt(fh, mesh.faces + 1, fmt='f %d %d %d')
+
+
+def write_glb(path, mesh):
+    """Binary glTF 2.0 with positions, normals and 32-bit indices."""
+    positions = mesh.vertices.astype('<f4')
+    normals = vertex_normals(mesh).astype('<f4')
+    indices = mesh.faces.astype('<u4')
+    gltf = {'asset': {'version': '2.0'}, 'scene': 0, 'scenes': [{'nodes': [0]}], 'nodes': [{}]}
+    if len(indices) == 0:
+        # glTF accessors and buffers may not be empty, so an empty mesh is a bare node
+        blobs = []
+    else:
+        blobs = [positions.tobytes(), normals.tobytes(), indices.tobytes()]
+        views, offset = [], 0
+        for blob, target in zip(blobs, (34962, 34962, 34963)):
+            views.append({'buffer': 0, 'byteOffset': offset, 'byteLength': len(blob), 'target': target})
+            offset += len(blob)  # Every blob is a multiple of 4 bytes
+        gltf.update({
+            'nodes': [{'mesh': 0}],
+            'meshes': [{'primitives': [{'attributes': {'POSITION': 0, 'NORMAL': 1}, 'indices': 2}]}],
+            'buffers': [{'byteLength': offset}],
+            'bufferViews': views,
+            'accessors': [
+                {'bufferView': 0, 'componentType': 5126, 'count': len(positions), 'type': 'VEC3',
+                 'min': positions.min(axis=0).tolist(), 'max': positions.max(axis=0).tolist()},
+                {'bufferView': 1, 'componentType': 5126, 'count': len(normals), 'type': 'VEC3'},
+                {'bufferView': 2, 'componentType': 5125, 'count': indices.size, 'type': 'SCALAR'},
+            ],
+        })
+    header = json.dumps(gltf, separators=(',', ':')).encode('utf-8')
+    header += b' ' * (-len(header) % 4)
+    body = b''.join(blobs)
+    chunks = struct.pack('<II', len(header), 0x4E4F534A) + header
+    if body:
+        chunks += struct.pack('<II', len(body), 0x004E4942) + body
+    with open(path, 'wb') as fh:
+        fh.write(struct.pack('<III', 0x46546C67, 2, 12 + len(chunks)))
+        fh.write(chunks)
+
+
+WRITERS = {'.ply': write_ply, '.obj': write_obj, '.glb': write_glb}
+
+
+def write_mesh(path, mesh):
+    """Save ``mesh`` as binary PLY, OBJ or GLB, chosen by the file extension."""
+    suffix = path[path.rfind('.'):].lower()
+    if suffix not in WRITERS:
+        raise ValueError(f'unknown mesh format {suffix!r}, expected one of {tuple(WRITERS)}')
+    WRITERS[suffix](path, mesh)
+
+
+def plot_mesh(ax, mesh, color=(0.75, 0.55, 0.35), light=(0.3, -0.5, 0.8)):
+    """Draw ``mesh`` into a 3-D axis as one shaded triangle collection."""
+    from mpl_toolkits.mplot3d.art3d import Poly3DCollection
+
+    if len(mesh.faces) == 0:
+        return  # Nothing to draw, and no extent to frame
+    triangles = mesh.vertices[mesh.faces]
+    normals = np.cross(triangles[:, 1] - triangles[:, 0], triangles[:, 2] - triangles[:, 0])
+    normals /= np.maximum(np.linalg.norm(normals, axis=1, keepdims=True), 1e-12)
+    shade = 0.35 + 0.65 * np.clip(normals @ (np.asarray(light) / np.linalg.norm(light)), 0.0, 1.0)
+    ax.add_collection3d(Poly3DCollection(triangles, facecolors=shade[:, None] * np.asarray(color),
+                                         linewidths=0))
+    lo, hi = mesh.vertices.min(axis=0), mesh.vertices.max(axis=0)
+    centre, radius = (lo + hi) / 2, (hi - lo).max() / 2
+    for set_lim, c in zip((ax.set_xlim, ax.set_ylim, ax.set_zlim), centre):
+        set_lim(c - radius, c + radius)
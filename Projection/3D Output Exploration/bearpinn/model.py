@@ -0,0 +1,72 @@
+"""The BearPINN occupancy network and the grid it is trained on.
+
+Coordinates are voxel indices, as in the notebook: a point ``(i, j, k)`` of
+an ``N^3`` grid lies at ``i, j, k`` in ``[0, N - 1]``.
+"""
+import torch
+import torch.nn as nn
+
+from .bricks import BrickVolume
+
+
+class BearPINN(nn.Module):
+    """Occupancy MLP.  With ``grid_size`` the voxel indices are first mapped
+    to ``[-1, 1]``; raw indices in the tens or hundreds saturate the tanh
+    layers and training stalls.  An ``encoding`` module (see ``encoding``)
+    then lifts the coordinates to its ``out_features`` inputs.
+    """
+
+    def __init__(self, grid_size=None, hidden=64, encoding=None):
+        super().__init__()
+        self.grid_size = grid_size
+        self.encoding = encoding
+        self.net = nn.Sequential(
+            nn.Linear(3 if encoding is None else encoding.out_features, hidden),
+            nn.Tanh(),
+            nn.Linear(hidden, hidden),
+            nn.Tanh(),
+            nn.Linear(hidden, 1),
+            nn.Sigmoid()
+        )
+
+    def forward(self, x):
+        if self.grid_size is not None:
+            x = x * (2.0 / (self.grid_size - 1)) - 1.0
+        if self.encoding is not None:
+            x = self.encoding(x)
+        return self.net(x)
+
+
+def grid_coords(size, dtype=torch.float32):
+    """Every voxel of a ``size^3`` grid as an ``(size^3, 3)`` tensor, in C order."""
+    axis = torch.arange(size, dtype=dtype)
+    return torch.stack(torch.meshgrid(axis, axis, axis, indexing='ij'), dim=-1).view(-1, 3)
+
+
+def grid_chunks(size, chunk_size, dtype=torch.float32):
+    """Yield ``(flat, coords)`` for consecutive C-order chunks of a ``size^3`` grid."""
+    total = size ** 3
+    for start in range(0, total, chunk_size):
+        flat = torch.arange(start, min(start + chunk_size, total))
+        coords = torch.stack([flat // size ** 2, flat // size % size, flat % size], dim=1)
+        yield flat, coords.to(dtype)
+
+
+@torch.no_grad()
+def occupancy_iou(model, occupancy, chunk_size=1 << 18):
+    """Intersection over union of ``model > 0.5`` and ``occupancy > 0.5`` on the grid.
+
+    ``occupancy`` is a dense array or tensor or a ``BrickVolume``.
+    """
+    sparse = isinstance(occupancy, BrickVolume)
+    size = occupancy.shape[0]
+    if not sparse:
+        occupancy = torch.as_tensor(occupancy).reshape(-1) > 0.5
+    inter = union = 0
+    # Coordinates are made per chunk, so large grids never exist as a whole
+    for flat, chunk in grid_chunks(size, chunk_size):
+        pred = model(chunk).view(-1) > 0.5
+        true = torch.from_numpy(occupancy.query(chunk)) if sparse else occupancy[flat]
+        inter += (pred & true).sum().item()
+        union += (pred | true).sum().item()
+    return inter / union if union else 1.0
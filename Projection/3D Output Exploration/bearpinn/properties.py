@@ -0,0 +1,194 @@
+"""Mass, centroid, inertia and extents of voxel and point data.
+
+The projection step should hand the physics system a body rather than a
+grid: its mass, where its centre of mass is, how it resists rotation and how
+far it reaches.  ``volume_properties`` gets these from an occupancy volume
+(``bear_volume``, ``infer_dense`` output, a ``BrickVolume``) under a density
+that is either a constant or a function of position.  ``point_properties``
+does the same for point masses.
+
+Nothing is expanded at once.  Dense volumes are read ``slab_size`` rows at a
+time, so a ``np.memmap`` larger than RAM works.  A ``BrickVolume`` is read a
+batch of bricks at a time.  With a constant density, each full brick counts
+as one uniform cube in closed form, and only the mixed bricks on the surface
+are expanded.  Voxels are never listed as points.  Each line of a slab, or
+each brick, is reduced to its mass, centroid and second central moments by
+two matrix products with the cell offsets.  These are merged with the
+parallel-axis theorem, so there are no large raw sums to cancel.
+
+Voxel ``(i, j, k)`` is a cube of side ``voxel_size`` centred on
+``origin + voxel_size * (i, j, k)``.  With ``indexing='xy'`` the first two
+array axes are swapped first, as for ``np.meshgrid`` and ``voxelize``.  The
+inertia tensor is taken about the centroid and includes each voxel's own
+extent.
+
+``fall_state`` turns the results into ``FallEngine.add`` arguments for the
+``apple_fall`` dynamics, with a vertical axis and a horizontal axis picked
+from the three.
+"""
+from collections import namedtuple
+
+import numpy as np
+
+from .bricks import EMPTY, FULL, BrickVolume, _as_numpy
+
+MassProperties = namedtuple('MassProperties', 'mass volume centroid inertia lo hi')
+
+# Bricks of a BrickVolume expanded per batch
+BRICK_BATCH = 4096
+
+
+class _Moments:
+    """Running mass, centroid and second central moments of weighted cells."""
+
+    def __init__(self):
+        self.mass = 0.0
+        self.volume = 0.0
+        self.mean = np.zeros(3)
+        self.scatter = np.zeros((3, 3))
+        self.lo = np.full(3, np.inf)
+        self.hi = np.full(3, -np.inf)
+
+    def add(self, corners, weights, side, volume, offsets=None):
+        """Groups of cubes of side ``side``: cube ``v`` of group ``n`` sits at
+        ``corners[n] + offsets[v]`` with mass ``weights[n, v]``.
+
+        Each group is reduced with two small matrix products over its
+        offsets, so the cells never become an ``(n, 3)`` array of points.
+        """
+        offsets = np.zeros((1, 3)) if offsets is None else offsets
+        weights = weights.reshape(len(corners), len(offsets))
+        self.volume += float(volume)
+        occupied = weights > 0
+        used = occupied.any(axis=1)
+        if not used.any():
+            return
+        corners, weights, occupied = corners[used], weights[used], occupied[used]
+        for axis in range(3):
+            reach = np.where(occupied, offsets[:, axis], np.inf).min(axis=1)
+            self.lo[axis] = min(self.lo[axis], (corners[:, axis] + reach).min() - side / 2)
+            reach = np.where(occupied, offsets[:, axis], -np.inf).max(axis=1)
+            self.hi[axis] = max(self.hi[axis], (corners[:, axis] + reach).max() + side / 2)
+
+        # Per group, about its corner; the offsets are small, so this is exact enough
+        mass = weights.sum(axis=1)
+        local = weights @ offsets / mass[:, None]
+        second = (weights @ (offsets[:, :, None] * offsets[:, None, :]).reshape(-1, 9)).reshape(-1, 3, 3)
+        scatter = (second - mass[:, None, None] * local[:, :, None] * local[:, None, :]).sum(axis=0)
+        # Merge the groups, then the result into the running total (parallel axes)
+        means = corners + local
+        total = mass.sum()
+        mean = mass @ means / total
+        d = means - mean
+        # A uniform cube of side s has variance s^2 / 12 along each axis
+        scatter += (d * mass[:, None]).T @ d + np.eye(3) * (total * side ** 2 / 12)
+        delta = mean - self.mean
+        merged = self.mass + total
+        self.scatter += scatter + np.outer(delta, delta) * (self.mass * total / merged)
+        self.mean += delta * (total / merged)
+        self.mass = float(merged)
+
+    def result(self):
+        if self.mass <= 0:
+            centroid, inertia = np.full(3, np.nan), np.zeros((3, 3))
+        else:
+            centroid = self.mean.copy()
+            inertia = np.eye(3) * np.trace(self.scatter) - self.scatter
+        return MassProperties(self.mass, self.volume, centroid, inertia, self.lo.copy(), self.hi.copy())
+
+
+def _positions(index, voxel_size, origin, indexing):
+    index = np.asarray(index, dtype=np.float64)
+    if indexing == 'xy':
+        index = index[..., [1, 0, 2]]
+    return origin + voxel_size * index
+
+
+def _weights(fill, density, positions, voxel_size):
+    rho = density(positions.reshape(-1, 3)).reshape(positions.shape[:-1]) if callable(density) else density
+    return np.asarray(rho, dtype=np.float64) * fill * voxel_size ** 3
+
+
+def volume_properties(volume, density=1.0, voxel_size=1.0, origin=0.0, indexing='ij', threshold=0.5,
+                      slab_size=8):
+    """``MassProperties`` of the voxels of ``volume > threshold``.
+
+    ``volume`` is a dense array, tensor or memmap, or a ``BrickVolume``.
+    ``density`` is a constant or a function of ``(n, 3)`` positions.  With
+    ``threshold=None`` a dense volume's values are taken as the filled
+    fraction of each voxel, e.g. the probabilities of ``infer_dense``.
+    """
+    origin = np.broadcast_to(np.asarray(origin, dtype=np.float64), (3,))
+    moments = _Moments()
+    if isinstance(volume, BrickVolume):
+        _add_bricks(moments, volume, density, voxel_size, origin, indexing)
+        return moments.result()
+    # Each line of voxels along the last axis is one group
+    depth = volume.shape[2]
+    line = _positions(np.stack([np.zeros(depth), np.zeros(depth), np.arange(depth)], axis=1), voxel_size, 0.0, indexing)
+    for start in range(0, volume.shape[0], slab_size):
+        slab = _as_numpy(volume[start:start + slab_size])
+        fill = slab.astype(np.float64) if threshold is None else (slab > threshold).astype(np.float64)
+        fill = fill.reshape(-1, depth)
+        rows = np.stack(np.unravel_index(np.arange(len(fill)), slab.shape[:2]), axis=1)
+        rows[:, 0] += start
+        corners = _positions(np.concatenate([rows, np.zeros((len(rows), 1))], axis=1), voxel_size, origin, indexing)
+        positions = corners[:, None, :] + line if callable(density) else None
+        weights = _weights(fill, density, positions, voxel_size)
+        moments.add(corners, weights, voxel_size, fill.sum() * voxel_size ** 3, line)
+    return moments.result()
+
+
+def _add_bricks(moments, volume, density, voxel_size, origin, indexing):
+    b = volume.brick_size
+    bricks = np.flatnonzero(volume.states != EMPTY)
+    corner = np.stack(np.unravel_index(bricks, volume.grid), axis=1) * b
+    inside = np.all(corner + b <= np.asarray(volume.shape), axis=1)
+    solid = (volume.states.reshape(-1)[bricks] == FULL) & inside
+    if not callable(density) and solid.any():
+        # Whole bricks as single cubes centred between their middle voxels
+        centers = _positions(corner[solid] + (b - 1) / 2, voxel_size, origin, indexing)
+        mass = np.full(len(centers), float(density) * (b * voxel_size) ** 3)
+        moments.add(centers, mass, b * voxel_size, len(centers) * (b * voxel_size) ** 3)
+        bricks, corner, inside = bricks[~solid], corner[~solid], inside[~solid]
+    grid = np.stack(np.meshgrid(*[np.arange(b)] * 3, indexing='ij'), axis=-1).reshape(-1, 3)
+    offsets = _positions(grid, voxel_size, 0.0, indexing)
+    for first in range(0, len(bricks), BRICK_BATCH):
+        batch = slice(first, first + BRICK_BATCH)
+        fill = volume.blocks(bricks[batch]).reshape(-1, b ** 3)
+        # Full bricks at the far faces reach past the grid
+        edge = np.flatnonzero(~inside[batch])
+        fill[edge] &= np.all(corner[batch][edge, None, :] + grid < np.asarray(volume.shape), axis=-1)
+        corners = _positions(corner[batch], voxel_size, origin, indexing)
+        positions = corners[:, None, :] + offsets if callable(density) else None
+        weights = _weights(fill, density, positions, voxel_size)
+        moments.add(corners, weights, voxel_size, fill.sum() * voxel_size ** 3, offsets)
+
+
+def point_properties(points, masses=1.0, chunk_size=1 << 20):
+    """``MassProperties`` of point masses at ``(n, 3)`` positions, ``chunk_size`` at a time.
+
+    ``volume`` is 0 and the extents are those of the points themselves.
+    """
+    moments = _Moments()
+    for start in range(0, len(points), chunk_size):
+        chunk = _as_numpy(points[start:start + chunk_size]).astype(np.float64).reshape(-1, 3)
+        weight = _as_numpy(masses[start:start + chunk_size]) if np.ndim(masses) else masses
+        moments.add(chunk, np.broadcast_to(np.asarray(weight, dtype=np.float64), (len(chunk),)), 0.0, 0.0)
+    return moments.result()
+
+
+def fall_state(properties, up=2, across=0, floor=0.0):
+    """``FallEngine.add`` keyword arguments for one or more ``MassProperties``.
+
+    The engine places a body by the left edge (``x``) and the height of the
+    bottom above the floor (``y``).  Here those are the lower extents along
+    the ``across`` and ``up`` axes, with the engine's floor at ``floor``
+    along ``up``::
+
+        engine.add(**fall_state(volume_properties(bear_volume, indexing='xy')))
+    """
+    if isinstance(properties, MassProperties):
+        properties = [properties]
+    lo = np.array([p.lo for p in properties])
+    return {'x': lo[:, across], 'y': lo[:, up] - floor, 'mass': np.array([p.mass for p in properties])}
@@ -0,0 +1,144 @@
+"""Mini-batch collocation sampling for occupancy PINNs on large grids.
+
+Training full-batch on every voxel of an ``N^3`` grid costs ``O(N^3)`` per
+epoch, and almost all of those voxels are deep inside or far outside the
+shape, where the label is trivial.  ``CollocationSampler`` instead streams
+fixed-size shuffled mini-batches drawn from three sources:
+
+* uniform voxels anywhere in the grid, so empty space is not forgotten;
+* points jittered around the boundary voxels (those that differ from one of
+  their six neighbours), in a band that narrows over a curriculum while the
+  share of boundary points grows;
+* a pool of the points with the highest recent loss, refilled from the
+  per-point losses reported back by the training loop.
+
+An epoch is a fixed number of batches, so its cost depends on the batch size
+and not on the grid volume.  Labels come from the nearest voxel, of a dense
+grid or of a ``BrickVolume`` for grids too large to hold densely.
+"""
+import math
+
+import torch
+
+from .bricks import BrickVolume
+
+# Shares of a batch taken from the boundary band and from the residual pool
+SURFACE_FRACTION = (0.3, 0.7)  # at the start and at the end of the curriculum
+RESIDUAL_FRACTION = 0.2
+# Standard deviation of the jitter around boundary voxels, in voxels
+BAND_WIDTH = (4.0, 0.5)
+
+
+def boundary_voxels(occupancy):
+    """Flat indices of occupied/empty voxels with a differently labelled 6-neighbour."""
+    occ = torch.as_tensor(occupancy) > 0.5
+    edge = torch.zeros_like(occ)
+    for dim in range(occ.dim()):
+        n = occ.shape[dim]
+        differs = occ.narrow(dim, 1, n - 1) != occ.narrow(dim, 0, n - 1)
+        edge.narrow(dim, 1, n - 1).logical_or_(differs)
+        edge.narrow(dim, 0, n - 1).logical_or_(differs)
+    return edge.view(-1).nonzero().squeeze(1)
+
+
+def _lerp(pair, t):
+    start, end = pair
+    return start + (end - start) * t
+
+
+class CollocationSampler:
+    def __init__(self, occupancy, batch_size=4096, batches_per_epoch=32, curriculum_epochs=50,
+                 surface_fraction=SURFACE_FRACTION, band_width=BAND_WIDTH,
+                 residual_fraction=RESIDUAL_FRACTION, pool_size=65536, generator=None):
+        if isinstance(occupancy, BrickVolume):
+            self.occupancy = occupancy
+            self.flat_labels = None
+            self.boundary = torch.from_numpy(occupancy.boundary_voxels())
+        else:
+            self.occupancy = (torch.as_tensor(occupancy) > 0.5).float()
+            self.flat_labels = self.occupancy.view(-1)
+            self.boundary = boundary_voxels(self.occupancy)
+        self.shape = tuple(self.occupancy.shape)
+        self.batch_size = batch_size
+        self.batches_per_epoch = batches_per_epoch
+        self.curriculum_epochs = curriculum_epochs
+        self.surface_fraction = surface_fraction
+        self.band_width = band_width
+        self.residual_fraction = residual_fraction
+        self.pool_size = pool_size
+        self.generator = generator
+        self.epoch = 0
+        self.pool_points = torch.empty((0, 3))
+        self.pool_loss = torch.empty(0)
+        self._upper = torch.tensor(self.shape, dtype=torch.float32) - 1
+
+    def schedule(self, epoch=None):
+        """``(surface_fraction, band_width)`` for an epoch of the curriculum."""
+        epoch = self.epoch if epoch is None else epoch
+        t = min(epoch / self.curriculum_epochs, 1.0) if self.curriculum_epochs else 1.0
+        return _lerp(self.surface_fraction, t), _lerp(self.band_width, t)
+
+    def batches(self):
+        """Yield one epoch of ``(points, labels)`` mini-batches."""
+        for _ in range(self.batches_per_epoch):
+            yield self.sample(self.batch_size)
+        self.epoch += 1
+
+    def sample(self, n):
+        surface, band = self.schedule()
+        n_residual = min(int(n * self.residual_fraction), len(self.pool_loss))
+        n_surface = int(n * surface) if len(self.boundary) else 0
+        parts = [self._from_pool(n_residual),
+                 self._near_boundary(n_surface, band),
+                 self._uniform(n - n_residual - n_surface)]
+        points = torch.cat(parts)
+        points = points[torch.randperm(len(points), generator=self.generator)]
+        return points, self.labels(points)
+
+    def labels(self, points):
+        """Occupancy of the voxel nearest to each point, as an ``(n, 1)`` column."""
+        if self.flat_labels is None:
+            return torch.from_numpy(self.occupancy.query(points)).float().unsqueeze(1)
+        index = points.round().long()
+        flat = index[:, 0]
+        for dim in range(1, len(self.shape)):
+            flat = flat * self.shape[dim] + index[:, dim]
+        return self.flat_labels[flat].unsqueeze(1)
+
+    def report(self, points, losses):
+        """Feed back per-point losses; the highest ones are kept for resampling."""
+        points = torch.cat([self.pool_points, points.detach().reshape(-1, 3).float()])
+        losses = torch.cat([self.pool_loss, losses.detach().reshape(-1).float()])
+        if len(losses) > self.pool_size:
+            losses, keep = losses.topk(self.pool_size, sorted=False)
+            points = points[keep]
+        self.pool_points, self.pool_loss = points, losses
+
+    def _uniform(self, n):
+        index = torch.randint(math.prod(self.shape), (n,), generator=self.generator)
+        return self._unravel(index).float()
+
+    def _near_boundary(self, n, band):
+        pick = torch.randint(len(self.boundary), (n,), generator=self.generator)
+        centres = self._unravel(self.boundary[pick]).float()
+        jitter = torch.randn(centres.shape, generator=self.generator) * band
+        return torch.minimum(torch.clamp(centres + jitter, min=0.0), self._upper)
+
+    def _from_pool(self, n):
+        if n == 0:
+            return torch.empty((0, 3))
+        # Draw in proportion to the loss; drawn points leave the pool and only
+        # come back if they are still hard when their new loss is reported
+        pick = torch.multinomial(self.pool_loss.clamp(min=1e-12), n, generator=self.generator)
+        points = self.pool_points[pick]
+        keep = torch.ones(len(self.pool_loss), dtype=torch.bool)
+        keep[pick] = False
+        self.pool_points, self.pool_loss = self.pool_points[keep], self.pool_loss[keep]
+        return points
+
+    def _unravel(self, flat):
+        coords = []
+        for size in reversed(self.shape):
+            coords.append(flat % size)
+            flat = flat // size
+        return torch.stack(coords[::-1], dim=1)
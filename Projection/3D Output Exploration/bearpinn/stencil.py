@@ -0,0 +1,59 @@
+"""Finite-difference derivative penalties on grid-aligned patches.
+
+The training points live on a regular voxel grid, so the derivatives the
+penalties need can be read off neighbouring predictions instead of being
+differentiated through the network.  Predictions on ``size^3`` blocks of
+voxels are reshaped to ``(patches, 1, size, size, size)`` and one ``conv3d``
+with four fixed 3x3x3 kernels gives the central-difference gradient and the
+7-point Laplacian at every interior voxel.  That needs no ``requires_grad``
+inputs and no ``create_graph`` backward, only the ordinary backward through
+a plain forward pass.  The same functions work on a whole grid, reshaped to
+``(1, 1, N, N, N)``.
+"""
+import torch
+import torch.nn.functional as F
+
+
+def derivative_kernels(spacing=1.0, dtype=torch.float32, device=None):
+    """Kernels for d/dx, d/dy, d/dz and the Laplacian, shape ``(4, 1, 3, 3, 3)``."""
+    kernels = torch.zeros((4, 1, 3, 3, 3), dtype=dtype, device=device)
+    for axis in range(3):
+        lo, hi = [1, 1, 1], [1, 1, 1]
+        lo[axis], hi[axis] = 0, 2
+        kernels[(axis, 0) + tuple(lo)] = -0.5 / spacing
+        kernels[(axis, 0) + tuple(hi)] = 0.5 / spacing
+        kernels[(3, 0) + tuple(lo)] = 1.0 / spacing ** 2
+        kernels[(3, 0) + tuple(hi)] = 1.0 / spacing ** 2
+    kernels[3, 0, 1, 1, 1] = -6.0 / spacing ** 2
+    return kernels
+
+
+def patch_points(count, size, grid_size, generator=None):
+    """Voxel coordinates of ``count`` random ``size^3`` blocks inside the grid."""
+    corners = torch.randint(grid_size - size + 1, (count, 1, 3), generator=generator)
+    axis = torch.arange(size)
+    offsets = torch.stack(torch.meshgrid(axis, axis, axis, indexing='ij'), dim=-1).view(1, -1, 3)
+    return (corners + offsets).view(-1, 3).float()
+
+
+def grid_derivatives(values, spacing=1.0):
+    """Gradient ``(P, 3, ...)`` and Laplacian ``(P, 1, ...)`` at the interior voxels.
+
+    ``values`` has shape ``(P, 1, D, H, W)``; the results lose one voxel on
+    each side.
+    """
+    kernels = derivative_kernels(spacing, values.dtype, values.device)
+    out = F.conv3d(values, kernels)
+    return out[:, :3], out[:, 3:]
+
+
+def stencil_penalties(values, spacing=1.0):
+    """Mean squared gradient and mean squared Laplacian of gridded predictions."""
+    grad, lap = grid_derivatives(values, spacing)
+    return grad.pow(2).sum(dim=1).mean(), lap.pow(2).mean()
+
+
+def interior_points(count, size):
+    """Flat indices, within a batch of ``size^3`` patches, of the interior voxels."""
+    index = torch.arange(count * size ** 3).view(count, size, size, size)
+    return index[:, 1:-1, 1:-1, 1:-1].reshape(-1)
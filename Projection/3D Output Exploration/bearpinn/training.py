@@ -0,0 +1,275 @@
+"""Training steps that get the data loss and input-gradient penalties from
+one forward pass.
+
+The notebook loop used to run the model twice per batch: once for the BCE
+loss and once more, with ``requires_grad`` on the inputs, for the smoothness
+penalty.  Here the outputs and their input gradients come out of a single
+pass, using one of three methods:
+
+``'autograd'``
+    one forward pass with ``requires_grad`` inputs and
+    ``autograd.grad(..., create_graph=True)``.  The fastest on the CPU.
+``'func'``
+    ``torch.func.vmap(jacfwd(...))``: forward-mode differentiation carries
+    the three input tangents through the same pass that computes the
+    outputs, so there is no double backward, but for a net this narrow the
+    tangents cost more than they save.
+``'twopass'``
+    the original two-forward loop, kept as the baseline for benchmarks.
+
+Each penalty (the squared gradient, ``smoothness``, and the squared
+Laplacian) is computed either by ``'autograd'`` at the batch points or by
+``'stencil'``: finite differences over predictions on a few random voxel
+patches (see ``stencil``).  A stencil-only step is one plain forward and one
+ordinary backward.  ``benchmark_penalties`` compares the two modes.
+
+``torch.compile`` is not offered: it cannot compile the double backward the
+gradient penalty needs, and a compiled ``'func'`` step fails as well.
+
+``time_to_iou`` trains a model until it reaches a target IoU, to compare
+architectures and input encodings by training time.
+
+``PINNTrainer.run_epoch`` reports the wall time of an epoch and its peak
+memory: CUDA's high-water mark on a GPU, and on the CPU the most bytes
+autograd saved for backward in any batch of the epoch, which is what the
+methods differ in.
+"""
+import time
+from collections import namedtuple
+
+import torch
+import torch.nn.functional as F
+from torch.func import jacfwd, vmap
+
+from .model import occupancy_iou
+from .sampling import CollocationSampler
+from .stencil import interior_points, patch_points, stencil_penalties
+
+METHODS = ('autograd', 'func', 'twopass')
+PENALTY_MODES = ('autograd', 'stencil')
+
+StepStats = namedtuple('StepStats', 'loss data_loss smoothness_loss laplacian_loss point_loss')
+EpochStats = namedtuple('EpochStats', 'loss seconds points peak_memory')
+PenaltyTiming = namedtuple('PenaltyTiming', 'mode seconds smoothness laplacian')
+IoUTiming = namedtuple('IoUTiming', 'epochs seconds iou')
+
+
+def input_derivatives(model, points, method='autograd', laplacian=False):
+    """Outputs ``(n, 1)``, input gradients ``(n, 3)`` and, if asked for,
+    Laplacians ``(n, 1)``, all from one forward pass.
+    """
+    if method == 'func':
+        def output(x):
+            out = model(x)
+            return out, out
+        if not laplacian:
+            jac, out = vmap(jacfwd(output, has_aux=True))(points)
+            return out, jac.squeeze(1), None
+
+        def gradient(x):
+            jac, out = jacfwd(output, has_aux=True)(x)
+            return jac.squeeze(0), (jac.squeeze(0), out)
+        hessian, (grad, out) = vmap(jacfwd(gradient, has_aux=True))(points)
+        return out, grad, hessian.diagonal(dim1=1, dim2=2).sum(dim=1, keepdim=True)
+
+    points = points.detach().requires_grad_(True)
+    out = model(points)
+    grad, = torch.autograd.grad(out, points, torch.ones_like(out), create_graph=True)
+    lap = None
+    if laplacian:
+        lap = sum(torch.autograd.grad(grad[:, axis].sum(), points, create_graph=True)[0][:, axis]
+                  for axis in range(points.shape[1])).unsqueeze(1)
+    return out, grad, lap
+
+
+def saved_tensor_bytes(fn, *args):
+    """Call ``fn(*args)`` and count the bytes autograd saves for its backward."""
+    seen = {}
+
+    def pack(tensor):
+        try:
+            storage = tensor.untyped_storage()
+            seen[(storage.data_ptr(), tensor.device)] = storage.nbytes()
+        except RuntimeError:  # No storage of its own, e.g. a torch.func wrapper
+            seen[id(tensor)] = tensor.numel() * tensor.element_size()
+        return tensor
+
+    with torch.autograd.graph.saved_tensors_hooks(pack, lambda tensor: tensor):
+        result = fn(*args)
+    return result, sum(seen.values())
+
+
+class PINNTrainer:
+    """Optimizer steps on BCE plus weighted smoothness and Laplacian penalties.
+
+    ``smoothness_mode`` and ``laplacian_mode`` pick ``'autograd'`` or
+    ``'stencil'`` per penalty; stencil penalties are taken over ``patches``
+    random blocks of ``patch_size^3`` voxels of a ``grid_size^3`` grid
+    (by default the model's own ``grid_size``).
+    """
+
+    def __init__(self, model, optimizer, smoothness_weight=0.01, laplacian_weight=0.0, method='autograd',
+                 smoothness_mode='autograd', laplacian_mode='autograd', patches=16, patch_size=8,
+                 grid_size=None, generator=None):
+        if method not in METHODS:
+            raise ValueError(f'unknown method {method!r}, expected one of {METHODS}')
+        for mode in (smoothness_mode, laplacian_mode):
+            if mode not in PENALTY_MODES:
+                raise ValueError(f'unknown penalty mode {mode!r}, expected one of {PENALTY_MODES}')
+        self.model = model
+        self.optimizer = optimizer
+        self.smoothness_weight = smoothness_weight
+        self.laplacian_weight = laplacian_weight
+        self.method = method
+        self.modes = {'smoothness': smoothness_mode, 'laplacian': laplacian_mode}
+        self.patches = patches
+        self.patch_size = patch_size
+        self.grid_size = getattr(model, 'grid_size', None) if grid_size is None else grid_size
+        self.generator = generator
+        if 'stencil' in self._penalty_modes().values() and self.grid_size is None:
+            raise ValueError('stencil penalties need a grid_size')
+
+    def _penalty_modes(self):
+        """Mode of every penalty with a non-zero weight."""
+        weights = {'smoothness': self.smoothness_weight, 'laplacian': self.laplacian_weight}
+        return {name: self.modes[name] for name, weight in weights.items() if weight}
+
+    def losses(self, points, labels):
+        """Per-point data loss ``(n, 1)`` and the mean squared gradient and Laplacian.
+
+        Penalties whose weight is zero come back as zero and cost nothing.
+        """
+        zero = points.new_zeros(())
+        penalty = {'smoothness': zero, 'laplacian': zero}
+        modes = self._penalty_modes()
+        by_autograd = {name for name, mode in modes.items() if mode == 'autograd'}
+        by_stencil = set(modes) - by_autograd
+
+        patch = None
+        if by_stencil:
+            patch = patch_points(self.patches, self.patch_size, self.grid_size, self.generator).to(points)
+        if by_autograd:
+            method = 'autograd' if self.method == 'twopass' else self.method
+            out, grad, lap = input_derivatives(self.model, points, method, 'laplacian' in by_autograd)
+            if self.method == 'twopass':
+                out = self.model(points)
+            penalty['smoothness'] = grad.pow(2).sum(dim=1).mean()
+            if lap is not None:
+                penalty['laplacian'] = lap.pow(2).mean()
+            patch_out = self.model(patch) if patch is not None else None
+        elif patch is not None:
+            # Batch and patches share one plain forward pass
+            both = self.model(torch.cat([points, patch]))
+            out, patch_out = both[:len(points)], both[len(points):]
+        else:
+            out = self.model(points)
+
+        if by_stencil:
+            size = self.patch_size
+            grid = patch_out.view(self.patches, 1, size, size, size)
+            smoothness, laplacian = stencil_penalties(grid)
+            if 'smoothness' in by_stencil:
+                penalty['smoothness'] = smoothness
+            if 'laplacian' in by_stencil:
+                penalty['laplacian'] = laplacian
+        point_loss = F.binary_cross_entropy(out, labels, reduction='none')
+        return point_loss, penalty['smoothness'], penalty['laplacian']
+
+    def step(self, points, labels, measure=False):
+        """One optimizer step; with ``measure`` also return the saved-tensor bytes."""
+        self.optimizer.zero_grad(set_to_none=True)
+        if measure:
+            (point_loss, smoothness, laplacian), saved = saved_tensor_bytes(self.losses, points, labels)
+        else:
+            point_loss, smoothness, laplacian = self.losses(points, labels)
+        data_loss = point_loss.mean()
+        loss = data_loss + self.smoothness_weight * smoothness + self.laplacian_weight * laplacian
+        loss.backward()
+        self.optimizer.step()
+        stats = StepStats(loss.detach(), data_loss.detach(), smoothness.detach(), laplacian.detach(),
+                          point_loss.detach().view(-1))
+        return (stats, saved) if measure else stats
+
+    def run_epoch(self, batches, sampler=None):
+        """Train on every ``(points, labels)`` batch; report losses back to ``sampler``."""
+        device = next(self.model.parameters()).device
+        cuda = device.type == 'cuda'
+        if cuda:
+            torch.cuda.reset_peak_memory_stats(device)
+        peak = None if cuda else 0
+        total = torch.zeros((), device=device)
+        points_seen = 0
+        start = time.perf_counter()
+        for points, labels in batches:
+            points, labels = points.to(device), labels.to(device)
+            if cuda:
+                stats = self.step(points, labels)
+            else:
+                stats, saved = self.step(points, labels, measure=True)
+                peak = max(peak, saved)
+            total += stats.loss * len(points)
+            points_seen += len(points)
+            if sampler is not None:
+                sampler.report(points.cpu(), stats.point_loss.cpu())
+        if cuda:
+            torch.cuda.synchronize(device)
+            peak = torch.cuda.max_memory_allocated(device)
+        seconds = time.perf_counter() - start
+        return EpochStats(total.item() / max(points_seen, 1), seconds, points_seen, peak)
+
+
+def benchmark_penalties(model, grid_size, patches=32, patch_size=8, repeats=5, generator=None):
+    """Time both penalties in both modes on the same interior voxels.
+
+    Each timing is one forward plus backward of the two penalties.  Returns
+    the autograd and stencil ``PenaltyTiming`` and the relative error of the
+    stencil values against the autograd ones.
+    """
+    points = patch_points(patches, patch_size, grid_size, generator)
+    interior = points[interior_points(patches, patch_size)]
+
+    def autograd_penalties():
+        _, grad, lap = input_derivatives(model, interior, 'autograd', laplacian=True)
+        return grad.pow(2).sum(dim=1).mean(), lap.pow(2).mean()
+
+    def stencil():
+        size = patch_size
+        return stencil_penalties(model(points).view(patches, 1, size, size, size))
+
+    timings = []
+    for mode, penalties in (('autograd', autograd_penalties), ('stencil', stencil)):
+        penalties()  # Warm up
+        start = time.perf_counter()
+        for _ in range(repeats):
+            model.zero_grad(set_to_none=True)
+            smoothness, laplacian = penalties()
+            (smoothness + laplacian).backward()
+        seconds = (time.perf_counter() - start) / repeats
+        timings.append(PenaltyTiming(mode, seconds, smoothness.item(), laplacian.item()))
+    model.zero_grad(set_to_none=True)
+    exact, approx = timings
+    error = {name: abs(getattr(approx, name) - getattr(exact, name)) / max(abs(getattr(exact, name)), 1e-12)
+             for name in ('smoothness', 'laplacian')}
+    return exact, approx, error
+
+
+def time_to_iou(model, occupancy, target_iou=0.95, max_epochs=200, lr=1e-3, eval_every=5,
+                sampler_options=None, trainer_options=None, seed=0):
+    """Train ``model`` with Adam until its IoU on ``occupancy`` reaches ``target_iou``.
+
+    The IoU is checked every ``eval_every`` epochs and its cost is left out
+    of the timing.  Returns an ``IoUTiming`` of the epochs and training
+    seconds it took (epochs is None if the target was never reached) and
+    the last IoU measured.
+    """
+    generator = torch.Generator().manual_seed(seed)
+    sampler = CollocationSampler(occupancy, generator=generator, **(sampler_options or {}))
+    trainer = PINNTrainer(model, torch.optim.Adam(model.parameters(), lr=lr), **(trainer_options or {}))
+    seconds, iou = 0.0, 0.0
+    for epoch in range(1, max_epochs + 1):
+        seconds += trainer.run_epoch(sampler.batches(), sampler).seconds
+        if epoch % eval_every == 0 or epoch == max_epochs:
+            iou = occupancy_iou(model, occupancy)
+            if iou >= target_iou:
+                return IoUTiming(epoch, seconds, iou)
+    return IoUTiming(None, seconds, iou)
@@ -0,0 +1,152 @@
+"""Compact interactive 3-D views as standalone HTML pages.
+
+Saving a plotly figure inlines all of plotly.js and writes every coordinate
+as JSON text, so even a single sphere (``interactive_sphere.html``) comes to
+4 MB.  Pages written here hold only the scene.  The viewer runtime,
+``viewer.js`` (a few hundred lines of plain WebGL, about 13 KB), is copied
+once next to them and shared by every page in that directory.  With
+``inline=True`` a page carries its own copy instead, so it is one
+self-contained file.
+
+Arrays are stored as base64 typed arrays.  Positions are quantized to
+uint16 per axis over the layer's bounding box, and the shader scales them
+back on the GPU.  That keeps about 1/65535 of the box, far below a voxel.
+Mesh indices are uint16 when they fit, and per-point values are uint16 over
+their range.  Normals are rebuilt in the browser rather than stored.
+
+Layers above a budget are thinned before export.  Meshes go through
+``mesh.decimate`` with a growing cell size until they fit ``max_faces``.
+Point clouds are shuffled and cut to ``max_points``.  Because they are
+shuffled, any prefix is an even sample, and the viewer draws only the
+first ``interactive_points`` while the camera moves.
+"""
+import base64
+import json
+import os
+import shutil
+
+import numpy as np
+
+from .mesh import decimate
+
+RUNTIME = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'viewer.js')
+MAX_FACES = 40_000
+MAX_POINTS = 100_000
+INTERACTIVE_POINTS = 25_000
+
+PAGE = '''<!DOCTYPE html>
+<html>
+<head>
+<meta charset="utf-8">
+<title>{title}</title>
+<style>
+html, body, #view {{ margin: 0; width: 100%; height: 100%; overflow: hidden; }}
+#view {{ position: relative; }}
+.bearpinn-info {{
+  position: absolute; top: 10px; left: 12px;
+  font: 14px sans-serif; color: #333; pointer-events: none;
+}}
+</style>
+</head>
+<body>
+<div id="view"></div>
+{runtime}
+<script type="application/json" id="scene">{scene}</script>
+<script>
+BearViewer.render(document.getElementById('view'),
+                  JSON.parse(document.getElementById('scene').textContent));
+</script>
+</body>
+</html>
+'''
+
+
+def _encode(array, dtype):
+    array = np.ascontiguousarray(array, dtype='<' + dtype)
+    return {'dtype': dtype, 'data': base64.b64encode(array.tobytes()).decode('ascii')}
+
+
+def _positions(points, quantize):
+    points = np.asarray(points, dtype=np.float64).reshape(-1, 3)
+    lo, hi = points.min(axis=0), points.max(axis=0)
+    if quantize:
+        span = np.where(hi > lo, hi - lo, 1.0)
+        spec = _encode(np.rint((points - lo) / span * 65535).astype(np.uint16), 'u2')
+        spec.update(lo=lo.tolist(), span=span.tolist())
+    else:
+        spec = _encode(points.astype(np.float32), 'f4')
+        spec.update(lo=[0.0, 0.0, 0.0], span=[1.0, 1.0, 1.0])
+    spec['bounds'] = [lo.tolist(), hi.tolist()]
+    return spec
+
+
+def _values(values, value_range):
+    values = np.asarray(values, dtype=np.float64).reshape(-1)
+    lo, hi = value_range if value_range is not None else (values.min(), values.max())
+    scaled = np.clip((values - lo) / (hi - lo if hi > lo else 1.0), 0.0, 1.0)
+    return _encode(np.rint(scaled * 65535).astype(np.uint16), 'u2')
+
+
+def mesh_layer(mesh, color=(0.75, 0.55, 0.35), max_faces=MAX_FACES, quantize=True):
+    """A triangle mesh layer, decimated to at most ``max_faces`` triangles."""
+    if len(mesh.faces) > max_faces:
+        edges = mesh.vertices[mesh.faces[:, 1]] - mesh.vertices[mesh.faces[:, 0]]
+        cell = float(np.linalg.norm(edges, axis=1).mean()) * np.sqrt(len(mesh.faces) / max_faces)
+        coarse = decimate(mesh, cell)
+        while len(coarse.faces) > max_faces:
+            cell *= 1.25
+            coarse = decimate(mesh, cell)
+        mesh = coarse
+    index_type = 'u2' if len(mesh.vertices) <= 65535 else 'u4'
+    return {'kind': 'mesh', 'color': list(color), 'positions': _positions(mesh.vertices, quantize),
+            'indices': _encode(mesh.faces.astype(np.uint32 if index_type == 'u4' else np.uint16), index_type)}
+
+
+def points_layer(points, values=None, value_range=None, color=(0.2, 0.4, 0.8), point_size=2.0,
+                 max_points=MAX_POINTS, interactive_points=INTERACTIVE_POINTS, quantize=True, seed=0):
+    """A point cloud layer, coloured by ``values`` (viridis) or a solid ``color``."""
+    points = np.asarray(points).reshape(-1, 3)
+    order = np.random.default_rng(seed).permutation(len(points))[:max_points]
+    layer = {'kind': 'points', 'color': list(color), 'point_size': point_size,
+             'interactive_points': interactive_points, 'positions': _positions(points[order], quantize)}
+    if values is not None:
+        if value_range is None:
+            value_range = (float(np.min(values)), float(np.max(values)))
+        layer['values'] = _values(np.asarray(values).reshape(-1)[order], value_range)
+    return layer
+
+
+def install_runtime(directory):
+    """Copy ``viewer.js`` into ``directory`` unless an identical copy is there."""
+    target = os.path.join(directory, os.path.basename(RUNTIME))
+    with open(RUNTIME, 'rb') as fh:
+        source = fh.read()
+    if not os.path.exists(target) or open(target, 'rb').read() != source:
+        shutil.copyfile(RUNTIME, target)
+    return target
+
+
+def write_html(path, layers, title='', axes=('X', 'Y', 'Z'), runtime=None, inline=False):
+    """Write a page showing ``layers``.
+
+    ``runtime`` is the URL of ``viewer.js`` as the page will load it; by
+    default the runtime is installed next to the page and referenced by
+    name, so every page in a directory shares one copy.  ``inline=True``
+    writes the package's runtime into the page instead.
+    """
+    if inline:
+        with open(RUNTIME, encoding='utf-8') as fh:
+            script = '<script>\n' + fh.read().replace('</script', '<\\/script') + '</script>'
+    else:
+        if runtime is None:
+            install_runtime(os.path.dirname(os.path.abspath(path)))
+            runtime = os.path.basename(RUNTIME)
+        script = f'<script src="{runtime}"></script>'
+    lo = np.min([layer['positions']['bounds'][0] for layer in layers], axis=0)
+    hi = np.max([layer['positions']['bounds'][1] for layer in layers], axis=0)
+    scene = {'title': title, 'axes': list(axes), 'bounds': [lo.tolist(), hi.tolist()], 'layers': layers}
+    # '</' would end the script element early
+    text = json.dumps(scene, separators=(',', ':')).replace('</', '<\\/')
+    title = title.replace('&', '&amp;').replace('<', '&lt;')
+    with open(path, 'w', encoding='utf-8') as fh:
+        fh.write(PAGE.format(title=title, runtime=script, scene=text))
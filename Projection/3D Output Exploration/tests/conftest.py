@@ -0,0 +1,5 @@
+import os
+import sys
+
+# Import bearpinn from this checkout whatever directory pytest runs from
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
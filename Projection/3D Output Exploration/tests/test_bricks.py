@@ -0,0 +1,50 @@
+import numpy as np
+import pytest
+import torch
+
+from bearpinn.bricks import BrickVolume
+from bearpinn.sampling import boundary_voxels
+from bearpinn.shapes import Box, Sphere, Union, voxelize
+
+
+def scene():
+    # Odd sizes leave partial bricks on every upper face
+    return Union(Sphere((14.0, 12.0, 15.0), 9.0), Box((2.0, 20.0, 3.0), (30.0, 26.0, 8.0)))
+
+
+@pytest.mark.parametrize('brick_size', [4, 8])
+def test_round_trip_matches_the_dense_grid(brick_size):
+    dense = voxelize(scene(), (33, 29, 31))
+    for volume in (BrickVolume.from_dense(dense, brick_size),
+                   BrickVolume.from_dense(torch.from_numpy(dense).float(), brick_size),
+                   BrickVolume.from_shape(scene(), (33, 29, 31), brick_size=brick_size)):
+        assert volume.shape == dense.shape
+        np.testing.assert_array_equal(volume.to_dense(), dense)
+        assert volume.count() == dense.sum()
+        assert torch.equal(volume.to_tensor(), torch.from_numpy(dense).float())
+        np.testing.assert_array_equal(volume.boundary_voxels(), boundary_voxels(dense).numpy())
+
+
+def test_queries_and_blocks_match_the_dense_grid():
+    dense = voxelize(scene(), (33, 29, 31))
+    volume = BrickVolume.from_dense(dense)
+
+    points = np.argwhere(np.ones(dense.shape, dtype=bool))
+    np.testing.assert_array_equal(volume.query(points), dense.reshape(-1))
+    outside = np.array([[-1, 0, 0], [33, 0, 0], [0, 29, 0], [0, 0, 31]])
+    assert not volume.query(outside).any()
+
+    lo, hi = np.array([3, 5, 7]), np.array([30, 20, 31])
+    seen = np.zeros(dense.shape, dtype=bool)
+    for slices, voxels in volume.iter_blocks(lo, hi, skip_empty=False):
+        assert not seen[slices].any()
+        seen[slices] = True
+        np.testing.assert_array_equal(voxels, dense[slices])
+    expected = np.zeros(dense.shape, dtype=bool)
+    expected[3:30, 5:20, 7:31] = True
+    np.testing.assert_array_equal(seen, expected)
+
+
+def test_brick_size_must_be_a_power_of_two():
+    with pytest.raises(ValueError):
+        BrickVolume((8, 8, 8), brick_size=6)
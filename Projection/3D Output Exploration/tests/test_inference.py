@@ -0,0 +1,25 @@
+import pytest
+import torch
+
+from bearpinn.inference import infer_adaptive, infer_dense
+
+
+class HalfSpace(torch.nn.Module):
+    """Occupancy 1 below the plane ``x + y + z = offset``, 0 above it."""
+
+    def __init__(self, offset):
+        super().__init__()
+        self.offset = torch.nn.Parameter(torch.tensor(float(offset)))
+
+    def forward(self, x):
+        return (x.sum(dim=1, keepdim=True) < self.offset).float()
+
+
+@pytest.mark.parametrize('size', [37, 40])
+@pytest.mark.parametrize('offset', [80, 1000])
+def test_adaptive_count_matches_dense(size, offset):
+    model = HalfSpace(offset)
+    dense, _ = infer_dense(model, size, threshold=0.5)
+    volume, _ = infer_adaptive(model, size, brick_size=8)
+    assert volume.count() == dense.sum()
+    assert (volume.to_dense() == dense).all()
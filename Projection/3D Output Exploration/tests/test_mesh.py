@@ -0,0 +1,31 @@
+import json
+import struct
+
+import matplotlib
+import numpy as np
+import pytest
+
+from bearpinn.mesh import marching_cubes, plot_mesh, write_mesh
+
+matplotlib.use('Agg')
+
+
+@pytest.mark.parametrize('fill', [False, True])
+def test_uniform_volume_gives_empty_mesh(tmp_path, fill):
+    # closed=False, so a full volume has no surface either
+    mesh = marching_cubes(np.full((6, 6, 6), fill), closed=False)
+    assert len(mesh.vertices) == 0 and len(mesh.faces) == 0
+
+    for suffix in ('.ply', '.obj', '.glb'):
+        write_mesh(str(tmp_path / f'empty{suffix}'), mesh)
+    data = (tmp_path / 'empty.glb').read_bytes()
+    magic, version, length = struct.unpack_from('<III', data)
+    assert (magic, version, length) == (0x46546C67, 2, len(data))
+    header_length, _ = struct.unpack_from('<II', data, 12)
+    assert 'meshes' not in json.loads(data[20:20 + header_length])
+
+    import matplotlib.pyplot as plt
+
+    ax = plt.figure().add_subplot(projection='3d')
+    plot_mesh(ax, mesh)
+    plt.close('all')
@@ -0,0 +1,308 @@
+/*
+ * Minimal WebGL viewer for the scenes written by bearpinn.viewer.
+ *
+ * One copy of this file is shared by every exported page, or inlined into a
+ * page written with inline=True.  A scene is JSON with layers of base64 typed
+ * arrays; quantized positions stay uint16 on the GPU and are scaled back in
+ * the vertex shader.  Drag to orbit, scroll to zoom, double-click to reset.
+ * While the camera moves, point layers draw only their first
+ * `interactive_points` points (the exporter shuffles them, so any prefix is
+ * an even sample), and the full cloud once it stops.
+ */
+(function () {
+  'use strict';
+
+  var TYPES = {u1: Uint8Array, u2: Uint16Array, u4: Uint32Array, f4: Float32Array};
+  var GL_TYPES = {u1: 0x1401, u2: 0x1403, u4: 0x1405, f4: 0x1406};
+
+  var VERTEX_SHADER = [
+    'attribute vec3 a_position;',
+    'attribute vec3 a_normal;',
+    'attribute float a_value;',
+    'uniform mat4 u_matrix;',
+    'uniform vec3 u_lo;',
+    'uniform vec3 u_span;',
+    'uniform float u_point_size;',
+    'varying vec3 v_normal;',
+    'varying float v_value;',
+    'void main() {',
+    '  v_normal = a_normal;',
+    '  v_value = a_value;',
+    '  gl_Position = u_matrix * vec4(u_lo + a_position * u_span, 1.0);',
+    '  gl_PointSize = u_point_size;',
+    '}'
+  ].join('\n');
+
+  var FRAGMENT_SHADER = [
+    'precision mediump float;',
+    'varying vec3 v_normal;',
+    'varying float v_value;',
+    'uniform vec3 u_color;',
+    'uniform vec3 u_light;',
+    'uniform float u_lit;',
+    'vec3 viridis(float t) {',
+    '  const vec3 c0 = vec3(0.2777, 0.0054, 0.3341);',
+    '  const vec3 c1 = vec3(0.1051, 1.4046, 1.3846);',
+    '  const vec3 c2 = vec3(-0.3309, 0.2148, 0.0951);',
+    '  const vec3 c3 = vec3(-4.6342, -5.7991, -19.3324);',
+    '  const vec3 c4 = vec3(6.2283, 14.1799, 56.6906);',
+    '  const vec3 c5 = vec3(4.7764, -13.7451, -65.3530);',
+    '  const vec3 c6 = vec3(-5.4355, 4.6459, 26.3124);',
+    '  return c0 + t * (c1 + t * (c2 + t * (c3 + t * (c4 + t * (c5 + t * c6)))));',
+    '}',
+    'void main() {',
+    '  vec3 base = v_value < 0.0 ? u_color : viridis(clamp(v_value, 0.0, 1.0));',
+    '  float shade = 1.0;',
+    '  if (u_lit > 0.5) shade = 0.3 + 0.7 * abs(dot(normalize(v_normal), u_light));',
+    '  gl_FragColor = vec4(base * shade, 1.0);',
+    '}'
+  ].join('\n');
+
+  function decode(spec) {
+    var raw = atob(spec.data);
+    var bytes = new Uint8Array(raw.length);
+    for (var i = 0; i < raw.length; i++) bytes[i] = raw.charCodeAt(i);
+    return new TYPES[spec.dtype](bytes.buffer);
+  }
+
+  function dequantize(spec, values) {
+    var out = new Float32Array(values.length);
+    var scale = spec.dtype === 'f4' ? 1 : 1 / 65535;
+    for (var i = 0; i < values.length; i++) {
+      var axis = i % 3;
+      out[i] = spec.lo[axis] + values[i] * scale * spec.span[axis];
+    }
+    return out;
+  }
+
+  function vertexNormals(positions, indices) {
+    var normals = new Float32Array(positions.length);
+    for (var f = 0; f < indices.length; f += 3) {
+      var a = 3 * indices[f], b = 3 * indices[f + 1], c = 3 * indices[f + 2];
+      var ux = positions[b] - positions[a], uy = positions[b + 1] - positions[a + 1], uz = positions[b + 2] - positions[a + 2];
+      var vx = positions[c] - positions[a], vy = positions[c + 1] - positions[a + 1], vz = positions[c + 2] - positions[a + 2];
+      var nx = uy * vz - uz * vy, ny = uz * vx - ux * vz, nz = ux * vy - uy * vx;
+      for (var k = 0; k < 3; k++) {
+        var v = 3 * indices[f + k];
+        normals[v] += nx; normals[v + 1] += ny; normals[v + 2] += nz;
+      }
+    }
+    return normals;
+  }
+
+  function compile(gl) {
+    var program = gl.createProgram();
+    [[gl.VERTEX_SHADER, VERTEX_SHADER], [gl.FRAGMENT_SHADER, FRAGMENT_SHADER]].forEach(function (pair) {
+      var shader = gl.createShader(pair[0]);
+      gl.shaderSource(shader, pair[1]);
+      gl.compileShader(shader);
+      if (!gl.getShaderParameter(shader, gl.COMPILE_STATUS)) throw new Error(gl.getShaderInfoLog(shader));
+      gl.attachShader(program, shader);
+    });
+    gl.linkProgram(program);
+    if (!gl.getProgramParameter(program, gl.LINK_STATUS)) throw new Error(gl.getProgramInfoLog(program));
+    return program;
+  }
+
+  function buffer(gl, target, data) {
+    var id = gl.createBuffer();
+    gl.bindBuffer(target, id);
+    gl.bufferData(target, data, gl.STATIC_DRAW);
+    return id;
+  }
+
+  function perspective(fov, aspect, near, far) {
+    var f = 1 / Math.tan(fov / 2), d = near - far;
+    return [f / aspect, 0, 0, 0, 0, f, 0, 0, 0, 0, (far + near) / d, -1, 0, 0, 2 * far * near / d, 0];
+  }
+
+  function multiply(a, b) {
+    var out = new Array(16);
+    for (var col = 0; col < 4; col++) {
+      for (var row = 0; row < 4; row++) {
+        var sum = 0;
+        for (var k = 0; k < 4; k++) sum += a[k * 4 + row] * b[col * 4 + k];
+        out[col * 4 + row] = sum;
+      }
+    }
+    return out;
+  }
+
+  function lookAt(eye, centre, up) {
+    var z = normalize([eye[0] - centre[0], eye[1] - centre[1], eye[2] - centre[2]]);
+    var x = normalize(cross(up, z));
+    var y = cross(z, x);
+    return [x[0], y[0], z[0], 0, x[1], y[1], z[1], 0, x[2], y[2], z[2], 0,
+            -dot(x, eye), -dot(y, eye), -dot(z, eye), 1];
+  }
+
+  function cross(a, b) { return [a[1] * b[2] - a[2] * b[1], a[2] * b[0] - a[0] * b[2], a[0] * b[1] - a[1] * b[0]]; }
+  function dot(a, b) { return a[0] * b[0] + a[1] * b[1] + a[2] * b[2]; }
+  function normalize(a) { var n = Math.sqrt(dot(a, a)) || 1; return [a[0] / n, a[1] / n, a[2] / n]; }
+
+  function render(element, scene) {
+    var canvas = document.createElement('canvas');
+    canvas.style.width = canvas.style.height = '100%';
+    canvas.style.display = 'block';
+    element.appendChild(canvas);
+    if (scene.title || scene.axes) {
+      var info = document.createElement('div');
+      info.className = 'bearpinn-info';
+      info.innerHTML = (scene.title ? '<b></b><br>' : '') + '<span style="color:#d33"></span> ' +
+        '<span style="color:#3a3"></span> <span style="color:#36d"></span>';
+      if (scene.title) info.querySelector('b').textContent = scene.title;
+      var labels = info.querySelectorAll('span');
+      for (var a = 0; a < 3; a++) labels[a].textContent = scene.axes[a];
+      element.appendChild(info);
+    }
+
+    var gl = canvas.getContext('webgl', {antialias: true});
+    var uintIndices = gl.getExtension('OES_element_index_uint');
+    var program = compile(gl);
+    gl.useProgram(program);
+    var loc = {};
+    ['a_position', 'a_normal', 'a_value'].forEach(function (name) { loc[name] = gl.getAttribLocation(program, name); });
+    ['u_matrix', 'u_lo', 'u_span', 'u_point_size', 'u_color', 'u_light', 'u_lit'].forEach(function (name) {
+      loc[name] = gl.getUniformLocation(program, name);
+    });
+
+    var layers = scene.layers.map(function (layer) {
+      var spec = layer.positions;
+      var raw = decode(spec);
+      var item = {kind: layer.kind, spec: spec, count: raw.length / 3, color: layer.color,
+                  pointSize: layer.point_size || 2, interactive: layer.interactive_points || Infinity};
+      item.positions = buffer(gl, gl.ARRAY_BUFFER, raw);
+      if (layer.values) item.values = buffer(gl, gl.ARRAY_BUFFER, decode(layer.values));
+      if (layer.kind === 'mesh') {
+        if (layer.indices.dtype === 'u4' && !uintIndices) throw new Error('32-bit indices are not supported');
+        var indices = decode(layer.indices);
+        item.indexType = GL_TYPES[layer.indices.dtype];
+        item.elements = indices.length;
+        item.indices = buffer(gl, gl.ELEMENT_ARRAY_BUFFER, indices);
+        item.normals = buffer(gl, gl.ARRAY_BUFFER, vertexNormals(dequantize(spec, raw), indices));
+      }
+      return item;
+    });
+
+    // Bounding box, with the edges along x, y and z from the low corner coloured
+    var lo = scene.bounds[0], hi = scene.bounds[1];
+    var centre = [0, 1, 2].map(function (k) { return (lo[k] + hi[k]) / 2; });
+    var radius = Math.sqrt([0, 1, 2].reduce(function (s, k) { return s + Math.pow(hi[k] - lo[k], 2); }, 0)) / 2 || 1;
+    var box = [];
+    for (var axis = 0; axis < 3; axis++) {
+      for (var c = 0; c < 4; c++) {
+        var p = [lo[0], lo[1], lo[2]], q;
+        p[(axis + 1) % 3] = c & 1 ? hi[(axis + 1) % 3] : lo[(axis + 1) % 3];
+        p[(axis + 2) % 3] = c & 2 ? hi[(axis + 2) % 3] : lo[(axis + 2) % 3];
+        q = p.slice();
+        q[axis] = hi[axis];
+        box.push(p.concat(q));
+      }
+    }
+    var boxBuffer = buffer(gl, gl.ARRAY_BUFFER, new Float32Array([].concat.apply([], box)));
+    var AXIS_COLORS = [[0.85, 0.2, 0.2], [0.2, 0.65, 0.2], [0.2, 0.4, 0.85]];
+
+    var view = {yaw: -0.6, pitch: 0.45, distance: 2.8 * radius};
+    var home = {yaw: view.yaw, pitch: view.pitch, distance: view.distance};
+    var moving = false, pending = false, settle = null, last = null;
+
+    function draw() {
+      pending = false;
+      var dpr = window.devicePixelRatio || 1;
+      var width = Math.max(1, Math.round(canvas.clientWidth * dpr));
+      var height = Math.max(1, Math.round(canvas.clientHeight * dpr));
+      if (canvas.width !== width || canvas.height !== height) { canvas.width = width; canvas.height = height; }
+      gl.viewport(0, 0, width, height);
+      gl.clearColor(1, 1, 1, 1);
+      gl.clear(gl.COLOR_BUFFER_BIT | gl.DEPTH_BUFFER_BIT);
+      gl.enable(gl.DEPTH_TEST);
+
+      var eye = [
+        centre[0] + view.distance * Math.cos(view.pitch) * Math.cos(view.yaw),
+        centre[1] + view.distance * Math.cos(view.pitch) * Math.sin(view.yaw),
+        centre[2] + view.distance * Math.sin(view.pitch)
+      ];
+      var matrix = multiply(perspective(0.7, width / height, view.distance / 100, view.distance + 4 * radius),
+                            lookAt(eye, centre, [0, 0, 1]));
+      gl.uniformMatrix4fv(loc.u_matrix, false, matrix);
+      gl.uniform3fv(loc.u_light, normalize([eye[0] - centre[0], eye[1] - centre[1], eye[2] - centre[2] + radius]));
+
+      layers.forEach(function (item) {
+        var quantized = item.spec.dtype !== 'f4';
+        gl.uniform3fv(loc.u_lo, item.spec.lo);
+        gl.uniform3fv(loc.u_span, item.spec.span);
+        gl.uniform3fv(loc.u_color, item.color);
+        gl.uniform1f(loc.u_point_size, item.pointSize * dpr);
+        gl.bindBuffer(gl.ARRAY_BUFFER, item.positions);
+        gl.enableVertexAttribArray(loc.a_position);
+        gl.vertexAttribPointer(loc.a_position, 3, GL_TYPES[item.spec.dtype], quantized, 0, 0);
+        if (item.values) {
+          gl.bindBuffer(gl.ARRAY_BUFFER, item.values);
+          gl.enableVertexAttribArray(loc.a_value);
+          gl.vertexAttribPointer(loc.a_value, 1, gl.UNSIGNED_SHORT, true, 0, 0);
+        } else {
+          gl.disableVertexAttribArray(loc.a_value);
+          gl.vertexAttrib1f(loc.a_value, -1);
+        }
+        if (item.kind === 'mesh') {
+          gl.uniform1f(loc.u_lit, 1);
+          gl.bindBuffer(gl.ARRAY_BUFFER, item.normals);
+          gl.enableVertexAttribArray(loc.a_normal);
+          gl.vertexAttribPointer(loc.a_normal, 3, gl.FLOAT, false, 0, 0);
+          gl.bindBuffer(gl.ELEMENT_ARRAY_BUFFER, item.indices);
+          gl.drawElements(gl.TRIANGLES, item.elements, item.indexType, 0);
+        } else {
+          gl.uniform1f(loc.u_lit, 0);
+          gl.disableVertexAttribArray(loc.a_normal);
+          gl.drawArrays(gl.POINTS, 0, moving ? Math.min(item.count, item.interactive) : item.count);
+        }
+      });
+
+      gl.uniform1f(loc.u_lit, 0);
+      gl.uniform3fv(loc.u_lo, [0, 0, 0]);
+      gl.uniform3fv(loc.u_span, [1, 1, 1]);
+      gl.disableVertexAttribArray(loc.a_normal);
+      gl.disableVertexAttribArray(loc.a_value);
+      gl.vertexAttrib1f(loc.a_value, -1);
+      gl.bindBuffer(gl.ARRAY_BUFFER, boxBuffer);
+      gl.enableVertexAttribArray(loc.a_position);
+      gl.vertexAttribPointer(loc.a_position, 3, gl.FLOAT, false, 0, 0);
+      for (var edge = 0; edge < 12; edge++) {
+        gl.uniform3fv(loc.u_color, edge % 4 === 0 ? AXIS_COLORS[edge / 4] : [0.7, 0.7, 0.7]);
+        gl.drawArrays(gl.LINES, 2 * edge, 2);
+      }
+    }
+
+    function redraw(interacting) {
+      if (interacting) {
+        moving = true;
+        clearTimeout(settle);
+        settle = setTimeout(function () { moving = false; redraw(false); }, 150);
+      }
+      if (!pending) { pending = true; requestAnimationFrame(draw); }
+    }
+
+    canvas.addEventListener('mousedown', function (event) { last = [event.clientX, event.clientY]; });
+    window.addEventListener('mouseup', function () { last = null; });
+    window.addEventListener('mousemove', function (event) {
+      if (!last) return;
+      view.yaw -= (event.clientX - last[0]) * 0.01;
+      view.pitch = Math.max(-1.55, Math.min(1.55, view.pitch + (event.clientY - last[1]) * 0.01));
+      last = [event.clientX, event.clientY];
+      redraw(true);
+    });
+    canvas.addEventListener('wheel', function (event) {
+      event.preventDefault();
+      view.distance *= Math.exp(event.deltaY * 0.001);
+      redraw(true);
+    }, {passive: false});
+    canvas.addEventListener('dblclick', function () {
+      view.yaw = home.yaw; view.pitch = home.pitch; view.distance = home.distance;
+      redraw(false);
+    });
+    window.addEventListener('resize', function () { redraw(false); });
+    redraw(false);
+  }
+
+  window.BearViewer = {render: render};
+})();